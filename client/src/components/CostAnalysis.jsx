@@ -10,6 +10,8 @@ const CostAnalysis = () => {
   const [filterBy, setFilterBy] = useState('all');
   const [selectedDelivery, setSelectedDelivery] = useState(null);
   const [anomaliesData, setAnomaliesData] = useState([]);
+  const [costSummary, setCostSummary] = useState(null);
+  const [summaryUnavailable, setSummaryUnavailable] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -32,6 +34,20 @@ const CostAnalysis = () => {
 
       const anomaliesData = await anomaliesResponse.json();
 
+      // Precomputed aggregates are optional; the table still works without them
+      try {
+        const summaryResponse = await fetch('http://127.0.0.1:8000/cost-aggregates?histogram=false');
+        if (!summaryResponse.ok) {
+          throw new Error(`Cost aggregates API failed: ${summaryResponse.status}`);
+        }
+        setCostSummary(await summaryResponse.json());
+        setSummaryUnavailable(false);
+      } catch (err) {
+        console.warn('Cost aggregates unavailable:', err);
+        setCostSummary(null);
+        setSummaryUnavailable(true);
+      }
+
       // Transform and combine the data
      const transformedData = anomaliesData.map((anomaly, index) => {
      const cost = parseFloat(anomaly.cost);
@@ -242,7 +258,14 @@ const CostAnalysis = () => {
             <h2 className="text-2xl font-semibold text-gray-900">Anomaly Detection</h2>
             <div className="flex items-center gap-2">
               <AlertTriangle className="w-5 h-5 text-orange-500" />
-              <span className="text-sm text-gray-600">25 total anomalies detected</span>
+              <span className="text-sm text-gray-600">
+                {costSummary
+                  ? Object.values(costSummary.anomaly_counts).reduce((a, b) => a + b, 0)
+                  : anomaliesData.length} total anomalies detected
+                {summaryUnavailable && (
+                  <span className="ml-2 text-xs text-gray-400">(aggregates unavailable)</span>
+                )}
+              </span>
             </div>
           </div>
           
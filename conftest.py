@@ -0,0 +1 @@
+# Lets `python -m pytest` / `pytest` from the repo root import `scripts.*`.
@@ -1,43 +1,140 @@
+import os
+import numpy as np
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import warnings
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
+# === Paths (override with env vars) ===
+ROOT        = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUTS_DIR = os.getenv("DASHBOARD_OUTPUTS_DIR", os.path.join(ROOT, "outputs"))
+REPORT_PATH = os.getenv("DASHBOARD_REPORT", os.path.join(OUTPUTS_DIR, "predictions_full_report.csv"))
+HEATMAP_PATH = os.path.join(OUTPUTS_DIR, "zone_time_heatmap.png")
+CM_PATH      = os.path.join(OUTPUTS_DIR, "classification_confusion_matrix.png")
+
+PAGE_SIZES  = [50, 100, 250, 1000]
+FILTER_COLS = ["predicted_delay_label", "rl_action", "time_slot", "distance_category"]
+MAX_OPTIONS = 200     # columns with more distinct values aren't offered as filters
+
 st.set_page_config(layout="wide", page_title="Walmart Delay Predictor")
 
 st.title("🚚 Walmart Delay Prediction Dashboard")
 st.markdown("AI-powered predictions with Reinforcement Learning rerouting")
 
-# === Load data ===
-df = pd.read_csv(r'C:\Users\kksin\Documents\walmart_delay_prediction\outputs\predictions_full_report.csv')
+
+# === Cached loading (keyed on file mtime, so a rewritten report reloads) ===
+@st.cache_resource(max_entries=2, show_spinner="Loading predictions report …")
+def load_report(path: str, mtime: float) -> pd.DataFrame:
+    """Shared across reruns and sessions without copying — treat as read-only."""
+    df = pd.read_csv(path)
+    for col in df.select_dtypes("object"):
+        if df[col].nunique() <= MAX_OPTIONS:
+            df[col] = df[col].astype("category")
+    return df
+
+
+@st.cache_data(max_entries=4)
+def summarize(path: str, mtime: float) -> dict:
+    df = load_report(path, mtime)
+    summary = {
+        "total": len(df),
+        "avg_predicted": float(df["predicted_time_min"].mean()),
+        "mae": float((df["actual_time_min"] - df["predicted_time_min"]).abs().mean()),
+        "delay_counts": df["predicted_delay_label"].value_counts(),
+        "options": {c: sorted(df[c].dropna().unique().tolist(), key=str)
+                    for c in FILTER_COLS if c in df and df[c].nunique() <= MAX_OPTIONS},
+        "time_range": (float(df["predicted_time_min"].min()), float(df["predicted_time_min"].max())),
+    }
+    if "rl_action" in df.columns:
+        summary["rl_counts"] = df["rl_action"].value_counts()
+    return summary
+
+
+@st.cache_data(max_entries=32)
+def filter_rows(path: str, mtime: float, selections: tuple, time_range: tuple,
+                zone: str, sort_by: str, ascending: bool) -> np.ndarray:
+    """Row positions matching the filters, in display order."""
+    df = load_report(path, mtime)
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in selections:
+        mask &= df[col].isin(values).to_numpy()
+    times = df["predicted_time_min"].to_numpy()
+    mask &= (times >= time_range[0]) & (times <= time_range[1])
+    if zone:
+        mask &= (df["from_zone"].astype(str) == zone).to_numpy()
+    rows = np.flatnonzero(mask)
+    if sort_by:
+        # pandas sorts object / categorical columns with missing values; NaN always last
+        keys = df[sort_by].iloc[rows].reset_index(drop=True)
+        try:
+            keys = keys.sort_values(ascending=ascending, na_position="last", kind="stable")
+        except TypeError:                 # mixed types (e.g. ints and strings)
+            keys = keys.astype(str).where(keys.notna()).sort_values(
+                ascending=ascending, na_position="last", kind="stable")
+        rows = rows[keys.index.to_numpy()]
+    return rows
+
+
+if not os.path.exists(REPORT_PATH):
+    st.error(f"Predictions report not found at {REPORT_PATH}. Run predict_and_optimize.py "
+             "or set DASHBOARD_REPORT / DASHBOARD_OUTPUTS_DIR.")
+    st.stop()
+
+mtime = os.path.getmtime(REPORT_PATH)
+df = load_report(REPORT_PATH, mtime)
+summary = summarize(REPORT_PATH, mtime)
 
 # === Summary ===
 st.subheader("📊 Summary Metrics")
 col1, col2, col3 = st.columns(3)
-col1.metric("Total Deliveries", len(df))
-col2.metric("Avg Predicted Delay", f"{df['predicted_time_min'].mean():.2f} min")
-mae = (df["actual_time_min"] - df["predicted_time_min"]).abs().mean()
-col3.metric("Mean Absolute Error", f"{mae:.2f} min")
+col1.metric("Total Deliveries", f"{summary['total']:,}")
+col2.metric("Avg Predicted Delay", f"{summary['avg_predicted']:.2f} min")
+col3.metric("Mean Absolute Error", f"{summary['mae']:.2f} min")
 
 # === Delay prediction distribution ===
 st.subheader("🛑 Delay Category Distribution")
-st.bar_chart(df['predicted_delay_label'].value_counts())
+st.bar_chart(summary["delay_counts"])
 
 # === RL Action Breakdown ===
-if 'rl_action' in df.columns:
+if "rl_counts" in summary:
     st.subheader("🤖 RL Agent Rerouting Actions")
-    st.bar_chart(df['rl_action'].value_counts())
+    st.bar_chart(summary["rl_counts"])
 
 # === Heatmap ===
 st.subheader("🗺️ Zone-Time Heatmap")
-st.image(r"C:\Users\kksin\Documents\walmart_delay_prediction\outputs\zone_time_heatmap.png", caption="Delay Heatmap by Zone & Time Slot")
+if os.path.exists(HEATMAP_PATH):
+    st.image(HEATMAP_PATH, caption="Delay Heatmap by Zone & Time Slot")
+else:
+    st.info(f"No heatmap at {HEATMAP_PATH}")
 
 # === Confusion Matrix ===
 st.subheader("🧪 Classification Confusion Matrix")
-st.image(r"C:\Users\kksin\Documents\walmart_delay_prediction\outputs\classification_confusion_matrix.png", caption="Predicted vs Actual Delay Categories")
+if os.path.exists(CM_PATH):
+    st.image(CM_PATH, caption="Predicted vs Actual Delay Categories")
+else:
+    st.info(f"No confusion matrix at {CM_PATH}")
+
+# === Predictions table: filtered, sorted and paginated server-side ===
+st.subheader("📋 Predictions Table")
+with st.sidebar:
+    st.header("🔎 Filters")
+    selections = []
+    for col, options in summary["options"].items():
+        picked = st.multiselect(col.replace("_", " ").title(), options)
+        if picked:
+            selections.append((col, tuple(picked)))
+    lo, hi = summary["time_range"]
+    time_range = st.slider("Predicted time (min)", lo, hi, (lo, hi)) if hi > lo else (lo, hi)
+    zone = st.text_input("From zone").strip()
+    sort_by = st.selectbox("Sort by", [""] + list(df.columns))
+    ascending = st.toggle("Ascending", value=False) if sort_by else True
+    page_size = st.selectbox("Rows per page", PAGE_SIZES)
 
-# === Data Preview ===
-st.subheader("📋 Full Predictions Table")
-st.dataframe(df)
+rows = filter_rows(REPORT_PATH, mtime, tuple(selections), tuple(time_range), zone, sort_by, ascending)
+n_pages = max(1, -(-len(rows) // page_size))
+page = st.number_input(f"Page (1–{n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1)
+start = (page - 1) * page_size
+st.caption(f"{len(rows):,} matching rows — showing {start + 1 if len(rows) else 0:,}"
+           f"–{min(start + page_size, len(rows)):,}")
+st.dataframe(df.iloc[rows[start:start + page_size]], use_container_width=True)
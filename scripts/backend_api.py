@@ -6,14 +6,25 @@ import pandas as pd
 import numpy as np
 import uvicorn
 import os
+import json
+import time
+import threading
+from typing import Optional
 
-from scripts.rl_agent.agent import DQNAgent
 from scripts.rl_agent.agent_runner import get_rl_optimal_reroute
 from scripts.feature_engineering import prepare_model_input
 
 from scripts.heatmap_generator import generate_heatmap, generate_delay_heatmap
-
-from fastapi.responses import FileResponse
+from scripts.delivery_cube import DeliveryCube, CUBE_PATH, DIMS, METRICS
+from scripts.zone_hierarchy import HIERARCHY_PATH, ROOT, load_hierarchy, drilldown, children
+from scripts.heatmap_generator import _draw_heatmap, RENDER_TIERS
+from scripts.lookup_table import build_lookup, load_lookup, model_signature
+from scripts.baseline_store import BaselineStore, BASELINE_PATH
+from scripts.drift_monitor import DriftMonitor
+from scripts import bulk_scoring
+from scripts import profiling
+
+from fastapi.responses import FileResponse, StreamingResponse
 from scripts.heatmap_generator import generate_heatmap, generate_delay_heatmap
 # === Initialize FastAPI app ===
 app = FastAPI(title="Walmart Delay + RL Rerouting API")
@@ -27,6 +38,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# === Opt-in profiling (WALMART_PROFILE); nothing is installed when off ===
+if profiling.ENABLED:
+    from fastapi import Request
+
+    @app.middleware("http")
+    async def _profile_request(request: Request, call_next):
+        with profiling.stage(f"api {request.method} {request.url.path}"):
+            return await call_next(request)
+
+    @app.get("/debug/profile")
+    def get_profile():
+        return profiling.report()
+
 # === Load ML Models and Preprocessors ===
 try:
     scaler = joblib.load("utils/scaler.pkl")
@@ -96,12 +120,184 @@ async def global_exception_handler(request: Request, exc: Exception):
 model = joblib.load("models/delay_classifier.pkl")
 
 
+# === Lookup-table inference (scripts/lookup_table.py) ===
+# PREDICT_MODE=lookup serves /predict from the precomputed grid; a request can
+# override with ?mode=live|lookup. While the table is missing or stale (model
+# files changed) it is rebuilt in a background thread and requests stay live.
+PREDICT_MODE = os.getenv("PREDICT_MODE", "live")
+LOOKUP_RETRY_S = 600          # first back-off after a failed rebuild, doubled per failure
+LOOKUP_RETRY_MAX_S = 6 * 3600
+_lookup_cache = {"signature": None, "table": None, "building": False,
+                 "failed": None, "failures": 0, "retry_at": 0.0}
+_lookup_lock = threading.Lock()
+
+
+def _rebuild_lookup(signature: dict):
+    try:
+        build_lookup()
+        failed = False
+    except Exception as e:
+        print(f"❌ Lookup table rebuild failed: {e}")
+        failed = True
+    with _lookup_lock:
+        _lookup_cache["building"] = False
+        _lookup_cache["signature"] = None       # re-check on the next request
+        if failed:
+            # same model files → don't rebuild again until the back-off expires
+            failures = _lookup_cache["failures"] + 1 if _lookup_cache["failed"] == signature else 1
+            _lookup_cache.update(failed=signature, failures=failures,
+                                 retry_at=time.time() + min(LOOKUP_RETRY_S * 2 ** (failures - 1),
+                                                            LOOKUP_RETRY_MAX_S))
+        else:
+            _lookup_cache.update(failed=None, failures=0, retry_at=0.0)
+
+
+def _current_lookup():
+    """Usable table for the current model files, or None (and schedule a rebuild)."""
+    signature = model_signature()
+    with _lookup_lock:
+        if _lookup_cache["signature"] == signature:
+            return _lookup_cache["table"]
+        if _lookup_cache["building"]:
+            return None
+        table = load_lookup()
+        if table is None:
+            if _lookup_cache["failed"] == signature and time.time() < _lookup_cache["retry_at"]:
+                return None                     # backing off after a failed rebuild
+            _lookup_cache["building"] = True
+            threading.Thread(target=_rebuild_lookup, args=(signature,), daemon=True).start()
+            return None
+        _lookup_cache["signature"] = signature
+        _lookup_cache["table"] = table if table.meta.get("within_tolerance") else None
+        return _lookup_cache["table"]
+
+
+# === SLO fallback (scripts/baseline_store.py) ===
+# Past the latency budget (EWMA of recent model latencies) or with too many
+# requests in flight, /predict answers from the zone_pair × time_slot history.
+# While over budget every PROBE_EVERY-th request still runs the models so
+# the EWMA can recover.
+PREDICT_LATENCY_BUDGET_MS = float(os.getenv("PREDICT_LATENCY_BUDGET_MS", "250"))
+PREDICT_MAX_INFLIGHT = int(os.getenv("PREDICT_MAX_INFLIGHT", "16"))
+LATENCY_EWMA_ALPHA = 0.2
+PROBE_EVERY = 20
+_slo = {"inflight": 0, "ewma_ms": 0.0, "since_probe": 0}
+_slo_lock = threading.Lock()
+
+# Streaming sketches of /predict inputs for /drift (bounded memory)
+drift_monitor = DriftMonitor()
+
+_baseline_cache = {"mtime": None, "store": None}
+
+
+def _load_baseline():
+    """Keep the baseline store in memory; reload only when the file changes."""
+    if not os.path.exists(BASELINE_PATH):
+        return None
+    mtime = os.path.getmtime(BASELINE_PATH)
+    if _baseline_cache["mtime"] != mtime:
+        _baseline_cache["store"] = BaselineStore.load(BASELINE_PATH)
+        _baseline_cache["mtime"] = mtime
+    return _baseline_cache["store"]
+
+
+def _overload_reason() -> Optional[str]:
+    with _slo_lock:
+        if _slo["inflight"] > PREDICT_MAX_INFLIGHT:
+            return "queue_depth"
+        if _slo["ewma_ms"] > PREDICT_LATENCY_BUDGET_MS:
+            _slo["since_probe"] += 1
+            if _slo["since_probe"] < PROBE_EVERY:
+                return "latency_budget"
+            _slo["since_probe"] = 0
+    return None
+
+
+def _record_latency(ms: float):
+    with _slo_lock:
+        _slo["ewma_ms"] += LATENCY_EWMA_ALPHA * (ms - _slo["ewma_ms"])
+
+
+# Sync handler: FastAPI runs it in the thread pool, so concurrent requests
+# are actually in flight together and the queue-depth check can see them.
 @app.post("/predict")
-async def predict_delay(input_data: DeliveryInput):
+def predict_delay(input_data: DeliveryInput, mode: Optional[str] = None):
+    drift_monitor.observe(input_data.dict())
+    with _slo_lock:
+        _slo["inflight"] += 1
+    try:
+        reason = _overload_reason()
+        store = _load_baseline() if reason else None
+        if store is not None:
+            return {**store.predict(input_data.from_zone, input_data.to_zone, input_data.time_slot),
+                    "source": "fallback",
+                    "fallback_reason": reason}
+        t0 = time.perf_counter()
+        try:
+            return _predict_models(input_data, mode)
+        finally:
+            _record_latency(1000 * (time.perf_counter() - t0))
+    finally:
+        with _slo_lock:
+            _slo["inflight"] -= 1
+
+
+# === Bulk CSV scoring (scripts/bulk_scoring.py) ===
+# curl -T manifest.csv -H "Content-Type: text/csv" "localhost:8000/predict/bulk?reroute=true" -o scored.csv
+@app.post("/predict/bulk")
+async def predict_bulk(request: Request, reroute: bool = False,
+                       chunk_mb: float = bulk_scoring.CHUNK_MB):
+    chunk_bytes = int(min(max(chunk_mb, 0.1), bulk_scoring.MAX_CHUNK_MB) * 2**20)
+    blocks = bulk_scoring.csv_blocks(request.stream(), chunk_bytes)
+    first = await anext(blocks, None)
+    if first is None:
+        raise HTTPException(status_code=400, detail="Empty upload: send a CSV with a header row.")
+    header, _, body = first.partition(b"\n")
+    columns, missing = bulk_scoring.resolve_columns(header)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(missing)}")
+    return StreamingResponse(
+        bulk_scoring.score_stream(header + b"\n", body, blocks, columns,
+                                  (scaler, classifier, regressor), reroute),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="scored.csv"'},
+    )
+
+
+@app.get("/drift")
+def get_drift():
+    """Live /predict inputs vs the training reference (models/drift_reference.json)."""
+    return drift_monitor.report()
+
+
+@app.post("/drift/reset")
+def reset_drift():
+    drift_monitor.reset()
+    return {"status": "reset"}
+
+
+@app.get("/predict/slo")
+def get_predict_slo():
+    with _slo_lock:
+        state = dict(_slo)
+    return {**state, "latency_budget_ms": PREDICT_LATENCY_BUDGET_MS,
+            "max_inflight": PREDICT_MAX_INFLIGHT, "baseline_available": os.path.exists(BASELINE_PATH)}
+
+
+@profiling.profiled("api.predict_models")
+def _predict_models(input_data: DeliveryInput, mode: Optional[str]):
     try:
         raw_input = input_data.dict()
         print("📥 Raw input:", raw_input)
 
+        if (mode or PREDICT_MODE) == "lookup":
+            table = _current_lookup()
+            if table is not None and table.covers(input_data.distance, input_data.weight):
+                same_zone = int(input_data.from_zone == input_data.to_zone)
+                return {**table.predict(input_data.distance, input_data.weight, same_zone,
+                                        input_data.time_slot),
+                        "source": "lookup"}
+
         # Use your original feature engineering function
         df_input = prepare_model_input(raw_input)  # Should return exactly the 14 features
         print("✅ Prepared input shape:", df_input.shape)
@@ -123,7 +319,8 @@ async def predict_delay(input_data: DeliveryInput):
         return {
             "delay_class": delay_prediction,
             "delay_confidence": round(delay_proba * 100, 2),
-            "estimated_duration_min": estimated_duration
+            "estimated_duration_min": estimated_duration,
+            "source": "live",
         }
 
     except Exception as e:
@@ -184,12 +381,156 @@ def get_cost_anomalies():
             raise HTTPException(status_code=500, detail=str(e))
 
 
+# === Cost Aggregates (precomputed by cost_analysis_from_hf.py) ===
+COST_AGG_PATH = "outputs/cost_aggregates.json"
+_cost_agg_cache = {"mtime": None, "data": None}
+
+
+def _load_cost_aggregates():
+    """Keep the aggregates JSON in memory; reload only when the file changes."""
+    if not os.path.exists(COST_AGG_PATH):
+        raise HTTPException(status_code=404, detail="Cost aggregates not found. Run cost_analysis_from_hf.py first.")
+    mtime = os.path.getmtime(COST_AGG_PATH)
+    if _cost_agg_cache["mtime"] != mtime:
+        with open(COST_AGG_PATH) as f:
+            _cost_agg_cache["data"] = json.load(f)
+        _cost_agg_cache["mtime"] = mtime
+    return _cost_agg_cache["data"]
+
+
+@app.get("/cost-aggregates")
+def get_cost_aggregates(group_by: str = "overall",
+                        sort_by: str = "total",
+                        limit: Optional[int] = None,
+                        histogram: bool = True):
+    aggregates = _load_cost_aggregates()
+    meta = {"bins": aggregates["bins"], "percentiles": aggregates["percentiles"]}
+
+    if group_by == "overall":
+        overall = dict(aggregates["overall"])
+        if not histogram:
+            overall.pop("histogram", None)
+        return {**meta, "anomaly_counts": aggregates["anomaly_counts"], "overall": overall}
+
+    if group_by not in aggregates["groups"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown group_by '{group_by}'. Choose from: overall, {', '.join(aggregates['groups'])}",
+        )
+    if sort_by not in ("count", "mean", "total", "key"):
+        raise HTTPException(status_code=400, detail="sort_by must be one of: count, mean, total, key")
+
+    rows = sorted(aggregates["groups"][group_by], key=lambda r: r[sort_by], reverse=sort_by != "key")
+    if limit is not None:
+        rows = rows[:max(limit, 0)]
+    if not histogram:
+        rows = [{k: v for k, v in r.items() if k != "histogram"} for r in rows]
+    return {**meta, "group_by": group_by, "groups": rows}
+
+
+# === Delivery Cube (precomputed by predict_and_optimize.py) ===
+_cube_cache = {"mtime": None, "cube": None}
+
+
+def _load_cube() -> DeliveryCube:
+    """Keep the cube in memory; reload only when the file changes."""
+    if not os.path.exists(CUBE_PATH):
+        raise HTTPException(status_code=404, detail="Delivery cube not found. Run predict_and_optimize.py first.")
+    mtime = os.path.getmtime(CUBE_PATH)
+    if _cube_cache["mtime"] != mtime:
+        _cube_cache["cube"] = DeliveryCube.load(CUBE_PATH)
+        _cube_cache["mtime"] = mtime
+    return _cube_cache["cube"]
+
+
+@app.get("/cube/pivot")
+def get_cube_pivot(index: str = "zone_group",
+                   columns: str = "time_slot",
+                   metric: str = "mean_time",
+                   zone_group: Optional[str] = None,
+                   time_slot: Optional[str] = None,
+                   weight_category: Optional[str] = None,
+                   distance_category: Optional[str] = None,
+                   delay_class: Optional[str] = None):
+    """Heatmap-ready JSON; filters are comma-separated label lists."""
+    cube = _load_cube()
+    filters = {
+        dim: value.split(",")
+        for dim, value in {
+            "zone_group": zone_group,
+            "time_slot": time_slot,
+            "weight_category": weight_category,
+            "distance_category": distance_category,
+            "delay_class": delay_class,
+        }.items()
+        if value
+    }
+    try:
+        return cube.pivot(index, columns, metric, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/cube/dimensions")
+def get_cube_dimensions():
+    cube = _load_cube()
+    return {
+        "dimensions": {d: cube.labels[d].tolist() for d in DIMS},
+        "metrics": list(METRICS),
+        "time_col": cube.time_col,
+    }
+
+
+# === Zone drill-down (precomputed by predict_and_optimize.py) ===
+_hierarchy_cache = {"mtime": None, "table": None}
+
+
+def _load_hierarchy():
+    if not os.path.exists(HIERARCHY_PATH):
+        raise HTTPException(status_code=404, detail="Zone hierarchy not found. Run predict_and_optimize.py first.")
+    mtime = os.path.getmtime(HIERARCHY_PATH)
+    if _hierarchy_cache["mtime"] != mtime:
+        _hierarchy_cache["table"] = load_hierarchy(HIERARCHY_PATH)
+        _hierarchy_cache["mtime"] = mtime
+    return _hierarchy_cache["table"]
+
+
+@app.get("/zones/drilldown")
+def get_zone_drilldown(parent: str = ROOT, metric: str = "mean_time", format: str = "json"):
+    """Heatmap of `parent`'s child groups × time slot (json or png)."""
+    table = _load_hierarchy()
+    try:
+        pivot = drilldown(table, parent, metric)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if format == "png":
+        safe_parent = "".join(ch if ch.isalnum() or ch in "._-" else "_" for ch in parent)
+        out = f"outputs/drilldown/{safe_parent}_{metric}.png"
+        if not os.path.exists(out) or os.path.getmtime(out) < _hierarchy_cache["mtime"]:
+            _draw_heatmap(pivot, f"{metric.replace('_', ' ').title()} — zone group {parent}",
+                          metric.replace("_", " ").title(), out, fmt=".2f", tier="preview")
+        return FileResponse(out, media_type="image/png")
+
+    return {
+        "parent": parent,
+        "metric": metric,
+        "row_labels": pivot.index.tolist(),
+        "col_labels": pivot.columns.tolist(),
+        "values": pivot.round(4).to_numpy().tolist(),
+        "children": children(table, parent),
+    }
+
+
 @app.post("/generate-heatmaps")
-def generate_heatmaps():
+def generate_heatmaps(tier: str = "export"):
+    if tier not in RENDER_TIERS:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown render tier '{tier}'. Choose from {list(RENDER_TIERS)}")
     try:
         df = pd.read_csv("outputs/predictions_full_report.csv")
-        generate_heatmap(df, output_path="outputs/zone_time_heatmap.png")
-        generate_delay_heatmap(df, output_path="outputs/delay_heatmap_by_time_slot.png")
+        generate_heatmap(df, output_path="outputs/zone_time_heatmap.png", tier=tier)
+        generate_delay_heatmap(df, output_path="outputs/delay_heatmap.png", tier=tier)
         return {"message": "✅ Heatmaps generated successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating heatmaps: {str(e)}")
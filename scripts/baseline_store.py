@@ -0,0 +1,104 @@
+# scripts/baseline_store.py
+# ----------------------------------------------------------------------
+# Historical baseline per zone_pair × time_slot, used by /predict as a
+# fallback when the live models would miss the latency SLO.
+# • median / p90 actual_time_min, delay rate (> 90 min) and the share of
+#   each delay class, from the non-anomalous rows of the enhanced dataset
+# • Cells with fewer than MIN_CELL_ROWS rows are dropped; lookups fall back
+#   zone_pair × time_slot → zone_pair → time_slot → global
+# • Loaded into a dict, so a lookup is O(1)
+#
+#   python -m scripts.baseline_store
+# ----------------------------------------------------------------------
+
+import os
+import numpy as np
+import pandas as pd
+
+DATA_PATH     = "data/lade_delivery_enhanced.csv"
+BASELINE_PATH = "models/zone_pair_baseline.csv"
+ANY           = "*"
+MIN_CELL_ROWS = 20
+DELAY_BINS    = [40, 70]          # delay classes, as in train_model.py
+DELAY_MINUTES = 90                # delay_label threshold in add_features
+CLASS_COLS    = ["p_on_time", "p_delayed", "p_very_delayed"]
+
+
+def _stats(df: pd.DataFrame, keys: list, min_rows: int = MIN_CELL_ROWS) -> pd.DataFrame:
+    g = df.groupby(keys, observed=True, sort=False)
+    out = g["actual_time_min"].quantile([0.5, 0.9]).unstack()
+    out.columns = ["median_time_min", "p90_time_min"]
+    out[["delay_rate", *CLASS_COLS]] = g[["is_delayed", *CLASS_COLS]].mean()
+    out["count"] = g.size()
+    return out[out["count"] >= min_rows].reset_index()
+
+
+def build_baseline(df: pd.DataFrame, path: str = BASELINE_PATH) -> pd.DataFrame:
+    """Long table with zone_pair / time_slot = '*' rows for the coarser levels."""
+    if "is_anomaly" in df:
+        df = df[df["is_anomaly"] == 0]
+    df = pd.DataFrame({
+        "zone_pair": df["zone_pair"].astype(str).to_numpy(),
+        "time_slot": df["time_slot"].astype(str).to_numpy(),
+        "actual_time_min": df["actual_time_min"].to_numpy(dtype=float),
+    })
+    df["is_delayed"] = df["actual_time_min"] > DELAY_MINUTES
+    delay_class = np.digitize(df["actual_time_min"], DELAY_BINS, right=True)
+    for c, col in enumerate(CLASS_COLS):
+        df[col] = delay_class == c
+
+    parts = [
+        _stats(df, ["zone_pair", "time_slot"]),
+        _stats(df, ["zone_pair"]).assign(time_slot=ANY),
+        _stats(df, ["time_slot"]).assign(zone_pair=ANY),
+        _stats(df.assign(zone_pair=ANY), ["zone_pair"], min_rows=1).assign(time_slot=ANY),
+    ]
+    table = pd.concat(parts, ignore_index=True)[
+        ["zone_pair", "time_slot", "count", "median_time_min", "p90_time_min", "delay_rate", *CLASS_COLS]
+    ].round(4)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table.to_csv(path, index=False)
+    print(f"✅ Baseline store saved → {path} — {len(table):,} cells")
+    return table
+
+
+class BaselineStore:
+    def __init__(self, table: pd.DataFrame):
+        records = table.drop(columns=["zone_pair", "time_slot"]).to_dict(orient="records")
+        self._cells = dict(zip(zip(table["zone_pair"], table["time_slot"]), records))
+
+    @classmethod
+    def load(cls, path: str = BASELINE_PATH) -> "BaselineStore":
+        return cls(pd.read_csv(path, dtype={"zone_pair": str, "time_slot": str}))
+
+    def lookup(self, zone_pair: str, time_slot: str) -> tuple:
+        """(cell stats, level used) — most specific populated cell wins."""
+        for key, level in (((zone_pair, time_slot), "zone_pair×time_slot"),
+                           ((zone_pair, ANY), "zone_pair"),
+                           ((ANY, time_slot), "time_slot"),
+                           ((ANY, ANY), "global")):
+            cell = self._cells.get(key)
+            if cell is not None:
+                return cell, level
+        raise KeyError("Baseline store has no global row")
+
+    def predict(self, from_zone: str, to_zone: str, time_slot: str) -> dict:
+        """/predict response fields answered from history."""
+        cell, level = self.lookup(f"{from_zone}-{to_zone}", time_slot)
+        shares = [cell[c] for c in CLASS_COLS]
+        delay_class = int(np.argmax(shares))
+        return {
+            "delay_class": delay_class,
+            "delay_confidence": round(shares[delay_class] * 100, 2),
+            "estimated_duration_min": round(cell["median_time_min"], 2),
+            "p90_duration_min": round(cell["p90_time_min"], 2),
+            "delay_rate": round(cell["delay_rate"], 4),
+            "baseline_level": level,
+            "baseline_rows": int(cell["count"]),
+        }
+
+
+# ── CLI entry point ───────────────────────────────────────────────────────
+if __name__ == "__main__":
+    print(f"📥 Loading {DATA_PATH} …")
+    build_baseline(pd.read_csv(DATA_PATH, usecols=["zone_pair", "time_slot", "actual_time_min", "is_anomaly"]))
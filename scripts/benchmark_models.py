@@ -0,0 +1,139 @@
+"""
+Benchmark candidate serving models on train_model.py's feature set
+• Regressors are fitted on the log target like the production RF; their
+  balanced accuracy uses the delay class implied by the predicted minutes
+• Classifiers report balanced accuracy only
+• Per candidate: fit time, MAE / RMSE, balanced accuracy, single‑row and
+  10k‑batch inference latency, serialized size and load time
+Writes outputs/model_benchmark.csv.
+
+    python -m scripts.benchmark_models --candidates rf_default,hgb,ridge
+"""
+
+import io, os, time, argparse, joblib, numpy as np, pandas as pd
+from math import sqrt
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge, LogisticRegression
+from sklearn.metrics import balanced_accuracy_score, mean_absolute_error, mean_squared_error
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier, XGBRegressor
+
+from scripts.train_model import (
+    FEATURE_COLS, CLF_PARAMS, REG_PARAMS, REG_OOC_PARAMS,
+    load_training_data, delay_classes, class_sample_weight,
+)
+
+OUT_CSV      = "outputs/model_benchmark.csv"
+BATCH_ROWS   = 10_000
+SINGLE_CALLS = 200
+
+CANDIDATES = {
+    # duration regressors (log target)
+    "rf_default": ("regressor", lambda: RandomForestRegressor(**REG_PARAMS)),
+    "rf_small":   ("regressor", lambda: RandomForestRegressor(**{**REG_PARAMS, "n_estimators": 30, "max_depth": 10})),
+    "hgb":        ("regressor", lambda: HistGradientBoostingRegressor(max_iter=200, learning_rate=0.1, random_state=42)),
+    "xgb_reg":    ("regressor", lambda: XGBRegressor(**REG_OOC_PARAMS)),
+    "ridge":      ("regressor", lambda: make_pipeline(StandardScaler(), Ridge(alpha=1.0))),
+    # delay classifiers
+    "xgb_clf":    ("classifier", lambda: XGBClassifier(**CLF_PARAMS)),
+    "logreg":     ("classifier", lambda: make_pipeline(StandardScaler(),
+                                                      LogisticRegression(max_iter=500, class_weight="balanced"))),
+}
+
+
+def _latency(model, X: pd.DataFrame) -> tuple:
+    """(median ms for one row, best‑of‑3 ms for a BATCH_ROWS batch)."""
+    row = X.iloc[[0]]
+    model.predict(row)                      # warm‑up
+    singles = []
+    for _ in range(SINGLE_CALLS):
+        t0 = time.perf_counter()
+        model.predict(row)
+        singles.append(time.perf_counter() - t0)
+
+    batch = X.iloc[:BATCH_ROWS]
+    if len(batch) < BATCH_ROWS:
+        batch = batch.sample(BATCH_ROWS, replace=True, random_state=0)
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        model.predict(batch)
+        best = min(best, time.perf_counter() - t0)
+    return 1000 * float(np.median(singles)), 1000 * best
+
+
+def _size_and_load(model) -> tuple:
+    buf = io.BytesIO()
+    joblib.dump(model, buf)
+    size_kb = buf.tell() / 1024
+    buf.seek(0)
+    t0 = time.perf_counter()
+    joblib.load(buf)
+    return size_kb, 1000 * (time.perf_counter() - t0)
+
+
+def benchmark(names: list = None) -> pd.DataFrame:
+    names = names or list(CANDIDATES)
+    unknown = set(names) - set(CANDIDATES)
+    if unknown:
+        raise SystemExit(f"Unknown candidate(s): {', '.join(sorted(unknown))}. Choose from {list(CANDIDATES)}")
+
+    df = load_training_data()
+    X = df[FEATURE_COLS]
+    y_class = df["delay_label"]
+    X_tr, X_te, yc_tr, yc_te, t_tr, t_te = train_test_split(
+        X, y_class, df["actual_time_min"], test_size=0.2, random_state=42, stratify=y_class
+    )
+
+    rows = []
+    for name in names:
+        kind, factory = CANDIDATES[name]
+        model = factory()
+        print(f"⏱️  {name} ({kind}) …")
+        t0 = time.perf_counter()
+        if kind == "regressor":
+            model.fit(X_tr, np.log1p(t_tr))
+        elif name.startswith("xgb"):
+            model.fit(X_tr, yc_tr, sample_weight=class_sample_weight(yc_tr))
+        else:
+            model.fit(X_tr, yc_tr)
+        fit_s = time.perf_counter() - t0
+
+        row = {"model": name, "kind": kind, "fit_s": round(fit_s, 2)}
+        if kind == "regressor":
+            pred_min = np.expm1(model.predict(X_te))
+            row["mae_min"] = round(mean_absolute_error(t_te, pred_min), 3)
+            row["rmse_min"] = round(sqrt(mean_squared_error(t_te, pred_min)), 3)
+            pred_class = delay_classes(pd.Series(pred_min))
+        else:
+            row["mae_min"] = row["rmse_min"] = np.nan
+            pred_class = model.predict(X_te)
+        row["balanced_accuracy"] = round(balanced_accuracy_score(yc_te, pred_class), 4)
+
+        single_ms, batch_ms = _latency(model, X_te)
+        size_kb, load_ms = _size_and_load(model)
+        row.update({
+            "single_row_ms": round(single_ms, 3),
+            "batch_10k_ms": round(batch_ms, 2),
+            "size_kb": round(size_kb, 1),
+            "load_ms": round(load_ms, 1),
+        })
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    os.makedirs(os.path.dirname(OUT_CSV), exist_ok=True)
+    table.to_csv(OUT_CSV, index=False)
+    print("\n📊  MODEL BENCHMARK")
+    print(table.to_string(index=False))
+    print(f"\n💾  Saved → {OUT_CSV}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy vs latency vs size for candidate serving models.")
+    parser.add_argument("--candidates", default=",".join(CANDIDATES),
+                        help=f"comma-separated subset of: {', '.join(CANDIDATES)}")
+    args = parser.parse_args()
+    benchmark([c.strip() for c in args.candidates.split(",") if c.strip()])
@@ -0,0 +1,100 @@
+"""
+Scaling benchmark: every workflow stage on synthetic data of growing size.
+• Each size gets its own working directory (data/, models/, outputs/) so
+  runs don't touch the real artefacts; stages run as subprocesses via
+  pipeline._run_stage, which also measures each stage's peak RSS
+• Sizes above OOC_ROWS train with --out-of-core; prediction always uses
+  the chunked --batch path
+Writes outputs/scaling_benchmark.csv (one row per size × stage).
+
+    python -m scripts.benchmark_scaling --sizes 10000,100000,1000000
+    python -m scripts.benchmark_scaling --sizes 50000000 --keep
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import pandas as pd
+
+from scripts.pipeline import _run_stage
+from scripts.synthetic_dataset import generate
+
+OUT_CSV   = "outputs/scaling_benchmark.csv"
+SIZES     = [10_000, 100_000, 1_000_000]
+OOC_ROWS  = 5_000_000
+
+STAGES = [
+    {"name": "feature_engineering", "module": "scripts.feature_engineering"},
+    {"name": "train_model",         "module": "scripts.train_model"},
+    {"name": "predict",             "module": "scripts.predict_and_optimize", "args": ["--batch", "--merge"]},
+    {"name": "supplier_scores",     "module": "scripts.supplier_score_engine"},
+    {"name": "cost_analysis",       "module": "scripts.cost_analysis_from_hf"},
+    {"name": "heatmaps",            "module": "scripts.heatmap_generator", "args": ["--suite"]},
+]
+
+
+def _stages_for(rows: int) -> list:
+    stages = [dict(s) for s in STAGES]
+    if rows > OOC_ROWS:
+        stages[1]["args"] = ["--out-of-core"]
+    return stages
+
+
+def run_size(rows: int, workdir: str, stages: list = None) -> list:
+    for sub in ("data", "models", "outputs"):
+        os.makedirs(os.path.join(workdir, sub), exist_ok=True)
+
+    t0 = time.perf_counter()
+    generate(rows, os.path.join(workdir, "data", "lade_delivery_cleaned.csv"))
+    results = [{"rows": rows, "stage": "generate", "status": "ok",
+                "wall_s": round(time.perf_counter() - t0, 2), "peak_rss_mb": None}]
+
+    for stage in _stages_for(rows):
+        if stages and stage["name"] not in stages:
+            continue
+        print(f"▶️  {rows:,} rows — {stage['name']}")
+        res = _run_stage(stage, cwd=workdir)
+        ok = res["returncode"] == 0
+        results.append({"rows": rows, "stage": stage["name"], "status": "ok" if ok else "failed",
+                        "wall_s": res["wall_s"], "peak_rss_mb": res["peak_rss_mb"]})
+        print(f"{'✅' if ok else '❌'} {stage['name']}: {res['wall_s']}s, peak {res['peak_rss_mb']} MB")
+        if not ok:
+            break                      # later stages depend on this one's outputs
+    return results
+
+
+def benchmark(sizes: list = SIZES, stages: list = None, keep: bool = False) -> pd.DataFrame:
+    rows = []
+    for n in sizes:
+        workdir = tempfile.mkdtemp(prefix=f"scaling_{n}_")
+        try:
+            rows.extend(run_size(n, workdir, stages))
+        finally:
+            if keep:
+                print(f"📂 kept {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    table = pd.DataFrame(rows)
+    table["rows_per_s"] = (table["rows"] / table["wall_s"].where(table["wall_s"] > 0)).round(0)
+    os.makedirs(os.path.dirname(OUT_CSV), exist_ok=True)
+    table.to_csv(OUT_CSV, index=False)
+
+    print("\n📊  SCALING BENCHMARK (wall s / peak MB)")
+    wide = table.pivot(index="stage", columns="rows", values=["wall_s", "peak_rss_mb"])
+    print(wide.reindex(["generate"] + [s["name"] for s in STAGES]).dropna(how="all").to_string())
+    print(f"\n💾  Saved → {OUT_CSV}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and peak memory per stage at several data sizes.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma-separated row counts (10k to 50M)")
+    parser.add_argument("--stages", default=None, help="comma-separated subset of stages")
+    parser.add_argument("--keep", action="store_true", help="keep the per-size working directories")
+    args = parser.parse_args()
+    benchmark([int(s) for s in args.sizes.split(",")],
+              args.stages.split(",") if args.stages else None, args.keep)
@@ -0,0 +1,158 @@
+"""
+Streaming bulk scoring for POST /predict/bulk.
+• The request body (CSV) is re‑blocked into pieces of ~chunk_bytes that end
+  on a newline; each piece is parsed with the header prepended
+• Every block is scored with the same features as /predict (prepare_model_input
+  → scaler → classifier / regressor), optionally plus the reroute policy,
+  in a worker thread
+• Scored blocks are yielded as CSV while the upload is still arriving, so
+  memory holds a few blocks whatever the file size
+Input columns are echoed back verbatim (parsed as strings). Rows with a
+missing or non‑numeric required field, or the wrong number of fields, are
+passed through with empty predictions and status="invalid". If a block
+still fails, the stream ends with an ERROR_MARKER line instead of being
+silently cut short. Quoted fields containing newlines are not supported.
+"""
+
+import io
+import csv
+import numpy as np
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+from scripts.feature_engineering import prepare_model_input
+from scripts.rl_agent.agent_runner import get_rl_optimal_reroute_batch
+
+CHUNK_MB     = 4
+MAX_CHUNK_MB = 64
+ERROR_MARKER = "#ERROR"
+# required field → accepted column names
+REQUIRED = {
+    "from_zone": ("from_zone",),
+    "to_zone":   ("to_zone",),
+    "time_slot": ("time_slot",),
+    "weight":    ("weight", "weight_kg"),
+    "distance":  ("distance", "distance_km"),
+}
+
+
+def resolve_columns(header: bytes) -> tuple:
+    """(field → column name, missing fields) for a CSV header line."""
+    columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+    found, missing = {}, []
+    for field, names in REQUIRED.items():
+        name = next((n for n in names if n in columns), None)
+        if name is None:
+            missing.append(f"{field} ({' or '.join(names)})")
+        else:
+            found[field] = name
+    return found, missing
+
+
+async def csv_blocks(stream, chunk_bytes: int):
+    """Re-block an async byte stream into pieces of ≥ chunk_bytes ending on a newline."""
+    buf = bytearray()
+    async for piece in stream:
+        buf += piece
+        if len(buf) >= chunk_bytes:
+            cut = buf.rfind(b"\n") + 1
+            if cut:
+                yield bytes(buf[:cut])
+                del buf[:cut]
+    if buf.strip():
+        yield bytes(buf)
+
+
+def parse_block(header: bytes, block: bytes) -> tuple:
+    """(frame of strings, malformed‑row mask). Every column is read as text so
+    echoed values keep their exact form in every block."""
+    try:
+        df = pd.read_csv(io.BytesIO(header + block), dtype=str, keep_default_na=False)
+        # with keep_default_na=False blanks stay "", so NaN only comes from short lines
+        return df, df.isna().any(axis=1).to_numpy()
+    except pd.errors.ParserError:                    # a line with too many fields
+        pass
+    # slow path: csv module, rows with the wrong field count padded / cut and flagged
+    names = next(csv.reader([header.decode("utf-8", errors="replace")]))
+    rows, bad = [], []
+    for fields in csv.reader(io.StringIO(block.decode("utf-8", errors="replace"))):
+        if not fields:
+            continue
+        bad.append(len(fields) != len(names))
+        rows.append((fields + [""] * len(names))[:len(names)])
+    return pd.DataFrame(rows, columns=names, dtype=str), np.asarray(bad, dtype=bool)
+
+
+def score_block(header: bytes, block: bytes, columns: dict, models: tuple,
+                reroute: bool, with_header: bool) -> bytes:
+    scaler, clf, reg = models
+    df, malformed = parse_block(header, block)
+    weight = pd.to_numeric(df[columns["weight"]], errors="coerce")
+    distance = pd.to_numeric(df[columns["distance"]], errors="coerce")
+    zones = df[[columns["from_zone"], columns["to_zone"], columns["time_slot"]]]
+    filled = zones.apply(lambda c: c.notna() & (c.str.strip() != "")).all(axis=1)
+    ok = (weight.notna() & distance.notna() & filled).to_numpy() & ~malformed
+    idx = df.index[ok]
+
+    cls = conf = duration = np.empty(0)
+    if ok.any():
+        raw = {
+            "from_zone": zones.iloc[ok, 0].to_numpy(),
+            "to_zone":   zones.iloc[ok, 1].to_numpy(),
+            "time_slot": zones.iloc[ok, 2].to_numpy(),
+            "weight":    weight[ok].to_numpy(dtype=float),
+            "distance":  distance[ok].to_numpy(dtype=float),
+        }
+        X = scaler.transform(prepare_model_input(raw, for_training=True))
+        proba = clf.predict_proba(X).astype(np.float64)   # float32 would print as 40.11000061…
+        cls = proba.argmax(axis=1)
+        conf = (100 * proba.max(axis=1)).round(2)
+        duration = np.expm1(reg.predict(X).astype(np.float64)).round(2)
+
+    df["delay_class"] = pd.Series(cls, index=idx, dtype="Int64").reindex(df.index)
+    df["delay_confidence"] = pd.Series(conf, index=idx, dtype=float).reindex(df.index)
+    df["estimated_duration_min"] = pd.Series(duration, index=idx, dtype=float).reindex(df.index)
+
+    if reroute:
+        actions = pd.DataFrame({"rl_action": pd.Series(dtype=object), "rl_action_id": pd.Series(dtype="Int64")})
+        if ok.any():
+            state = pd.DataFrame({
+                "distance_km": distance[ok],
+                "weight_kg": weight[ok],
+                "predicted_time_min": duration,
+                "same_zone": (zones.iloc[ok, 0] == zones.iloc[ok, 1]).astype(int),
+                "time_slot": zones.iloc[ok, 2],
+            })
+            for col in ("traffic", "weather"):            # the policy takes them as 0–1 levels
+                if col in df:
+                    text = df.loc[ok, col].str.strip()
+                    level = pd.to_numeric(text, errors="coerce")
+                    if level.notna().sum() == (text != "").sum():   # numeric column (blanks allowed)
+                        state[col] = level.fillna(0.5)
+            actions = get_rl_optimal_reroute_batch(state)
+        df["rl_action"] = actions["rl_action"].reindex(df.index)
+        df["rl_action_id"] = actions["rl_action_id"].astype("Int64").reindex(df.index)
+
+    df["status"] = np.where(ok, "ok", "invalid")
+    return df.to_csv(index=False, header=with_header).encode()
+
+
+async def score_stream(header: bytes, first: bytes, blocks, columns: dict,
+                       models: tuple, reroute: bool):
+    """Yield the scored CSV block by block; the header is written once.
+    An unexpected failure ends the stream with an ERROR_MARKER line, since the
+    200 status and earlier blocks have already been sent."""
+    with_header = True
+    pending = first
+    try:
+        while pending is not None:
+            if pending.strip():
+                yield await run_in_threadpool(score_block, header, pending, columns, models,
+                                              reroute, with_header)
+                with_header = False
+            pending = await anext(blocks, None)
+        if with_header:                    # header only: echo it back with no rows
+            yield await run_in_threadpool(score_block, header, b"", columns, models, reroute, True)
+    except Exception as e:
+        print(f"❌ Bulk scoring failed mid-stream: {e}")
+        yield f"{ERROR_MARKER},{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}\n".encode()
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+import json
 import os
 
 # === Configurable cost parameters ===
@@ -7,6 +8,16 @@ BASE_COST = 10
 PER_KM_RATE = 5
 PER_MIN_RATE = 1
 
+# === Aggregate settings (served by /cost-aggregates) ===
+AGG_PATH = "outputs/cost_aggregates.json"
+PERCENTILES = [5, 25, 50, 75, 90, 95, 99]
+COST_BINS = [0, 25, 50, 75, 100, 150, 200, 300, 500, 1000, 2500]
+AGG_GROUPS = {
+    "zone": "from_zone",
+    "time_slot": "time_slot",
+    "distance_category": "distance_category",
+}
+
 # Step 1: Load preprocessed cleaned dataset
 df = pd.read_csv("data/lade_delivery_enhanced.csv")
 print("✅ Loaded enhanced dataset:", df.shape)
@@ -53,3 +64,69 @@ cost_outliers.to_csv("outputs/anomalies/cost_outliers.csv", index=False)
 duration_outliers.to_csv("outputs/anomalies/duration_outliers.csv", index=False)
 distance_outliers.to_csv("outputs/anomalies/distance_outliers.csv", index=False)
 print("✅ Anomaly reports saved in outputs/anomalies/")
+
+# === Step 7: Precomputed aggregates ===
+print("\n📦 Building cost aggregates …")
+
+def _histogram(series):
+    """Fixed-bin counts (last bin includes its right edge, as in np.histogram);
+    values below the first edge (negative costs) land in `underflow`,
+    values above the last one in `overflow`."""
+    values = series.dropna().to_numpy()
+    counts, _ = np.histogram(values, bins=COST_BINS)
+    return {
+        "counts": counts.tolist(),
+        "underflow": int((values < COST_BINS[0]).sum()),
+        "overflow": int((values > COST_BINS[-1]).sum()),
+    }
+
+def _summary(series):
+    pct = np.percentile(series.dropna(), PERCENTILES) if series.notna().any() else [0.0] * len(PERCENTILES)
+    return {
+        "count": int(series.count()),
+        "mean": round(float(series.mean()), 2) if series.notna().any() else 0.0,
+        "total": round(float(series.sum()), 2),
+        "percentiles": {f"p{q}": round(float(v), 2) for q, v in zip(PERCENTILES, pct)},
+        "histogram": _histogram(series),
+    }
+
+def build_cost_aggregates(frame):
+    cost = frame["delivery_cost"]
+    aggregates = {
+        "bins": COST_BINS,
+        "percentiles": PERCENTILES,
+        "overall": _summary(cost),
+        "anomaly_counts": {
+            "cost": len(cost_outliers),
+            "duration": len(duration_outliers),
+            "distance": len(distance_outliers),
+        },
+        "groups": {},
+    }
+    for name, col in AGG_GROUPS.items():
+        if col not in frame.columns:
+            continue
+        grouped = frame.groupby(col, observed=True)["delivery_cost"]
+        stats = grouped.agg(["count", "mean", "sum"])
+        quantiles = grouped.quantile([q / 100 for q in PERCENTILES]).unstack()
+        histograms = {key: _histogram(g) for key, g in grouped}
+        rows = []
+        for key, row in stats.iterrows():
+            rows.append({
+                "key": str(key),
+                "count": int(row["count"]),
+                "mean": round(float(row["mean"]), 2),
+                "total": round(float(row["sum"]), 2),
+                "percentiles": {
+                    f"p{q}": round(float(v), 2)
+                    for q, v in zip(PERCENTILES, quantiles.loc[key].to_numpy())
+                },
+                "histogram": histograms[key],
+            })
+        aggregates["groups"][name] = rows
+    return aggregates
+
+aggregates = build_cost_aggregates(df)
+with open(AGG_PATH, "w") as f:
+    json.dump(aggregates, f)
+print(f"✅ Cost aggregates saved → {AGG_PATH} ({os.path.getsize(AGG_PATH) / 1024:.1f} KB)")
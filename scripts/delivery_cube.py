@@ -0,0 +1,195 @@
+# scripts/delivery_cube.py
+# ----------------------------------------------------------------------
+# Precomputed aggregate cube over
+#   zone_group × time_slot × weight_category × distance_category × delay_class
+# storing count, sums and sums of squares, so any heatmap / rollup the
+# dashboard asks for is answered without re-scanning the predictions CSV.
+# ----------------------------------------------------------------------
+
+import os
+import numpy as np
+import pandas as pd
+
+from scripts.heatmap_generator import TIME_SLOT_ORDER, _zone_group_series
+
+PRED_CSV  = "outputs/predictions_full_report.csv"
+CUBE_PATH = "outputs/delivery_cube.npz"
+
+DIMS = ["zone_group", "time_slot", "weight_category", "distance_category", "delay_class"]
+MEASURES = [
+    "count",
+    "time_sum", "time_sumsq",
+    "delay_sum",
+    "eff_sum", "eff_sumsq",
+    "dist_sum", "dist_sumsq",
+]
+DELAY_CLASS_BINS = [40, 70]          # same thresholds as train_model.classify_delay
+
+
+# ─────────────────────────── metrics ──────────────────────────────────────
+def _safe_div(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, 0.0)
+
+
+def _std(s, total, sumsq):
+    mean = _safe_div(s[total], s["count"])
+    var = _safe_div(s[sumsq], s["count"]) - mean ** 2
+    return np.sqrt(np.clip(var, 0, None))
+
+
+METRICS = {
+    "count":             lambda s: s["count"],
+    "mean_time":         lambda s: _safe_div(s["time_sum"], s["count"]),
+    "std_time":          lambda s: _std(s, "time_sum", "time_sumsq"),
+    "delay_probability": lambda s: _safe_div(s["delay_sum"], s["count"]),
+    "efficiency":        lambda s: _safe_div(s["eff_sum"], s["count"]),
+    "std_efficiency":    lambda s: _std(s, "eff_sum", "eff_sumsq"),
+    "mean_distance":     lambda s: _safe_div(s["dist_sum"], s["count"]),
+    "std_distance":      lambda s: _std(s, "dist_sum", "dist_sumsq"),
+}
+
+
+# ─────────────────────────── cube ─────────────────────────────────────────
+class DeliveryCube:
+    """Dense cube: `data[z, t, w, d, c, m]` holds measure `m` for one cell."""
+
+    def __init__(self, labels: dict, data: np.ndarray, time_col: str):
+        self.labels = labels
+        self.data = data
+        self.time_col = time_col
+
+    # ------------------------------------------------------------- build
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "DeliveryCube":
+        """Aggregate a predictions frame in one pass (no mutation of `df`)."""
+        time_col = next((c for c in ("predicted_time_min", "actual_time_min") if c in df), None)
+        if time_col is None:
+            raise ValueError("Cube needs predicted_time_min or actual_time_min.")
+        actual = df["actual_time_min"] if "actual_time_min" in df else df[time_col]
+
+        keys = {
+            "zone_group": _zone_group_series(df),
+            "time_slot": df["time_slot"] if "time_slot" in df else pd.Series("all", index=df.index),
+            "weight_category": df["weight_category"] if "weight_category" in df else pd.Series("all", index=df.index),
+            "distance_category": df["distance_category"] if "distance_category" in df else pd.Series("all", index=df.index),
+            "delay_class": pd.Series(np.digitize(actual.to_numpy(), DELAY_CLASS_BINS, right=True), index=df.index),
+        }
+
+        labels, codes = {}, []
+        for dim in DIMS:
+            cat = pd.Categorical(keys[dim])
+            if (cat.codes < 0).any():
+                cat = cat.add_categories("unknown").fillna("unknown")
+            cats = list(cat.categories)
+            if dim == "time_slot":
+                cats = [t for t in TIME_SLOT_ORDER if t in cats] + [t for t in cats if t not in TIME_SLOT_ORDER]
+                cat = cat.reorder_categories(cats)
+            labels[dim] = np.array([str(c) for c in cats], dtype=str)
+            codes.append(cat.codes.astype(np.int64))
+
+        shape = tuple(len(labels[d]) for d in DIMS)
+        flat = np.ravel_multi_index(codes, shape)
+        n_cells = int(np.prod(shape))
+
+        t = df[time_col].to_numpy(dtype=float)
+        dist = df["distance_km"].to_numpy(dtype=float) if "distance_km" in df else np.zeros(len(df))
+        eff = dist / (actual.to_numpy(dtype=float) + 1)
+        delayed = (actual.to_numpy(dtype=float) > 90).astype(float)
+
+        weights = {
+            "count": None,
+            "time_sum": t, "time_sumsq": t * t,
+            "delay_sum": delayed,
+            "eff_sum": eff, "eff_sumsq": eff * eff,
+            "dist_sum": dist, "dist_sumsq": dist * dist,
+        }
+        data = np.stack(
+            [np.bincount(flat, weights=weights[m], minlength=n_cells) for m in MEASURES],
+            axis=-1,
+        ).reshape(*shape, len(MEASURES))
+        return cls(labels, data, time_col)
+
+    # -------------------------------------------------------- persistence
+    def save(self, path: str = CUBE_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(
+            path,
+            data=self.data,
+            time_col=np.array(self.time_col),
+            **{f"labels_{d}": self.labels[d] for d in DIMS},
+        )
+        print(f"✅ Cube saved → {path} — shape={self.data.shape}")
+
+    @classmethod
+    def load(cls, path: str = CUBE_PATH) -> "DeliveryCube":
+        with np.load(path) as z:
+            labels = {d: z[f"labels_{d}"] for d in DIMS}
+            return cls(labels, z["data"], str(z["time_col"]))
+
+    # -------------------------------------------------------------- query
+    def pivot(self, index: str = "zone_group", columns: str = "time_slot",
+              metric: str = "mean_time", filters: dict = None) -> dict:
+        """Roll the cube up to `index` × `columns` and evaluate `metric`.
+
+        `filters` maps a dimension to the labels to keep, e.g.
+        {"distance_category": ["long", "very_long"]}.
+        """
+        if index not in DIMS or columns not in DIMS or index == columns:
+            raise ValueError(f"index/columns must be two different dims from {DIMS}")
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from {list(METRICS)}")
+
+        data = self.data
+        for dim, keep in (filters or {}).items():
+            if dim not in DIMS:
+                raise ValueError(f"Unknown filter dimension '{dim}'")
+            idx = np.flatnonzero(np.isin(self.labels[dim], [str(k) for k in keep]))
+            data = np.take(data, idx, axis=DIMS.index(dim))
+
+        i_ax, c_ax = DIMS.index(index), DIMS.index(columns)
+        other = tuple(a for a in range(len(DIMS)) if a not in (i_ax, c_ax))
+        rolled = data.sum(axis=other)                      # (i or c first, …, measures)
+        if i_ax > c_ax:
+            rolled = rolled.transpose(1, 0, 2)
+        sums = {m: rolled[..., k] for k, m in enumerate(MEASURES)}
+        values = METRICS[metric](sums)
+
+        row_labels, col_labels = self.labels[index], self.labels[columns]
+        if index in (filters or {}):
+            row_labels = row_labels[np.isin(row_labels, [str(k) for k in filters[index]])]
+        if columns in (filters or {}):
+            col_labels = col_labels[np.isin(col_labels, [str(k) for k in filters[columns]])]
+
+        return {
+            "index": index,
+            "columns": columns,
+            "metric": metric,
+            "time_col": self.time_col,
+            "row_labels": row_labels.tolist(),
+            "col_labels": col_labels.tolist(),
+            "values": np.round(values, 4).tolist(),
+            "counts": sums["count"].astype(int).tolist(),
+        }
+
+    def to_frame(self, index: str = "zone_group", columns: str = "time_slot",
+                 metric: str = "mean_time", filters: dict = None) -> pd.DataFrame:
+        """Same as `pivot`, returned in the layout `_draw_heatmap` expects."""
+        p = self.pivot(index, columns, metric, filters)
+        return pd.DataFrame(
+            p["values"],
+            index=pd.Index(p["row_labels"], name=index),
+            columns=pd.Index(p["col_labels"], name=columns),
+        )
+
+
+def build_cube(df: pd.DataFrame, path: str = CUBE_PATH) -> DeliveryCube:
+    cube = DeliveryCube.from_frame(df)
+    cube.save(path)
+    return cube
+
+
+# ── CLI entry point ───────────────────────────────────────────────────────
+if __name__ == "__main__":
+    print(f"📥 Loading {PRED_CSV} …")
+    build_cube(pd.read_csv(PRED_CSV))
@@ -0,0 +1,300 @@
+"""
+Constant‑memory drift monitoring for /predict inputs.
+• QuantileSketch  : log‑bucketed histogram of a non‑negative feature
+                    (relative error REL_ERR, at most MAX_BINS buckets)
+• CategoryCounter : counts for at most MAX_CATEGORIES values, the rest
+                    pooled under OTHER
+• NumericStats    : sketch + running mean / std + exponentially weighted mean
+train_model.py saves reference statistics built with the same sketches
+(models/drift_reference.json); /drift compares live traffic against them with
+the population stability index (PSI) and the mean shift in reference σ.
+Each observation is a handful of dict updates, whatever the traffic volume.
+"""
+
+import os
+import json
+import math
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+REFERENCE_PATH = "models/drift_reference.json"
+
+# request field → training column
+NUMERIC     = {"distance": "distance_km", "weight": "weight_kg"}
+CATEGORICAL = {"time_slot": "time_slot", "traffic": "traffic", "weather": "weather"}
+
+REL_ERR        = 0.01
+MAX_BINS       = 2048
+MIN_POSITIVE   = 1e-9           # values at or below go to the zero bucket
+MAX_CATEGORIES = 64
+OTHER          = "__other__"
+QUANTILES      = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+PSI_BINS       = 10             # reference deciles
+PSI_EPS        = 1e-4
+PSI_WARN, PSI_ALERT = 0.1, 0.25
+EWMA_ALPHA     = 0.01
+MIN_SAMPLES    = 200
+STATUS_ORDER   = ["ok", "warn", "drift"]
+
+
+# ─────────────────────────── sketches ─────────────────────────────────────
+class QuantileSketch:
+    """Bucket k holds values in (γ^(k-1), γ^k]; when there are more than
+    MAX_BINS buckets the lowest ones are folded together."""
+
+    def __init__(self, rel_err: float = REL_ERR, max_bins: int = MAX_BINS):
+        self.gamma = (1 + rel_err) / (1 - rel_err)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = {}
+        self.zero = 0
+        self.count = 0
+        self.min, self.max = math.inf, -math.inf
+
+    def _key(self, x: float) -> int:
+        return math.ceil(math.log(x) / self.log_gamma)
+
+    def _value(self, k: int) -> float:
+        return 2 * self.gamma ** k / (self.gamma + 1)
+
+    def add(self, x: float):
+        self.count += 1
+        self.min, self.max = min(self.min, x), max(self.max, x)
+        if x <= MIN_POSITIVE:
+            self.zero += 1
+            return
+        k = self._key(x)
+        self.bins[k] = self.bins.get(k, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def add_many(self, values: np.ndarray):
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min, self.max = min(self.min, values.min()), max(self.max, values.max())
+        pos = values[values > MIN_POSITIVE]
+        self.zero += len(values) - len(pos)
+        keys, counts = np.unique(np.ceil(np.log(pos) / self.log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            self.bins[k] = self.bins.get(k, 0) + c
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.bins)
+        extra = len(keys) - self.max_bins
+        self.bins[keys[extra]] += sum(self.bins.pop(k) for k in keys[:extra])
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return float(self.min)
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if seen > rank:
+                return float(min(max(self._value(k), self.min), self.max))
+        return float(self.max)
+
+    def cdf(self, x: float) -> float:
+        """Fraction of values ≤ x (to bucket resolution)."""
+        if not self.count:
+            return 0.0
+        if x <= MIN_POSITIVE:
+            return self.zero / self.count if x >= 0 else 0.0
+        k = self._key(x)
+        return (self.zero + sum(c for key, c in self.bins.items() if key <= k)) / self.count
+
+
+class CategoryCounter:
+    def __init__(self, max_categories: int = MAX_CATEGORIES):
+        self.max_categories = max_categories
+        self.counts = {}
+        self.count = 0
+
+    def add(self, value, n: int = 1):
+        key = str(value)
+        if key not in self.counts and len(self.counts) >= self.max_categories:
+            key = OTHER
+        self.counts[key] = self.counts.get(key, 0) + n
+        self.count += n
+
+    def add_many(self, values: pd.Series):
+        for value, n in values.dropna().astype(str).value_counts().items():
+            self.add(value, int(n))
+
+    def frequencies(self) -> dict:
+        return {k: c / self.count for k, c in self.counts.items()} if self.count else {}
+
+
+class NumericStats:
+    def __init__(self):
+        self.sketch = QuantileSketch()
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        self.ewma = None
+
+    def add(self, x: float):
+        x = float(x)
+        if not math.isfinite(x):
+            return
+        self.sketch.add(x)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.ewma = x if self.ewma is None else self.ewma + EWMA_ALPHA * (x - self.ewma)
+
+    def add_many(self, values: np.ndarray):
+        v = np.asarray(values, dtype=float)
+        v = v[np.isfinite(v)]
+        if not len(v):
+            return
+        self.sketch.add_many(v)
+        n_b, mean_b = len(v), float(v.mean())
+        n = self.n + n_b
+        delta = mean_b - self.mean                  # Chan et al. parallel update
+        self.m2 += float(((v - mean_b) ** 2).sum()) + delta ** 2 * self.n * n_b / n
+        self.mean += delta * n_b / n
+        self.n = n
+        self.ewma = self.mean
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.n,
+            "mean": round(self.mean, 4),
+            "std": round(self.std, 4),
+            "ewma": None if self.ewma is None else round(self.ewma, 4),
+            "quantiles": {str(q): self.sketch.quantile(q) for q in QUANTILES},
+        }
+
+
+def psi(expected, actual) -> float:
+    e = np.clip(np.asarray(expected, dtype=float), PSI_EPS, None)
+    a = np.clip(np.asarray(actual, dtype=float), PSI_EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def _status(score: float) -> str:
+    return "drift" if score >= PSI_ALERT else "warn" if score >= PSI_WARN else "ok"
+
+
+# ─────────────────────────── reference (training time) ────────────────────
+def build_reference(frames) -> dict:
+    """Reference statistics from an iterable of training frames (streamed)."""
+    numeric = {f: NumericStats() for f in NUMERIC}
+    categorical = {f: CategoryCounter() for f in CATEGORICAL}
+    for frame in frames:
+        for f, col in NUMERIC.items():
+            if col in frame:
+                numeric[f].add_many(frame[col].to_numpy())
+        for f, col in CATEGORICAL.items():
+            if col in frame:
+                categorical[f].add_many(frame[col])
+
+    ref = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "numeric": {}, "categorical": {}}
+    for f, stats in numeric.items():
+        if not stats.n:
+            continue
+        edges = np.unique([stats.sketch.quantile(q) for q in np.arange(1, PSI_BINS) / PSI_BINS])
+        cdf = [0.0] + [stats.sketch.cdf(e) for e in edges] + [1.0]
+        ref["numeric"][f] = {**stats.summary(), "edges": edges.tolist(),
+                             "fractions": np.diff(cdf).tolist()}
+    for f, counter in categorical.items():
+        if counter.count:
+            ref["categorical"][f] = {"count": counter.count, "freq": counter.frequencies()}
+    return ref
+
+
+def save_reference(ref: dict, path: str = REFERENCE_PATH) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(ref, f, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+# ─────────────────────────── live monitor (API) ───────────────────────────
+class DriftMonitor:
+    def __init__(self, reference_path: str = REFERENCE_PATH):
+        self.reference_path = reference_path
+        self._lock = threading.Lock()
+        self._ref = {"mtime": None, "data": None}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.numeric = {f: NumericStats() for f in NUMERIC}
+            self.categorical = {f: CategoryCounter() for f in CATEGORICAL}
+            self.since = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def observe(self, record: dict):
+        with self._lock:
+            for f, stats in self.numeric.items():
+                if record.get(f) is not None:
+                    stats.add(record[f])
+            for f, counter in self.categorical.items():
+                if record.get(f) is not None:
+                    counter.add(record[f])
+
+    def reference(self) -> dict:
+        if not os.path.exists(self.reference_path):
+            return None
+        mtime = os.path.getmtime(self.reference_path)
+        if self._ref["mtime"] != mtime:
+            with open(self.reference_path) as f:
+                self._ref = {"mtime": mtime, "data": json.load(f)}
+        return self._ref["data"]
+
+    def _compare_numeric(self, stats: NumericStats, ref: dict) -> dict:
+        out = stats.summary()
+        if ref is None:
+            return {**out, "status": "no_reference"}
+        cdf = [0.0] + [stats.sketch.cdf(e) for e in ref["edges"]] + [1.0]
+        score = psi(ref["fractions"], np.diff(cdf))
+        out.update(reference={k: ref[k] for k in ("count", "mean", "std", "quantiles")},
+                   psi=round(score, 4),
+                   mean_shift_sigma=round((stats.mean - ref["mean"]) / ref["std"], 3) if ref["std"] else None)
+        out["status"] = "insufficient_data" if stats.n < MIN_SAMPLES else _status(score)
+        return out
+
+    def _compare_categorical(self, counter: CategoryCounter, ref: dict) -> dict:
+        live = counter.frequencies()
+        out = {"count": counter.count, "freq": {k: round(v, 4) for k, v in live.items()}}
+        if ref is None:
+            return {**out, "status": "no_reference"}
+        cats = sorted(set(ref["freq"]) | set(live))
+        score = psi([ref["freq"].get(c, 0.0) for c in cats], [live.get(c, 0.0) for c in cats])
+        out.update(reference=ref["freq"], psi=round(score, 4),
+                   unseen=sorted(set(live) - set(ref["freq"])))
+        out["status"] = "insufficient_data" if counter.count < MIN_SAMPLES else _status(score)
+        return out
+
+    def report(self) -> dict:
+        ref = self.reference() or {}
+        with self._lock:
+            features = {f: self._compare_numeric(s, ref.get("numeric", {}).get(f))
+                        for f, s in self.numeric.items()}
+            features.update({f: self._compare_categorical(c, ref.get("categorical", {}).get(f))
+                             for f, c in self.categorical.items()})
+            since = self.since
+        scored = [v["status"] for v in features.values() if v["status"] in STATUS_ORDER]
+        if not ref:
+            status = "no_reference"
+        elif not scored:
+            status = "insufficient_data"
+        else:
+            status = max(scored, key=STATUS_ORDER.index)
+        return {"status": status, "since": since, "reference_created": ref.get("created"),
+                "thresholds": {"psi_warn": PSI_WARN, "psi_alert": PSI_ALERT, "min_samples": MIN_SAMPLES},
+                "features": features}
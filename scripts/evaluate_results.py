@@ -3,9 +3,12 @@ Evaluate predictions using trained XGBoost classifier + log-target Random-Forest
 • Drops anomaly rows                (is_anomaly == 1)
 • Uses log-transformed target inversion for regressor
 • Outputs classification report, confusion matrix, and MAE
+• Sliced metrics (time_slot, distance_category, zone_pair, supplier) with
+  vectorised bootstrap confidence intervals → outputs/sliced_evaluation.csv
 """
 
 import os
+import time
 import pandas as pd
 import numpy as np
 import joblib
@@ -22,6 +25,15 @@ CLF_PATH    = "models/delay_classifier.pkl"
 REG_PATH    = "models/duration_regressor.pkl"
 OUT_CSV     = "outputs/predictions_full_report.csv"
 CM_PATH     = "outputs/classification_confusion_matrix.png"
+SLICE_CSV   = "outputs/sliced_evaluation.csv"
+
+# ── Sliced evaluation settings ─────────────────────────────────────────
+SLICE_COLS      = ["time_slot", "distance_category", "zone_pair", "supplier"]
+MIN_SLICE_ROWS  = 30
+N_BOOT          = 2_000
+CI              = (2.5, 97.5)
+BOOT_CELLS      = 10_000_000     # max resample‑matrix cells held at once
+DELAY_BINS      = [40, 70]       # ≤40 → On Time, ≤70 → Delayed, else Very Delayed
 
 print("📁 Loaded enhanced dataset:")
 df = pd.read_csv(DATA_PATH)
@@ -44,8 +56,8 @@ for col in feature_cols:
         df[col] = 0
 
 X = df[feature_cols]
-y_true_class = df["actual_time_min"].apply(
-    lambda t: 0 if t <= 40 else 1 if t <= 70 else 2
+y_true_class = pd.Series(
+    np.digitize(df["actual_time_min"].to_numpy(), DELAY_BINS, right=True), index=df.index
 )
 y_true_reg = df["actual_time_min"]
 
@@ -90,5 +102,91 @@ print(f"✅ Saved confusion matrix → {CM_PATH}")
 mae = mean_absolute_error(y_true_reg, y_pred_reg)
 print(f"\n🕒 MAE (duration regressor): {mae:.2f} min")
 
+# ── Sliced evaluation with bootstrap CIs ──────────────────────────────
+def _slice_stats(sums: np.ndarray) -> dict:
+    """sums[..., k] follow the column order of `per_row` below."""
+    n = sums[..., 0]
+    recalls = [sums[..., 4 + c] / np.where(sums[..., 1 + c] > 0, sums[..., 1 + c], np.nan) for c in range(3)]
+    return {
+        "accuracy": sums[..., 7] / n,
+        "balanced_accuracy": np.nanmean(np.stack(recalls), axis=0),
+        "mae": sums[..., 8] / n,
+    }
+
+
+def bootstrap_slices(codes: np.ndarray, per_row: np.ndarray, n_boot: int = N_BOOT, seed: int = 42):
+    """Per‑slice point estimates and percentile CIs.
+
+    Rows are sorted by slice; every bootstrap replicate draws, for each row
+    position, a row index from the same slice via one (replicates × rows)
+    index matrix, and np.add.reduceat sums each slice in one call.
+    """
+    order = np.argsort(codes, kind="stable")
+    codes, per_row = codes[order], per_row[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+    row_start = np.repeat(starts, sizes)
+    row_size = np.repeat(sizes, sizes)
+
+    point = _slice_stats(np.add.reduceat(per_row, starts, axis=0))
+    columns = np.ascontiguousarray(per_row.T)
+    rng = np.random.default_rng(seed)
+    block = max(1, BOOT_CELLS // max(len(codes), 1))
+    draws = {k: [] for k in point}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for b0 in range(0, n_boot, block):
+            nb = min(block, n_boot - b0)
+            idx = row_start + (rng.random((nb, len(codes))) * row_size).astype(np.int64)
+            sums = np.stack(
+                [np.add.reduceat(col[idx], starts, axis=1) for col in columns],
+                axis=-1,
+            )
+            for k, v in _slice_stats(sums).items():
+                draws[k].append(v)
+
+    out = {"slice_code": codes[starts], "n": sizes}
+    for k, v in point.items():
+        boot = np.concatenate(draws[k], axis=0)
+        lo, hi = np.nanpercentile(boot, CI, axis=0)
+        out[k], out[f"{k}_lo"], out[f"{k}_hi"] = v, lo, hi
+    return out
+
+
+print("\n🔬 Sliced evaluation with bootstrap CIs …")
+yt, yp = y_true_class.to_numpy(), np.asarray(y_pred_class)
+per_row = np.column_stack([
+    np.ones(len(yt)),                                   # 0   n
+    *[(yt == c) for c in range(3)],                     # 1‑3 true class c
+    *[(yt == c) & (yp == c) for c in range(3)],         # 4‑6 correct & class c
+    yt == yp,                                           # 7   correct
+    np.abs(y_true_reg.to_numpy() - y_pred_reg),         # 8   abs error
+]).astype(np.float64)
+
+tables = []
+for col in SLICE_COLS:
+    if col not in df.columns:
+        print(f"   ⚠️  '{col}' not in dataset — skipped")
+        continue
+    codes, labels = pd.factorize(df[col].astype(str))
+    big = np.isin(codes, np.flatnonzero(np.bincount(codes) >= MIN_SLICE_ROWS))
+    if not big.any():
+        print(f"   ⚠️  '{col}' has no slice with ≥{MIN_SLICE_ROWS} rows — skipped")
+        continue
+    t_slice = time.perf_counter()
+    stats = bootstrap_slices(codes[big], per_row[big])
+    part = pd.DataFrame(stats)
+    part.insert(0, "slice", labels[part.pop("slice_code").to_numpy()])
+    part.insert(0, "slice_by", col)
+    tables.append(part)
+    print(f"   {col:<18} {len(part):>5} slices × {N_BOOT} resamples in {time.perf_counter() - t_slice:.2f}s")
+
+if tables:
+    sliced = pd.concat(tables, ignore_index=True).round(4)
+    sliced.to_csv(SLICE_CSV, index=False)
+    print(f"💾 Saved sliced metrics → {SLICE_CSV}")
+    worst = sliced.sort_values("mae", ascending=False).head(5)
+    print("Worst slices by MAE:")
+    print(worst[["slice_by", "slice", "n", "mae", "mae_lo", "mae_hi"]].to_string(index=False))
+
 print("\n✅ Evaluation complete.")
 
@@ -6,6 +6,8 @@ from typing import Tuple
 import numpy as np
 import pandas as pd
 
+from scripts.profiling import profiled
+
 # ── Logging ───────────────────────────────────────────────────────────────
 logging.basicConfig(
     level=logging.INFO,
@@ -18,6 +20,7 @@ INPUT_PATH  = "data/lade_delivery_cleaned.csv"
 OUTPUT_PATH = "data/lade_delivery_enhanced.csv"
 
 # ── 1. Load ────────────────────────────────────────────────────────────────
+@profiled("feature_engineering.load_data")
 def load_data() -> pd.DataFrame:
     if not os.path.exists(INPUT_PATH):
         raise FileNotFoundError(f"{INPUT_PATH} not found.")
@@ -26,6 +29,7 @@ def load_data() -> pd.DataFrame:
     return df
 
 # ── 2. Feature Engineering ────────────────────────────────────────────────
+@profiled("feature_engineering.add_features")
 def add_features(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Adding engineered features...")
 
@@ -63,6 +67,7 @@ def _iqr_flag(series: pd.Series, k: float = 1.5) -> pd.Series:
     iqr = q3 - q1
     return ((series < q1 - k * iqr) | (series > q3 + k * iqr)).astype(np.int8)
 
+@profiled("feature_engineering.detect_anomalies")
 def detect_anomalies(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Detecting anomalies...")
     df["time_anomaly"]   = _iqr_flag(df["actual_time_min"])
@@ -75,6 +80,7 @@ def detect_anomalies(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 # ── 4. Optimise Dtypes ─────────────────────────────────────────────────────
+@profiled("feature_engineering.optimise_dtypes")
 def optimise_dtypes(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Optimising dtypes...")
     for col in df.select_dtypes("int64"):
@@ -87,6 +93,7 @@ def optimise_dtypes(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 # ── 5. Save ────────────────────────────────────────────────────────────────
+@profiled("feature_engineering.save")
 def save(df: pd.DataFrame) -> None:
     os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
     df.to_csv(OUTPUT_PATH, index=False)
@@ -161,6 +168,7 @@ def prepare_model_input(raw_input: dict, for_training=False) -> pd.DataFrame:
 
 
 # ── 6. Main ────────────────────────────────────────────────────────────────
+@profiled("feature_engineering.main")
 def main() -> Tuple[str, str]:
     df = load_data()
     df = add_features(df)
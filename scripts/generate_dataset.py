@@ -61,7 +61,7 @@ df['to_zone'] = df['region_id']
 df['weight_kg'] = 5.0  # Dummy constant
 
 # Final structure
-df_cleaned = df[['order_id', 'from_zone', 'to_zone', 'time_slot',
+df_cleaned = df[['order_id', 'accept_time', 'from_zone', 'to_zone', 'time_slot',
                   'weight_kg', 'distance_km', 'actual_time_min']]
 df_cleaned = df_cleaned.rename(columns={'order_id': 'delivery_id'})
 
@@ -1,26 +1,57 @@
 # scripts/heatmap_utils.py  (RL‑pipeline 2025‑07) — pure‑Matplotlib version
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+TIME_SLOT_ORDER = ["Morning", "Afternoon", "Evening", "Night"]
 
 
 # ─────────────────────────── helpers ──────────────────────────────────────
-def _pivot(df: pd.DataFrame, index: str, col: str, val: str) -> pd.DataFrame:
-    """Return pivot table filled with zeros (mean aggregation)."""
-    p = df.pivot_table(index=index, columns=col, values=val, aggfunc="mean").fillna(0)
+def _order_columns(p: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Put time slots in chronological order."""
     if col == "time_slot":
-        order = [t for t in ["Morning", "Afternoon", "Evening", "Night"] if t in p.columns]
-        p = p[order]
+        order = [t for t in TIME_SLOT_ORDER if t in p.columns]
+        p = p[order + [c for c in p.columns if c not in order]]
     return p
 
 
+def _zone_group_series(df: pd.DataFrame) -> pd.Series:
+    """Return the `zone_group` key for `df` without modifying it."""
+    if "zone_group" in df:
+        return df["zone_group"]
+    if df["from_zone"].dtype == object:
+        return df["from_zone"].astype(str).str[:3].rename("zone_group")
+    # popular zones can fill several quantiles on their own → merge those bins
+    return pd.Series(pd.qcut(df["from_zone"].astype(int), q=20, labels=False, duplicates="drop"),
+                     index=df.index, name="zone_group")
+
+
 def _draw_heatmap(pivot: pd.DataFrame,
                   title: str,
                   cbar_label: str,
                   out_path: str,
-                  fmt: str = ".1f"):
-    """Draw and save a numerical heatmap using pure Matplotlib."""
+                  fmt: str = ".1f",
+                  mode: str = "fast",
+                  tier: str = "export"):
+    """Draw and save a numerical heatmap using pure Matplotlib.
+
+    mode="fast" renders through `_render_fast` (imshow, bulk annotation,
+    reused Agg figure); mode="classic" keeps the original pcolormesh path.
+    """
+    if mode == "fast":
+        _render_fast(pivot, title, cbar_label, out_path, fmt=fmt, tier=tier)
+        return
+
     fig, ax = plt.subplots(figsize=(12, 8))
     mesh = ax.pcolormesh(pivot.values, shading="auto")
     cbar = fig.colorbar(mesh, ax=ax)
@@ -45,94 +76,313 @@ def _draw_heatmap(pivot: pd.DataFrame,
     print(f"✅ Saved: {out_path} — shape={pivot.shape}")
 
 
-# ─────────────────────────── public functions ─────────────────────────────
-def _ensure_zone_group(df: pd.DataFrame):
-    """Add a `zone_group` column for cleaner heatmaps."""
-    if "zone_group" not in df:
-        if df["from_zone"].dtype == object:
-            df["zone_group"] = df["from_zone"].astype(str).str[:3]
-        else:
-            df["zone_group"] = pd.qcut(df["from_zone"].astype(int), q=20, labels=False)
+# ─────────────────────────── fast renderer ────────────────────────────────
+# preview → quick look in the dashboard, export → print-quality file
+RENDER_TIERS = {
+    "preview": {"dpi": 72,  "max_height": 10},
+    "export":  {"dpi": 300, "max_height": 40},
+}
+ANNOTATE_MAX_CELLS = 400     # above this, cell labels are unreadable anyway
+MAX_TICK_LABELS = 60         # thin y tick labels on tall pivots
+
+
+def check_tier(tier: str):
+    if tier not in RENDER_TIERS:
+        raise ValueError(f"Unknown render tier '{tier}'. Choose from {list(RENDER_TIERS)}")
+
+_fig_lock = threading.Lock()
+_shared_fig = None
+
+
+def _get_figure() -> Figure:
+    """One Agg figure per process, cleared and resized between renders."""
+    global _shared_fig
+    if _shared_fig is None:
+        _shared_fig = Figure()
+        FigureCanvasAgg(_shared_fig)
+    _shared_fig.clear()
+    return _shared_fig
+
+
+def _render_fast(pivot: pd.DataFrame,
+                 title: str,
+                 cbar_label: str,
+                 out_path: str,
+                 fmt: str = ".1f",
+                 tier: str = "export"):
+    check_tier(tier)
+    cfg = RENDER_TIERS[tier]
+    n_rows, n_cols = pivot.shape
+    values = pivot.to_numpy(dtype=float)
+    height = min(max(8.0, 0.25 * n_rows), cfg["max_height"])
+
+    with _fig_lock:
+        fig = _get_figure()
+        fig.set_size_inches(12, height)
+        ax = fig.add_subplot(111)
+        img = ax.imshow(values, aspect="auto", origin="lower", interpolation="nearest")
+        cbar = fig.colorbar(img, ax=ax)
+        cbar.set_label(cbar_label)
+
+        if values.size <= ANNOTATE_MAX_CELLS:
+            # labels are formatted in one vectorised call; placing them is still
+            # one ax.text per cell, hence the ANNOTATE_MAX_CELLS cap
+            labels = np.char.mod(f"%{fmt}", values)
+            rows, cols = np.indices(values.shape)
+            for x, y, txt in zip(cols.ravel(), rows.ravel(), labels.ravel()):
+                ax.text(x, y, txt, va="center", ha="center", fontsize=8)
+
+        ax.set_xticks(np.arange(n_cols), pivot.columns, rotation=45, ha="right")
+        step = max(1, int(np.ceil(n_rows / MAX_TICK_LABELS)))
+        ax.set_yticks(np.arange(0, n_rows, step), pivot.index[::step])
+        ax.set_xlabel(pivot.columns.name or "")
+        ax.set_ylabel(pivot.index.name or "")
+        ax.set_title(title, pad=20, fontweight="bold")
+
+        fig.subplots_adjust(left=0.12, right=0.95, bottom=0.15, top=0.9)
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        fig.savefig(out_path, dpi=cfg["dpi"], facecolor="white")
+    print(f"✅ Saved: {out_path} — shape={pivot.shape} tier={tier}")
+
+
+def benchmark_render(sizes=(20, 200, 2000),
+                     out_dir: str = "outputs/bench",
+                     repeats: int = 3) -> pd.DataFrame:
+    """Time classic vs fast rendering on synthetic zone_group × time_slot pivots."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in sizes:
+        pivot = pd.DataFrame(
+            rng.uniform(20, 180, size=(n, 4)),
+            index=pd.Index(np.arange(n), name="zone_group"),
+            columns=pd.Index(["Morning", "Afternoon", "Evening", "Night"], name="time_slot"),
+        )
+        runs = [("classic", "export"), ("fast", "export"), ("fast", "preview")]
+        for mode, tier in runs:
+            out = os.path.join(out_dir, f"bench_{n}_{mode}_{tier}.png")
+            times = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                _draw_heatmap(pivot, f"Benchmark {n} groups", "value", out, mode=mode, tier=tier)
+                times.append(time.perf_counter() - t0)
+            rows.append({"zone_groups": n, "mode": mode, "tier": tier,
+                         "best_s": round(min(times), 3),
+                         "file_kb": round(os.path.getsize(out) / 1024, 1)})
+    result = pd.DataFrame(rows)
+    print(result.to_string(index=False))
+    return result
+
+
+# ─────────────────────────── heatmap specs ────────────────────────────────
+# `value` and `columns` may list candidates; the first one present is used.
+# Title / label / filename templates can use {value}, {value_title},
+# {columns} and {columns_title}.
+HEATMAP_SPECS = {}
+
+
+def register_heatmap(name: str,
+                     value,
+                     index: str = "zone_group",
+                     columns="time_slot",
+                     aggfunc: str = "mean",
+                     title: str = "{value_title} by Zone & {columns_title}",
+                     cbar_label: str = "{value_title}",
+                     fmt: str = ".2f",
+                     filename: str = None):
+    """Declare a heatmap rendered by `generate_all_heatmaps`."""
+    HEATMAP_SPECS[name] = {
+        "value": [value] if isinstance(value, str) else list(value),
+        "index": index,
+        "columns": [columns] if isinstance(columns, str) else list(columns),
+        "aggfunc": aggfunc,
+        "title": title,
+        "cbar_label": cbar_label,
+        "fmt": fmt,
+        "filename": filename or f"{name}_heatmap.png",
+    }
+
 
+register_heatmap(
+    "zone_time",
+    value=["predicted_time_min", "actual_time_min"],
+    title="Average Delivery Time by Zone & Time Slot\n(Using {value})",
+    cbar_label="Avg {value_title}",
+    fmt=".1f",
+    filename="zone_time_heatmap.png",
+)
+register_heatmap(
+    "delay",
+    value="delay_label",
+    columns=["time_slot", "weight_category", "distance_category"],
+    title="Delay Probability by Zone & {columns_title}\n(Delay > 90 min)",
+    cbar_label="Delay Probability",
+    fmt=".2f",
+    filename="delay_heatmap_by_{columns}.png",
+)
+register_heatmap(
+    "performance",
+    value="efficiency_km_per_min",
+    title="Delivery Efficiency by Zone & Time Slot\n(Higher = Better)",
+    cbar_label="Efficiency (km/min)",
+    fmt=".3f",
+    filename="performance_heatmap.png",
+)
 
+
+def _heatmap_frame(df: pd.DataFrame, specs: list) -> pd.DataFrame:
+    """Narrow working copy with derived columns; `df` itself is never modified."""
+    wanted = {"actual_time_min", "distance_km"}
+    for spec in specs:
+        wanted.update(spec["value"])
+        wanted.update(spec["columns"])
+        wanted.add(spec["index"])
+    work = df[[c for c in df.columns if c in wanted]].copy()
+
+    if "zone_group" not in work:
+        work["zone_group"] = _zone_group_series(df).to_numpy()
+    if "delay_label" not in work and "actual_time_min" in work:
+        work["delay_label"] = (work["actual_time_min"] > 90).astype(int)
+    if "efficiency_km_per_min" not in work and {"distance_km", "actual_time_min"}.issubset(work.columns):
+        work["efficiency_km_per_min"] = work["distance_km"] / (work["actual_time_min"] + 1)
+    return work
+
+
+def _resolve(spec: dict, columns) -> dict:
+    """Pick concrete value/columns for `spec`, or None if the frame lacks them."""
+    value = next((v for v in spec["value"] if v in columns), None)
+    col = next((c for c in spec["columns"] if c in columns), None)
+    if value is None or col is None or spec["index"] not in columns:
+        return None
+    fields = {
+        "value": value,
+        "value_title": value.replace("_", " ").title(),
+        "columns": col,
+        "columns_title": col.replace("_", " ").title(),
+    }
+    return {
+        "value": value,
+        "index": spec["index"],
+        "columns": col,
+        "aggfunc": spec["aggfunc"],
+        "title": spec["title"].format(**fields),
+        "cbar_label": spec["cbar_label"].format(**fields),
+        "fmt": spec["fmt"],
+        "fields": fields,
+    }
+
+
+def _shared_pivots(work: pd.DataFrame, resolved: dict) -> dict:
+    """One groupby per (index, columns) pair, covering every spec that shares it."""
+    by_axes = {}
+    for name, r in resolved.items():
+        by_axes.setdefault((r["index"], r["columns"]), []).append(name)
+
+    pivots = {}
+    for (index, col), names in by_axes.items():
+        aggs = {f"{resolved[n]['value']}__{resolved[n]['aggfunc']}": (resolved[n]["value"], resolved[n]["aggfunc"])
+                for n in names}
+        grouped = work.groupby([index, col], observed=True).agg(**aggs)
+        for n in names:
+            key = f"{resolved[n]['value']}__{resolved[n]['aggfunc']}"
+            p = grouped[key].unstack(col).fillna(0)
+            p.index.name, p.columns.name = index, col
+            pivots[n] = _order_columns(p, col)
+    return pivots
+
+
+def _render_job(job: tuple) -> float:
+    """Process-pool worker: render one heatmap, return wall-clock seconds."""
+    pivot, title, cbar_label, out_path, fmt, tier = job
+    t0 = time.perf_counter()
+    _draw_heatmap(pivot, title, cbar_label, out_path, fmt=fmt, tier=tier)
+    return time.perf_counter() - t0
+
+
+def _render_specs(df: pd.DataFrame,
+                  names: list,
+                  paths: dict,
+                  tier: str = "export",
+                  workers: int = None) -> list:
+    check_tier(tier)          # fail before aggregating, not inside a worker
+    specs = [HEATMAP_SPECS[n] for n in names]
+    work = _heatmap_frame(df, specs)
+
+    resolved = {}
+    for name in names:
+        r = _resolve(HEATMAP_SPECS[name], work.columns)
+        if r is None:
+            print(f"❌ Required columns missing for heatmap '{name}'.")
+            continue
+        resolved[name] = r
+    if not resolved:
+        return []
+
+    pivots = _shared_pivots(work, resolved)
+    jobs = {}
+    for name, r in resolved.items():
+        out = paths[name].format(**r["fields"])
+        jobs[name] = (pivots[name], r["title"], r["cbar_label"], out, r["fmt"], tier)
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        timings = {name: _render_job(job) for name, job in jobs.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(_render_job, job) for name, job in jobs.items()}
+            timings = {name: f.result() for name, f in futures.items()}
+
+    return [
+        {"name": name, "path": jobs[name][3], "shape": pivots[name].shape, "seconds": round(timings[name], 3)}
+        for name in jobs
+    ]
+
+
+# ─────────────────────────── public functions ─────────────────────────────
 def generate_heatmap(df: pd.DataFrame,
-                     output_path: str = "outputs/zone_time_heatmap.png"):
+                     output_path: str = "outputs/zone_time_heatmap.png",
+                     tier: str = "export"):
     """Average delivery time per zone_group & time_slot."""
-    _ensure_zone_group(df)
-    time_col = next((c for c in ("predicted_time_min", "actual_time_min") if c in df), None)
-    if not time_col or "zone_group" not in df or "time_slot" not in df:
-        print("❌ Required columns missing for heatmap.")
-        return
-
-    pivot = _pivot(df, "zone_group", "time_slot", time_col)
-    _draw_heatmap(
-        pivot,
-        f"Average Delivery Time by Zone & Time Slot\n(Using {time_col})",
-        f"Avg {time_col.replace('_', ' ').title()}",
-        output_path,
-        fmt=".1f",
-    )
+    _render_specs(df, ["zone_time"], {"zone_time": output_path}, tier=tier, workers=1)
 
 
 def generate_delay_heatmap(df: pd.DataFrame,
-                           output_path: str = "outputs/delay_heatmap.png"):
-    """Delay probability (>90 min) by zone_group vs categorical feature."""
-    _ensure_zone_group(df)
-    if "delay_label" not in df:
-        df["delay_label"] = (df["actual_time_min"] > 90).astype(int)
-
-    for col, label in [
-        ("time_slot", "Time Slot"),
-        ("weight_category", "Weight Category"),
-        ("distance_category", "Distance Category"),
-    ]:
-        if col not in df:
-            continue
-        pivot = _pivot(df, "zone_group", col, "delay_label")
-        out = output_path.replace(".png", f"_by_{col}.png")
-        _draw_heatmap(
-            pivot,
-            f"Delay Probability by Zone & {label}\n(Delay > 90 min)",
-            "Delay Probability",
-            out,
-            fmt=".2f",
-        )
-        return
-    print("❌ No suitable categorical column found for delay heatmap.")
+                           output_path: str = "outputs/delay_heatmap.png",
+                           tier: str = "export"):
+    """Delay probability (>90 min) by zone_group vs categorical feature."""
+    path = output_path.replace(".png", "_by_{columns}.png")
+    _render_specs(df, ["delay"], {"delay": path}, tier=tier, workers=1)
 
 
 def generate_performance_heatmap(df: pd.DataFrame,
-                                 output_path: str = "outputs/performance_heatmap.png"):
+                                 output_path: str = "outputs/performance_heatmap.png",
+                                 tier: str = "export"):
     """Efficiency (km/min) by zone_group & time_slot."""
-    _ensure_zone_group(df)
-    if "efficiency_km_per_min" not in df and {"distance_km", "actual_time_min"}.issubset(df):
-        df["efficiency_km_per_min"] = df["distance_km"] / (df["actual_time_min"] + 1)
-
-    if "time_slot" not in df:
-        print("❌ 'time_slot' missing for performance heatmap.")
-        return
-
-    pivot = _pivot(df, "zone_group", "time_slot", "efficiency_km_per_min")
-    _draw_heatmap(
-        pivot,
-        "Delivery Efficiency by Zone & Time Slot\n(Higher = Better)",
-        "Efficiency (km/min)",
-        output_path,
-        fmt=".3f",
-    )
+    _render_specs(df, ["performance"], {"performance": output_path}, tier=tier, workers=1)
 
 
-def generate_all_heatmaps(df: pd.DataFrame, output_dir: str = "outputs/"):
-    """Generate all three heatmaps in one call."""
+def generate_all_heatmaps(df: pd.DataFrame,
+                          output_dir: str = "outputs/",
+                          tier: str = "export",
+                          workers: int = None) -> list:
+    """Render every registered heatmap concurrently; `df` is left untouched."""
     print("🎨 Generating full heatmap suite …")
     os.makedirs(output_dir, exist_ok=True)
-    _ensure_zone_group(df)
-    generate_heatmap(df, os.path.join(output_dir, "zone_time_heatmap.png"))
-    generate_delay_heatmap(df, os.path.join(output_dir, "delay_heatmap.png"))
-    generate_performance_heatmap(df, os.path.join(output_dir, "performance_heatmap.png"))
-    print("✅ All heatmaps generated!")
+    t0 = time.perf_counter()
+    names = list(HEATMAP_SPECS)
+    paths = {n: os.path.join(output_dir, HEATMAP_SPECS[n]["filename"]) for n in names}
+    # filename templates may still hold {columns} etc.; _render_specs fills them in
+    results = _render_specs(df, names, paths, tier=tier, workers=workers)
+    for r in results:
+        print(f"   ⏱️  {r['name']:<14} {r['seconds']:>7.3f}s  {r['path']}")
+    print(f"✅ All heatmaps generated in {time.perf_counter() - t0:.2f}s!")
+    return results
 
 
 # ── CLI entry point ───────────────────────────────────────────────────────
 if __name__ == "__main__":
-    print("🔍 Heatmap utils ready – call generate_all_heatmaps(df).")
+    if "--benchmark" in sys.argv:
+        benchmark_render()
+    elif "--suite" in sys.argv:
+        generate_all_heatmaps(pd.read_csv("outputs/predictions_full_report.csv"))
+    else:
+        print("🔍 Heatmap utils ready – call generate_all_heatmaps(df).")
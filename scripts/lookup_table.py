@@ -0,0 +1,274 @@
+# scripts/lookup_table.py
+# ----------------------------------------------------------------------
+# Lookup-table inference for /predict.
+# prepare_model_input's 14 features depend only on distance, weight,
+# same_zone and time slot (Morning / Night / anything else), so the
+# classifier probabilities and log-duration are precomputed over a
+# distance × weight grid for each of the 2 × 3 discrete combinations.
+# • Both models are tree ensembles, i.e. piecewise constant. Their split
+#   thresholds on distance_km and weight_kg (mapped back through the
+#   scaler) and the category cut points are grid nodes, each cell holds
+#   the models' output at its midpoint and queries read their own cell,
+#   so the table is exact except where a weight_per_km (= w / d) split
+#   cuts diagonally through a cell
+# • Those diagonal cuts make the maximum error irreducible, so the grid is
+#   accepted on the ERROR_QUANTILE error against the live models (over
+#   N_VALIDATE random in-grid points); the maximum is reported alongside.
+#   A table outside tolerance is marked unusable and /predict stays live
+# • Distances below MIN_DISTANCE are not tabulated: weight_per_km = w / d
+#   grows without bound as d → 0, so no grid bounds the error there
+# • The table records the model files it was built from; load_lookup()
+#   returns None once they change, and the API rebuilds in the background
+#
+#   python -m scripts.lookup_table            # build models/lookup_table.npz
+# ----------------------------------------------------------------------
+
+import os
+import time
+import json
+import argparse
+import joblib
+import numpy as np
+
+from scripts.feature_engineering import prepare_model_input
+
+LOOKUP_PATH = "models/lookup_table.npz"
+MODEL_FILES = {
+    "scaler":     "utils/scaler.pkl",
+    "classifier": "models/delay_classifier.pkl",
+    "regressor":  "models/duration_regressor.pkl",
+}
+
+MIN_DISTANCE   = 1.0               # km — below this the live models answer
+DISTANCE_RANGE = (MIN_DISTANCE, 50.0)  # km — queries outside the grid go to the live models
+WEIGHT_RANGE   = (0.0, 100.0)      # kg
+CATEGORY_EDGES = [5.0, 15.0, 30.0] # prepare_model_input's weight and distance cut points
+DISTANCE_FEATURE, WEIGHT_FEATURE = 0, 1   # columns of prepare_model_input's output
+TIME_SLOTS     = ["Morning", "Night", "Other"]   # only Morning / Night have dummies
+
+START_POINTS     = 128             # spacing nodes + split thresholds kept per axis, doubled on refinement
+MAX_POINTS       = 256
+N_VALIDATE       = 20_000
+ERROR_QUANTILE   = 0.99            # tolerance statistic; the maximum is reported alongside
+MAX_PROB_ERROR   = 0.03            # |Δ class probability| at ERROR_QUANTILE
+MAX_DURATION_ERR = 2.0             # |Δ minutes| at ERROR_QUANTILE
+
+
+# ─────────────────────────── model signature ──────────────────────────────
+def model_signature(files: dict = MODEL_FILES) -> dict:
+    """(size, mtime_ns) per model file — changes whenever a model is rewritten."""
+    sig = {}
+    for name, path in files.items():
+        st = os.stat(path) if os.path.exists(path) else None
+        sig[name] = [st.st_size, st.st_mtime_ns] if st else None
+    return sig
+
+
+def load_models(files: dict = MODEL_FILES) -> tuple:
+    return tuple(joblib.load(files[k]) for k in ("scaler", "classifier", "regressor"))
+
+
+def live_predict(models: tuple, distance, weight, same_zone, slot_idx) -> np.ndarray:
+    """Live models on arrays of raw inputs → (n, n_classes + 1): probabilities, log-duration."""
+    scaler, clf, reg = models
+    n = len(distance)
+    raw = {
+        "from_zone": np.zeros(n, dtype=int),
+        "to_zone":   np.where(np.asarray(same_zone) == 1, 0, 1),
+        "time_slot": np.asarray(TIME_SLOTS)[np.asarray(slot_idx)],
+        "weight":    np.asarray(weight, dtype=float),
+        "distance":  np.asarray(distance, dtype=float),
+    }
+    X = scaler.transform(prepare_model_input(raw, for_training=True))
+    return np.column_stack([clf.predict_proba(X), reg.predict(X)]).astype(np.float32)
+
+
+def slot_index(time_slot: str) -> int:
+    return {"Morning": 0, "Night": 1}.get(time_slot, 2)
+
+
+# ─────────────────────────── split thresholds ─────────────────────────────
+def _tree_splits(model) -> dict:
+    """feature index → split thresholds (in the model's scaled input space)."""
+    splits = {}
+    if hasattr(model, "estimators_"):                # scikit-learn forest
+        for est in model.estimators_:
+            tree = est.tree_
+            inner = tree.feature >= 0
+            for f, t in zip(tree.feature[inner], tree.threshold[inner]):
+                splits.setdefault(int(f), []).append(t)
+    elif hasattr(model, "get_booster"):              # XGBoost
+        booster = model.get_booster()
+        names = booster.feature_names
+        trees = booster.trees_to_dataframe()
+        trees = trees[trees["Feature"] != "Leaf"]
+        for name, t in zip(trees["Feature"], trees["Split"]):
+            f = names.index(name) if names else int(name[1:])
+            splits.setdefault(f, []).append(t)
+    return {f: np.unique(np.asarray(t, dtype=float)) for f, t in splits.items()}
+
+
+def split_thresholds(models: tuple) -> tuple:
+    """(distance, weight) split thresholds of both models in raw units."""
+    scaler, clf, reg = models
+    n_features = len(scaler.scale_) if hasattr(scaler, "scale_") else scaler.n_features_in_
+    raw = []
+    for feature in (DISTANCE_FEATURE, WEIGHT_FEATURE):
+        t = np.unique(np.concatenate([_tree_splits(m).get(feature, np.empty(0)) for m in (clf, reg)]))
+        X = np.zeros((len(t), n_features))
+        X[:, feature] = t
+        raw.append(scaler.inverse_transform(X)[:, feature] if len(t) else t)
+    return tuple(raw)
+
+
+# ─────────────────────────── table ────────────────────────────────────────
+def _axis(lo: float, hi: float, n: int, splits: np.ndarray, geometric: bool = False) -> np.ndarray:
+    """Cell boundaries: n spacing nodes (geometric ones denser at the low end, if
+    asked), category edges and the split thresholds inside (lo, hi), thinned
+    evenly to n when there are more."""
+    edges = np.asarray(CATEGORY_EDGES)
+    splits = splits[(splits > lo) & (splits < hi)]
+    if len(splits) > n:
+        splits = splits[np.linspace(0, len(splits) - 1, n).round().astype(int)]
+    nodes = np.geomspace(lo, hi, n) if geometric else np.linspace(lo, hi, n)
+    return np.unique(np.r_[nodes, edges[(edges > lo) & (edges < hi)], splits])
+
+
+class LookupTable:
+    """values[same_zone, slot, i, j] = [p_0 … p_k, log_duration] for the cell
+    [distance_axis[i], distance_axis[i+1]) × [weight_axis[j], weight_axis[j+1])."""
+
+    def __init__(self, distance_axis, weight_axis, values, meta):
+        self.distance_axis = distance_axis
+        self.weight_axis = weight_axis
+        self.values = values
+        self.meta = meta
+
+    @classmethod
+    def build(cls, models: tuple, n_points: int, splits: tuple = None) -> "LookupTable":
+        d_splits, w_splits = splits if splits is not None else split_thresholds(models)
+        d_axis = _axis(*DISTANCE_RANGE, n_points, d_splits, geometric=True)   # w / d is steep at small d
+        w_axis = _axis(*WEIGHT_RANGE, n_points, w_splits)
+        d_mid, w_mid = (d_axis[:-1] + d_axis[1:]) / 2, (w_axis[:-1] + w_axis[1:]) / 2
+        sz, slot, d, w = (a.ravel() for a in np.meshgrid(
+            [0, 1], np.arange(len(TIME_SLOTS)), d_mid, w_mid, indexing="ij"))
+        out = live_predict(models, d, w, sz, slot)
+        values = out.reshape(2, len(TIME_SLOTS), len(d_mid), len(w_mid), -1)
+        meta = {"n_points": n_points, "splits_total": [len(d_splits), len(w_splits)]}
+        return cls(d_axis, w_axis, values, meta)
+
+    def covers(self, distance, weight) -> np.ndarray:
+        return ((self.distance_axis[0] <= distance) & (distance <= self.distance_axis[-1])
+                & (self.weight_axis[0] <= weight) & (weight <= self.weight_axis[-1]))
+
+    def lookup(self, distance, weight, same_zone, slot_idx) -> np.ndarray:
+        """Value of the cell holding each point; inputs are broadcastable arrays inside the grid."""
+        d_ax, w_ax = self.distance_axis, self.weight_axis
+        i = np.clip(np.searchsorted(d_ax, distance, side="right") - 1, 0, len(d_ax) - 2)
+        j = np.clip(np.searchsorted(w_ax, weight, side="right") - 1, 0, len(w_ax) - 2)
+        return self.values[np.asarray(same_zone), np.asarray(slot_idx), i, j]
+
+    def predict(self, distance: float, weight: float, same_zone: int, time_slot: str) -> dict:
+        """/predict response fields for one request."""
+        out = self.lookup(distance, weight, int(same_zone), slot_index(time_slot))
+        proba, log_duration = out[:-1], out[-1]
+        delay_class = int(np.argmax(proba))
+        return {
+            "delay_class": delay_class,
+            "delay_confidence": round(float(proba[delay_class]) * 100, 2),
+            "estimated_duration_min": round(float(np.expm1(log_duration)), 2),
+        }
+
+    def save(self, path: str = LOOKUP_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, distance_axis=self.distance_axis, weight_axis=self.weight_axis,
+                 values=self.values, meta=json.dumps(self.meta))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = LOOKUP_PATH) -> "LookupTable":
+        with np.load(path) as z:
+            return cls(z["distance_axis"], z["weight_axis"], z["values"], json.loads(str(z["meta"])))
+
+
+# ─────────────────────────── build / validate ─────────────────────────────
+def validate(table: LookupTable, models: tuple, n: int = N_VALIDATE, seed: int = 0) -> dict:
+    """Error of the table against the live models at random in-grid points
+    (half uniform, half log-uniform in distance to stress the steep low end)."""
+    rng = np.random.default_rng(seed)
+    lo, hi = DISTANCE_RANGE
+    d = np.r_[rng.uniform(lo, hi, n - n // 2), np.exp(rng.uniform(np.log(lo), np.log(hi), n // 2))]
+    w = rng.uniform(*WEIGHT_RANGE, n)
+    sz = rng.integers(0, 2, n)
+    slot = rng.integers(0, len(TIME_SLOTS), n)
+    live = live_predict(models, d, w, sz, slot)
+    approx = table.lookup(d, w, sz, slot)
+
+    prob_err = np.abs(live[:, :-1] - approx[:, :-1]).max(axis=1)
+    dur_err = np.abs(np.expm1(live[:, -1]) - np.expm1(approx[:, -1]))
+    return {
+        "prob_error_q": float(np.quantile(prob_err, ERROR_QUANTILE)),
+        "prob_error_max": float(prob_err.max()),
+        "duration_error_q": float(np.quantile(dur_err, ERROR_QUANTILE)),
+        "duration_error_max": float(dur_err.max()),
+        "class_agreement": float((live[:, :-1].argmax(1) == approx[:, :-1].argmax(1)).mean()),
+    }
+
+
+def build_lookup(path: str = LOOKUP_PATH, max_prob_error: float = MAX_PROB_ERROR,
+                 max_duration_error: float = MAX_DURATION_ERR) -> LookupTable:
+    """Refine the grid until the ERROR_QUANTILE errors are within tolerance (or MAX_POINTS)."""
+    signature = model_signature()
+    models = load_models()
+    splits = split_thresholds(models)
+    print(f"🌳 split thresholds: {len(splits[0])} on distance, {len(splits[1])} on weight")
+    n_points = START_POINTS
+    while True:
+        t0 = time.perf_counter()
+        table = LookupTable.build(models, n_points, splits)
+        build_s = time.perf_counter() - t0
+        errors = validate(table, models)
+        ok = errors["prob_error_q"] <= max_prob_error and errors["duration_error_q"] <= max_duration_error
+        print(f"🔢 grid {len(table.distance_axis) - 1}×{len(table.weight_axis) - 1}×{2 * len(TIME_SLOTS)} "
+              f"built in {build_s:.1f}s — prob err q{ERROR_QUANTILE:.2f} {errors['prob_error_q']:.4f} "
+              f"(max {errors['prob_error_max']:.4f}), "
+              f"duration err q{ERROR_QUANTILE:.2f} {errors['duration_error_q']:.2f} min "
+              f"(max {errors['duration_error_max']:.2f}), "
+              f"class agreement {errors['class_agreement']:.2%}")
+        if ok or n_points * 2 > MAX_POINTS:
+            break
+        n_points *= 2
+
+    table.meta.update({
+        "signature": signature,
+        "errors": errors,
+        "tolerance": {"prob": max_prob_error, "duration_min": max_duration_error,
+                      "statistic": f"q{ERROR_QUANTILE}", "min_distance_km": MIN_DISTANCE},
+        "within_tolerance": bool(ok),
+        "size_mb": round(table.values.nbytes / 1e6, 2),
+    })
+    table.save(path)
+    status = "✅" if ok else "⚠️  outside tolerance — /predict will stay on the live models;"
+    print(f"{status} lookup table saved → {path} ({table.meta['size_mb']} MB, "
+          f"q{ERROR_QUANTILE:.2f} errors {errors['prob_error_q']:.4f} / {errors['duration_error_q']:.2f} min)")
+    return table
+
+
+def load_lookup(path: str = LOOKUP_PATH):
+    """The saved table if it matches the current model files, else None."""
+    if not os.path.exists(path):
+        return None
+    table = LookupTable.load(path)
+    if table.meta.get("signature") != model_signature():
+        return None
+    return table
+
+
+# ── CLI entry point ───────────────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the /predict lookup table.")
+    parser.add_argument("--max-prob-error", type=float, default=MAX_PROB_ERROR)
+    parser.add_argument("--max-duration-error", type=float, default=MAX_DURATION_ERR)
+    args = parser.parse_args()
+    build_lookup(max_prob_error=args.max_prob_error, max_duration_error=args.max_duration_error)
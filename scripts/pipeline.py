@@ -0,0 +1,294 @@
+# scripts/pipeline.py
+# ----------------------------------------------------------------------
+# End-to-end workflow runner.
+# • Each stage declares its script, inputs, outputs, code and params
+# • A stage is skipped when the fingerprint (input contents + code + params
+#   + upstream fingerprints) matches the last successful run
+# • Independent stages run in parallel; wall time and peak RSS per stage
+#
+#   python -m scripts.pipeline                  # run whatever is stale
+#   python -m scripts.pipeline --force predict  # rerun predict (+ upstream if stale)
+# ----------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = "outputs/.pipeline_state.json"
+REPORT_PATH = "outputs/pipeline_report.json"
+
+# `after` = ordering-only dependency (no shared file, but must not run concurrently
+# or must see the other stage's side effects); it still feeds the fingerprint.
+STAGES = [
+    {
+        "name": "generate_dataset",
+        "module": "scripts.generate_dataset",
+        "inputs": [],
+        "outputs": ["data/lade_delivery_cleaned.csv"],
+        "code": ["scripts/generate_dataset.py"],
+    },
+    {
+        "name": "feature_engineering",
+        "module": "scripts.feature_engineering",
+        "inputs": ["data/lade_delivery_cleaned.csv"],
+        "outputs": ["data/lade_delivery_enhanced.csv"],
+        "code": ["scripts/feature_engineering.py"],
+    },
+    {
+        "name": "train_model",
+        "module": "scripts.train_model",
+        "inputs": ["data/lade_delivery_enhanced.csv"],
+        "outputs": ["models/delay_classifier.pkl", "models/duration_regressor.pkl"],
+        "code": ["scripts/train_model.py"],
+    },
+    {
+        "name": "baseline_store",
+        "module": "scripts.baseline_store",
+        "inputs": ["data/lade_delivery_enhanced.csv"],
+        "outputs": ["models/zone_pair_baseline.csv"],
+        "code": ["scripts/baseline_store.py"],
+    },
+    {
+        "name": "lookup_table",
+        "module": "scripts.lookup_table",
+        "inputs": ["utils/scaler.pkl",
+                   "models/delay_classifier.pkl", "models/duration_regressor.pkl"],
+        "outputs": ["models/lookup_table.npz"],
+        "code": ["scripts/lookup_table.py", "scripts/feature_engineering.py"],
+    },
+    {
+        # evaluate_results.py also writes predictions_full_report.csv (without
+        # RL columns), so predict must run after it to leave the full report.
+        "name": "evaluate",
+        "module": "scripts.evaluate_results",
+        "inputs": ["data/lade_delivery_enhanced.csv",
+                   "models/delay_classifier.pkl", "models/duration_regressor.pkl"],
+        "outputs": ["outputs/classification_confusion_matrix.png"],
+        "code": ["scripts/evaluate_results.py"],
+    },
+    {
+        "name": "predict",
+        "module": "scripts.predict_and_optimize",
+        "inputs": ["data/lade_delivery_enhanced.csv",
+                   "models/delay_classifier.pkl", "models/duration_regressor.pkl",
+                   "models/rl_dqn.pth"],
+        "outputs": ["outputs/predictions_full_report.csv",
+                    "outputs/delivery_cube.npz", "outputs/zone_hierarchy.csv"],
+        "code": ["scripts/predict_and_optimize.py", "scripts/rl_agent/agent_runner.py",
+                 "scripts/rl_agent/numpy_policy.py", "scripts/delivery_cube.py",
+                 "scripts/zone_hierarchy.py", "scripts/heatmap_generator.py"],
+        "after": ["evaluate"],
+    },
+    {
+        "name": "supplier_scores",
+        "module": "scripts.supplier_score_engine",
+        "inputs": ["outputs/predictions_full_report.csv"],
+        "outputs": ["outputs/supplier_scores.csv"],
+        "code": ["scripts/supplier_score_engine.py"],
+    },
+    {
+        "name": "cost_analysis",
+        "module": "scripts.cost_analysis_from_hf",
+        "inputs": ["data/lade_delivery_enhanced.csv"],
+        "outputs": ["outputs/lade_costs.csv", "outputs/cost_aggregates.json"],
+        "code": ["scripts/cost_analysis_from_hf.py"],
+    },
+    {
+        "name": "heatmaps",
+        "module": "scripts.heatmap_generator",
+        "args": ["--suite"],
+        "inputs": ["outputs/predictions_full_report.csv"],
+        "outputs": ["outputs/zone_time_heatmap.png", "outputs/performance_heatmap.png"],
+        "code": ["scripts/heatmap_generator.py"],
+    },
+]
+
+
+# ─────────────────────────── fingerprints ─────────────────────────────────
+def _file_hash(path: str, cache: dict) -> str:
+    """sha256 of a file, memoised on (size, mtime) so unchanged files aren't re-read."""
+    full = os.path.join(ROOT, path)
+    if not os.path.exists(full):
+        return "missing"
+    st = os.stat(full)
+    key = f"{st.st_size}:{st.st_mtime_ns}"
+    hit = cache.get(path)
+    if hit and hit["key"] == key:
+        return hit["sha256"]
+    h = hashlib.sha256()
+    with open(full, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    cache[path] = {"key": key, "sha256": h.hexdigest()}
+    return cache[path]["sha256"]
+
+
+def _producers() -> dict:
+    return {out: s["name"] for s in STAGES for out in s["outputs"]}
+
+
+def _upstream(stage: dict, producers: dict) -> list:
+    deps = {producers[i] for i in stage["inputs"] if i in producers}
+    deps.update(stage.get("after", []))
+    deps.discard(stage["name"])
+    return sorted(deps)
+
+
+def fingerprint(stage: dict, hash_cache: dict, upstream_fps: dict) -> str:
+    payload = {
+        "inputs": {p: _file_hash(p, hash_cache) for p in stage["inputs"]},
+        "code": {p: _file_hash(p, hash_cache) for p in stage["code"]},
+        "params": stage.get("params", {}),
+        "args": stage.get("args", []),
+        "upstream": {n: upstream_fps.get(n) for n in stage.get("after", [])},
+        "python": sys.version.split()[0],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+# ─────────────────────────── execution ────────────────────────────────────
+def _run_stage(stage: dict, cwd: str = ROOT) -> dict:
+    """Run one stage in a subprocess; wait4 gives that child's own peak RSS.
+
+    Relative data/models/outputs paths resolve against `cwd`.
+    """
+    cmd = [sys.executable, "-m", stage["module"], *stage.get("args", [])]
+    for k, v in stage.get("params", {}).items():
+        cmd += [f"--{k}", str(v)]
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env)
+    peak_mb = None
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    else:
+        returncode = proc.wait()
+    return {
+        "returncode": returncode,
+        "wall_s": round(time.perf_counter() - t0, 2),
+        "peak_rss_mb": round(peak_mb, 1) if peak_mb is not None else None,
+    }
+
+
+def _select(targets: list) -> list:
+    """Targets plus everything upstream of them, in declaration order."""
+    if not targets:
+        return [s["name"] for s in STAGES]
+    by_name = {s["name"]: s for s in STAGES}
+    unknown = set(targets) - set(by_name)
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    producers, keep, todo = _producers(), set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in keep:
+            keep.add(name)
+            todo.extend(_upstream(by_name[name], producers))
+    return [s["name"] for s in STAGES if s["name"] in keep]
+
+
+def run_pipeline(targets: list = None, force: list = None, jobs: int = None,
+                 dry_run: bool = False) -> list:
+    by_name = {s["name"]: s for s in STAGES}
+    selected = _select(targets or [])
+    force = set(selected if force == ["all"] else force or [])
+    producers = _producers()
+    deps = {n: [d for d in _upstream(by_name[n], producers) if d in selected] for n in selected}
+
+    state = {"stages": {}, "hashes": {}}
+    if os.path.exists(os.path.join(ROOT, STATE_PATH)):
+        with open(os.path.join(ROOT, STATE_PATH)) as f:
+            state = json.load(f)
+    hash_cache = state.setdefault("hashes", {})
+
+    fps, results, failed, would_run = {}, {}, set(), set()
+    pending = list(selected)
+    running = {}
+
+    def start_ready(pool):
+        for name in list(pending):
+            if any(d in pending or d in running.values() for d in deps[name]):
+                continue
+            pending.remove(name)
+            if any(d in failed for d in deps[name]):
+                failed.add(name)
+                results[name] = {"stage": name, "status": "blocked"}
+                continue
+            stage = by_name[name]
+            fps[name] = fingerprint(stage, hash_cache, fps)
+            outputs_ok = all(os.path.exists(os.path.join(ROOT, o)) for o in stage["outputs"])
+            stale_upstream = any(d in would_run for d in deps[name])
+            if (name not in force and outputs_ok and not stale_upstream
+                    and state["stages"].get(name, {}).get("fingerprint") == fps[name]):
+                results[name] = {"stage": name, "status": "cached"}
+                continue
+            if dry_run:
+                would_run.add(name)
+                results[name] = {"stage": name, "status": "would run"}
+                continue
+            print(f"▶️  {name}")
+            running[pool.submit(_run_stage, stage)] = name
+
+    jobs = jobs or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        start_ready(pool)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                res = fut.result()
+                ok = res["returncode"] == 0
+                results[name] = {"stage": name, "status": "ran" if ok else "failed", **res}
+                if ok:
+                    state["stages"][name] = {"fingerprint": fps[name], "finished": time.time()}
+                else:
+                    failed.add(name)
+                print(f"{'✅' if ok else '❌'} {name}: {res['wall_s']}s, peak {res['peak_rss_mb']} MB")
+            start_ready(pool)
+
+    if not dry_run:
+        os.makedirs(os.path.dirname(os.path.join(ROOT, STATE_PATH)), exist_ok=True)
+        with open(os.path.join(ROOT, STATE_PATH), "w") as f:
+            json.dump(state, f, indent=1)
+        with open(os.path.join(ROOT, REPORT_PATH), "w") as f:
+            json.dump([results[n] for n in selected], f, indent=1)
+
+    print("\n📋 PIPELINE REPORT")
+    for n in selected:
+        r = results[n]
+        wall = f"{r['wall_s']:>8.2f}s" if "wall_s" in r else " " * 9
+        peak = f"{r['peak_rss_mb']:>8.1f} MB" if r.get("peak_rss_mb") is not None else ""
+        print(f"  {n:<20} {r['status']:<10} {wall} {peak}")
+    return [results[n] for n in selected]
+
+
+# ── CLI entry point ───────────────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the delivery pipeline, skipping up-to-date stages.")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--force", nargs="*", default=None, help="stages to rerun regardless ('all' for every stage)")
+    parser.add_argument("--jobs", type=int, default=None, help="max stages running at once")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--list", action="store_true", help="print stages and dependencies")
+    args = parser.parse_args()
+
+    if args.list:
+        producers = _producers()
+        for s in STAGES:
+            print(f"{s['name']:<20} ← {', '.join(_upstream(s, producers)) or '-'}")
+    else:
+        force = args.force
+        if force is not None and not force:
+            force = ["all"]
+        results = run_pipeline(args.targets, force, args.jobs, args.dry_run)
+        sys.exit(1 if any(r["status"] in ("failed", "blocked") for r in results) else 0)
@@ -2,8 +2,17 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
-from scripts.rl_agent.agent_runner import get_rl_optimal_reroute
+import re
+import time
+import json
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from scripts.rl_agent.agent_runner import get_rl_optimal_reroute_batch
 from scripts.heatmap_generator import generate_all_heatmaps
+from scripts.delivery_cube import build_cube
+from scripts.zone_hierarchy import build_hierarchy
+from scripts.profiling import profiled, stage
 
 # Paths
 INPUT_FILE = "data/lade_delivery_enhanced.csv"
@@ -21,11 +30,18 @@ FEATURE_COLS = [
     "distance_category_long", "distance_category_very_long"
 ]
 
-def main():
-    print("📥 Loading enhanced dataset...")
-    df = pd.read_csv(INPUT_FILE)
-    print(f"   {len(df):,} rows")
+LABEL_MAP = {0: "On Time", 1: "Delayed", 2: "Very Delayed"}
 
+# Batch mode (chunked, resumable)
+PARTS_DIR = "outputs/predictions_parts"
+MANIFEST_NAME = "_manifest.json"
+PART_RE = re.compile(r"part-(\d+)\.csv(\.tmp)?$")   # partition (or half-written one) → chunk id
+CHUNK_SIZE = 250_000
+
+
+@profiled("predict.predict_frame")
+def predict_frame(df: pd.DataFrame, clf, reg) -> pd.DataFrame:
+    """Drop anomalies, add model features and the two ML predictions."""
     # Drop anomalies — just like in training
     df = df[df["is_anomaly"] == 0].reset_index(drop=True)
 
@@ -35,37 +51,66 @@ def main():
             df[col] = 0
 
     X = df[FEATURE_COLS]
-
-    print("🔧 Loading models...")
-    clf = joblib.load(CLF_PATH)
-    reg = joblib.load(REG_PATH)
-
-    print("🔮 Making predictions...")
+    if X.empty:               # e.g. a batch chunk made only of anomalies
+        df["predicted_delay_label"] = pd.Series(dtype=object)
+        df["predicted_time_min"] = pd.Series(dtype=float)
+        return df
     df["predicted_delay_label"] = clf.predict(X)
     df["predicted_time_min"] = np.expm1(reg.predict(X))
 
     # Map numeric labels to readable classes
-    label_map = {0: "On Time", 1: "Delayed", 2: "Very Delayed"}
-    df["predicted_delay_label"] = df["predicted_delay_label"].map(label_map)
+    df["predicted_delay_label"] = df["predicted_delay_label"].map(LABEL_MAP)
+    return df
+
+
+@profiled("predict.main")
+def main():
+    print("📥 Loading enhanced dataset...")
+    with stage("load_csv"):
+        df = pd.read_csv(INPUT_FILE)
+    print(f"   {len(df):,} rows")
+
+    print("🔧 Loading models...")
+    with stage("load_models"):
+        clf = joblib.load(CLF_PATH)
+        reg = joblib.load(REG_PATH)
+
+    print("🔮 Making predictions...")
+    df = predict_frame(df, clf, reg)
 
     # ── RL Agent Integration ──────────────────────────────────────────────
     print("🤖 Running RL rerouting agent...")
-    reroutes = []
-    for idx, row in df.iterrows():
-        suggestion = get_rl_optimal_reroute(row)
-        reroutes.append(suggestion)
-    reroute_df = pd.DataFrame(reroutes)
+    t0 = time.perf_counter()
+    with stage("rl_reroute"):
+        reroute_df = get_rl_optimal_reroute_batch(df)
+    elapsed = time.perf_counter() - t0
+    print(f"   {len(df):,} rows in {elapsed:.2f}s ({len(df) / max(elapsed, 1e-9):,.0f} rows/s)")
     final_df = pd.concat([df, reroute_df], axis=1)
 
     # Save predictions
     os.makedirs("outputs", exist_ok=True)
-    final_df.to_csv(OUTPUT_PATH, index=False)
+    with stage("save_csv"):
+        final_df.to_csv(OUTPUT_PATH, index=False)
     print(f"✅ Predictions saved → {OUTPUT_PATH}")
 
+    # Aggregate cube for the dashboard's JSON heatmaps
+    print("🧊 Building delivery cube …")
+    try:
+        with stage("build_cube"):
+            build_cube(final_df)
+    except Exception as e:
+        print("⚠️ Delivery cube build failed:", e)
+    try:
+        with stage("build_hierarchy"):
+            build_hierarchy(final_df)
+    except Exception as e:
+        print("⚠️ Zone hierarchy build failed:", e)
+
     # Generate all heatmaps
     print("🎨 Generating heatmaps …")
     try:
-        generate_all_heatmaps(final_df, output_dir="outputs/")
+        with stage("heatmaps"):
+            generate_all_heatmaps(final_df, output_dir="outputs/")
     except Exception as e:
         print("⚠️ Heatmap generation failed:", e)
 
@@ -83,5 +128,131 @@ def main():
         print("Top route suggestions:")
         print(final_df["suggested_route"].value_counts().head())
 
+# ── Batch mode: chunked, multi-process, resumable ─────────────────────────
+_worker = {}
+
+
+def _init_worker(clf_path: str, reg_path: str):
+    """Runs once per pool process: load the models a single time."""
+    _worker["clf"] = joblib.load(clf_path)
+    _worker["reg"] = joblib.load(reg_path)
+
+
+def _score_chunk(chunk_id: int, chunk: pd.DataFrame, parts_dir: str) -> tuple:
+    t0 = time.perf_counter()
+    df = predict_frame(chunk, _worker["clf"], _worker["reg"])
+    df = pd.concat([df, get_rl_optimal_reroute_batch(df)], axis=1)
+
+    out = os.path.join(parts_dir, f"part-{chunk_id:05d}.csv")
+    tmp = out + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, out)          # a partition is either complete or absent
+    return chunk_id, len(df), time.perf_counter() - t0
+
+
+def _input_signature(path: str, chunksize: int) -> dict:
+    st = os.stat(path)
+    return {"input": os.path.abspath(path), "size": st.st_size,
+            "mtime": st.st_mtime, "chunksize": chunksize}
+
+
+def _load_manifest(path: str, signature: dict) -> dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get("signature") == signature:
+            return manifest
+        print("⚠️  Input or chunk size changed — ignoring previous checkpoint.")
+    return {"signature": signature, "done": {}}
+
+
+def _save_manifest(path: str, manifest: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+@profiled("predict.batch_main")
+def batch_main(input_file: str = INPUT_FILE,
+               parts_dir: str = PARTS_DIR,
+               chunksize: int = CHUNK_SIZE,
+               workers: int = None):
+    """Stream `input_file` in chunks, score them in a process pool and write
+    one partition per chunk. Finished chunks are recorded in a manifest so a
+    rerun picks up where the last one stopped."""
+    os.makedirs(parts_dir, exist_ok=True)
+    manifest_path = os.path.join(parts_dir, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path, _input_signature(input_file, chunksize))
+    done = manifest["done"]
+    if done:
+        print(f"⏩ Resuming: {len(done)} chunk(s) already scored")
+    # drop partitions the manifest does not vouch for (stale run or half-written)
+    for name in os.listdir(parts_dir):
+        m = PART_RE.match(name)
+        if m and (m.group(2) or str(int(m.group(1))) not in done):
+            os.remove(os.path.join(parts_dir, name))
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = 2 * workers       # bounds memory to a few chunks in flight
+    t0 = time.perf_counter()
+    rows = 0
+
+    def collect(futures, block_until):
+        nonlocal rows
+        while len(futures) > block_until:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                futures.remove(fut)
+                chunk_id, n, secs = fut.result()
+                done[str(chunk_id)] = n
+                rows += n
+                _save_manifest(manifest_path, manifest)
+                print(f"   ✅ chunk {chunk_id:>5d}: {n:,} rows in {secs:.1f}s")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(CLF_PATH, REG_PATH)) as pool:
+        futures = set()
+        for chunk_id, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize)):
+            if str(chunk_id) in done:
+                continue
+            futures.add(pool.submit(_score_chunk, chunk_id, chunk, parts_dir))
+            collect(futures, max_pending)
+        collect(futures, 0)
+
+    elapsed = time.perf_counter() - t0
+    print(f"🏁 Scored {rows:,} new rows in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s) → {parts_dir}")
+    return manifest
+
+
+@profiled("predict.merge_partitions")
+def merge_partitions(parts_dir: str = PARTS_DIR, output_path: str = OUTPUT_PATH):
+    """Concatenate partitions in chunk order into a single CSV, streaming."""
+    matches = (PART_RE.match(f) for f in os.listdir(parts_dir))
+    parts = [m.group(0) for m in sorted((m for m in matches if m and not m.group(2)),
+                                         key=lambda m: int(m.group(1)))]
+    with open(output_path, "w", newline="") as out:
+        for i, name in enumerate(parts):
+            with open(os.path.join(parts_dir, name)) as f:
+                header = f.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(f, out)
+    print(f"✅ Merged {len(parts)} partitions → {output_path}")
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Score deliveries with the ML models and RL agent.")
+    parser.add_argument("--batch", action="store_true", help="chunked, resumable multi-process scoring")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--merge", action="store_true", help="merge batch partitions into the full report")
+    args = parser.parse_args()
+
+    if args.batch:
+        batch_main(chunksize=args.chunksize, workers=args.workers)
+        if args.merge:
+            merge_partitions()
+    else:
+        main()
@@ -0,0 +1,254 @@
+# scripts/profiling.py
+# ----------------------------------------------------------------------
+# Opt-in profiling for pipeline scripts and API handlers.
+#
+#   WALMART_PROFILE=1                      nested stage timers
+#   WALMART_PROFILE=memory,cprofile        + tracemalloc peaks, cProfile per stage
+#   WALMART_PROFILE=all                    timers, memory, cprofile, sampling
+#   WALMART_PROFILE_DIR=outputs/profiles   where reports go
+#   WALMART_PROFILE_INTERVAL_MS=5          sampling profiler interval
+#
+# Hooks: @profiled() on functions, `with stage(name):` on blocks,
+# section(name) for flat scripts (closes the previous section).
+# Disabled (the default), @profiled returns the function unchanged and
+# stage() a shared nullcontext, so instrumented code pays nothing.
+#
+# At exit each process writes <run>.json (calls, total / self seconds,
+# peak MB per stage path) and <run>.stages.folded (collapsed stacks of
+# self time in µs, for flamegraph.pl / speedscope); sampling adds
+# <run>.samples.folded and cProfile one .prof per outermost stage.
+# Peaks are process-wide, so they overlap under concurrent API requests.
+# ----------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import inspect
+import threading
+import functools
+import contextlib
+import contextvars
+import tracemalloc
+from collections import Counter
+
+_MODES = os.getenv("WALMART_PROFILE", "").strip().lower()
+ENABLED = _MODES not in ("", "0", "false", "off", "no")
+_modes = {m for m in _MODES.replace(" ", "").split(",") if m} if ENABLED else set()
+if "all" in _modes:
+    _modes |= {"memory", "cprofile", "sampling"}
+MEMORY, CPROFILE, SAMPLING = ("memory" in _modes), ("cprofile" in _modes), ("sampling" in _modes)
+
+PROFILE_DIR     = os.getenv("WALMART_PROFILE_DIR", "outputs/profiles")
+SAMPLE_INTERVAL = float(os.getenv("WALMART_PROFILE_INTERVAL_MS", "5")) / 1000
+
+_NULL = contextlib.nullcontext()
+_stack = contextvars.ContextVar("profiling_stack", default=())
+_stats = {}                    # stage path → [calls, total_s, child_s, peak_bytes]
+_lock = threading.Lock()
+_cprofile_busy = False
+_open_section = []
+_run_id = None
+
+
+# ─────────────────────────── stage frames ─────────────────────────────────
+class _Frame:
+    __slots__ = ("path", "start", "child", "peak", "token", "prof")
+
+
+def _enter(name: str) -> _Frame:
+    global _cprofile_busy
+    stack = _stack.get()
+    f = _Frame()
+    f.path = (stack[-1].path if stack else ()) + (name,)
+    f.child, f.peak, f.prof = 0.0, 0, None
+    if MEMORY:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, peak)   # parent keeps what it saw so far
+        tracemalloc.reset_peak()
+        f.peak = current
+    if CPROFILE:
+        with _lock:
+            if not _cprofile_busy:                       # profilers don't nest
+                _cprofile_busy = True
+                f.prof = cProfile.Profile()
+                f.prof.enable()
+    f.token = _stack.set(stack + (f,))
+    f.start = time.perf_counter()
+    return f
+
+
+def _exit(f: _Frame):
+    global _cprofile_busy
+    elapsed = time.perf_counter() - f.start
+    _stack.reset(f.token)
+    parent = _stack.get()
+    if parent:
+        parent[-1].child += elapsed
+    if MEMORY:
+        f.peak = max(f.peak, tracemalloc.get_traced_memory()[1])
+        if parent:
+            parent[-1].peak = max(parent[-1].peak, f.peak)
+    if f.prof is not None:
+        f.prof.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        f.prof.dump_stats(os.path.join(PROFILE_DIR, f"{_run()}.{'.'.join(f.path)}.{time.time_ns()}.prof"))
+        with _lock:
+            _cprofile_busy = False
+    with _lock:
+        s = _stats.setdefault(f.path, [0, 0.0, 0.0, 0])
+        s[0] += 1
+        s[1] += elapsed
+        s[2] += f.child
+        s[3] = max(s[3], f.peak)
+
+
+class _Stage:
+    __slots__ = ("name", "frame")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.frame = _enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        _exit(self.frame)
+        return False
+
+
+# ─────────────────────────── public hooks ─────────────────────────────────
+def stage(name: str):
+    """Context manager timing a block as a child of the enclosing stage."""
+    return _Stage(name) if ENABLED else _NULL
+
+
+def profiled(name: str = None):
+    """Decorator form of stage(); identity when profiling is off."""
+    def wrap(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _Stage(label):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def section(name: str):
+    """Sequential stages for flat scripts: ends the previous section, starts `name`."""
+    if not ENABLED:
+        return
+    end_section()
+    _open_section.append(_enter(name))
+
+
+def end_section():
+    if _open_section:
+        _exit(_open_section.pop())
+
+
+# ─────────────────────────── sampling profiler ────────────────────────────
+class _Sampler(threading.Thread):
+    """Collapsed Python stacks of every other thread, every SAMPLE_INTERVAL seconds."""
+
+    def __init__(self):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.samples = Counter()
+        self.stop = threading.Event()
+
+    def run(self):
+        names = {}
+        while not self.stop.wait(SAMPLE_INTERVAL):
+            for tid, frame in sys._current_frames().items():
+                if tid == self.ident:
+                    continue
+                if tid not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                calls = []
+                while frame is not None:
+                    code = frame.f_code
+                    calls.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                calls.append(names.get(tid, str(tid)))
+                self.samples[";".join(reversed(calls))] += 1
+
+
+_sampler = None
+
+
+# ─────────────────────────── report ───────────────────────────────────────
+def _run() -> str:
+    global _run_id
+    if _run_id is None:
+        script = os.path.splitext(os.path.basename(sys.argv[0]))[0].lstrip("-") or "python"
+        _run_id = f"{script}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}"
+    return _run_id
+
+
+def report() -> dict:
+    with _lock:
+        stats = {p: list(s) for p, s in _stats.items()}
+    return {
+        "run": _run(),
+        "argv": sys.argv,
+        "modes": sorted(_modes),
+        "stages": [
+            {
+                "stage": "/".join(path),
+                "depth": len(path) - 1,
+                "calls": calls,
+                "total_s": round(total, 6),
+                "self_s": round(total - child, 6),
+                "peak_mb": round(peak / 2**20, 2) if MEMORY else None,
+            }
+            for path, (calls, total, child, peak) in sorted(stats.items())
+        ],
+        "sampling": ({"interval_ms": SAMPLE_INTERVAL * 1000, "samples": sum(_sampler.samples.values())}
+                     if _sampler else None),
+    }
+
+
+def write_report(directory: str = None) -> str:
+    """JSON report + folded stacks; called automatically at exit when enabled."""
+    while _open_section:
+        end_section()
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, _run())
+    rep = report()
+    with open(base + ".json", "w") as f:
+        json.dump(rep, f, indent=1)
+    with open(base + ".stages.folded", "w") as f:
+        for s in rep["stages"]:
+            us = int(s["self_s"] * 1e6)
+            if us > 0:
+                f.write(f"{s['stage'].replace('/', ';')} {us}\n")
+    if _sampler:
+        with open(base + ".samples.folded", "w") as f:
+            for stack, n in _sampler.samples.most_common():
+                f.write(f"{stack} {n}\n")
+    print(f"🔬 Profile written → {base}.json")
+    return base + ".json"
+
+
+if ENABLED:
+    if MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if SAMPLING:
+        _sampler = _Sampler()
+        _sampler.start()
+    atexit.register(write_report)
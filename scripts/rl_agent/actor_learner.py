@@ -0,0 +1,259 @@
+"""
+Actor / learner RL training.
+• Actor processes each step their own DeliveryVectorEnv over the shared
+  observation / reward tables, act ε‑greedily with a local QNet copy
+  (Ape‑X style per‑actor ε), and write transition blocks into a
+  per‑actor shared‑memory ring
+• The learner (this process) drains the rings into a ReplayBuffer,
+  trains on large batches and publishes flat QNet weights to shared
+  memory every SYNC_EVERY updates (seqlock: odd version = write in progress)
+• --scaling runs a fixed‑duration benchmark per actor count and reports
+  env steps/s and learner updates/s
+
+    python -m scripts.rl_agent.actor_learner --actors 4 --episodes 2000000
+    python -m scripts.rl_agent.actor_learner --scaling 1,2,4,8 --seconds 15
+"""
+import os, time, argparse
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np, pandas as pd
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+
+from .environment import DeliveryEnv, DeliveryVectorEnv
+from .agent import DQNAgent, QNet
+
+CSV            = "data/lade_delivery_enhanced.csv"
+OUT_MODEL      = "models/rl_dqn.pth"
+SCALING_CSV    = "outputs/rl_actor_scaling.csv"
+ACTOR_ENVS     = 64          # contexts per actor step = transitions per ring block
+RING_BLOCKS    = 64          # blocks per actor ring before the actor waits
+LEARNER_BATCH  = 1_024
+REPLAY_CAP     = 500_000
+SYNC_EVERY     = 50          # learner updates between weight publications
+UPDATES_PER_BLOCK = 1        # replay ratio: learner updates per drained block
+STARTUP_TIMEOUT = 120        # seconds to wait for the first transitions
+
+
+# ─────────────────────────── shared memory ────────────────────────────────
+class _Shared:
+    """Named numpy arrays backed by SharedMemory; picklable spec for children."""
+
+    def __init__(self, spec: dict, create: bool):
+        self.spec, self.shms, self.arrays = spec, {}, {}
+        for key, (name, shape, dtype) in spec.items():
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            shm = (shared_memory.SharedMemory(create=True, size=max(size, 1)) if create
+                   else shared_memory.SharedMemory(name=name))
+            self.shms[key] = shm
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, shapes: dict) -> "_Shared":
+        obj = cls({k: (None, s, d) for k, (s, d) in shapes.items()}, create=True)
+        obj.spec = {k: (obj.shms[k].name, s, d) for k, (_, s, d) in obj.spec.items()}
+        return obj
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self, unlink: bool = False):
+        self.arrays.clear()
+        for shm in self.shms.values():
+            shm.close()
+            if unlink:
+                shm.unlink()
+
+
+def _actor_eps(i: int, n: int) -> float:
+    return 0.4 ** (1 + 7 * i / max(n - 1, 1))
+
+
+def _actor(i: int, n_actors: int, spec: dict, stop, seed: int):
+    torch.set_num_threads(1)
+    sh = _Shared(spec, create=False)
+    try:
+        _actor_loop(i, n_actors, sh, stop, seed)
+    finally:
+        sh.close()          # views into the buffers died with _actor_loop's frame
+
+
+def _actor_loop(i: int, n_actors: int, sh: "_Shared", stop, seed: int):
+    env = DeliveryVectorEnv(num_envs=ACTOR_ENVS, tables=(sh["obs"], sh["rewards"], sh["delay"]))
+    obs_dim, n_actions = sh["obs"].shape[1], sh["rewards"].shape[1]
+    qnet = QNet(obs_dim, n_actions)
+    eps, rng = _actor_eps(i, n_actors), np.random.default_rng(seed)
+    ring = {k: sh[f"{k}_{i}"] for k in ("s", "a", "r", "ns", "d")}
+    head_tail = sh["head_tail"]          # [i, 0] written blocks, [i, 1] drained blocks
+    version, seen = sh["version"], -1
+
+    state, _ = env.reset(seed=seed)
+    while not stop.is_set():
+        v = int(version[0])
+        if v != seen and v % 2 == 0:
+            w = sh["weights"].copy()
+            if int(version[0]) == v:     # not overwritten while copying
+                vector_to_parameters(torch.from_numpy(w), qnet.parameters())
+                seen = v
+
+        with torch.no_grad():
+            actions = qnet(torch.from_numpy(state)).argmax(1).numpy()
+        explore = rng.random(ACTOR_ENVS) < eps
+        actions[explore] = rng.integers(0, n_actions, explore.sum())
+        next_state, reward, done, _, info = env.step(actions)
+
+        while head_tail[i, 0] - head_tail[i, 1] >= RING_BLOCKS:
+            if stop.is_set():
+                return
+            time.sleep(0.0005)
+        rows = slice((head_tail[i, 0] % RING_BLOCKS) * ACTOR_ENVS,
+                     (head_tail[i, 0] % RING_BLOCKS + 1) * ACTOR_ENVS)
+        ring["s"][rows], ring["a"][rows], ring["r"][rows] = state, actions, reward
+        ring["ns"][rows], ring["d"][rows] = info["final_observation"], done
+        head_tail[i, 0] += 1
+        state = next_state
+
+
+# ─────────────────────────── learner ──────────────────────────────────────
+def _publish(agent: DQNAgent, sh: _Shared):
+    version = sh["version"]
+    version[0] += 1                                   # odd: write in progress
+    sh["weights"][:] = parameters_to_vector(agent.qnet.parameters()).detach().numpy()
+    version[0] += 1
+
+
+def _check_actors(actors: list):
+    dead = [(i, p.exitcode) for i, p in enumerate(actors) if not p.is_alive()]
+    if dead:
+        raise RuntimeError("actor process(es) exited early: "
+                           + ", ".join(f"#{i} (exit code {code})" for i, code in dead))
+
+
+def _learn(agent: DQNAgent, sh: _Shared, actors: list, episodes: int, seconds: float) -> tuple:
+    """Drain actor rings and train until the episode or time budget is reached.
+    Raises if an actor dies or none produces a transition within STARTUP_TIMEOUT."""
+    head_tail = sh["head_tail"]
+    n_actors = len(actors)
+    consumed = updates = 0
+    t0 = None
+    started = time.perf_counter()
+    while True:
+        _check_actors(actors)
+        drained = 0
+        for i in range(n_actors):
+            while head_tail[i, 1] < head_tail[i, 0]:
+                slot = head_tail[i, 1] % RING_BLOCKS
+                rows = slice(slot * ACTOR_ENVS, (slot + 1) * ACTOR_ENVS)
+                agent.remember_batch(sh[f"s_{i}"][rows], sh[f"a_{i}"][rows], sh[f"r_{i}"][rows],
+                                     sh[f"ns_{i}"][rows], sh[f"d_{i}"][rows])
+                head_tail[i, 1] += 1
+                drained += 1
+        if t0 is None:
+            if not drained:
+                if time.perf_counter() - started > STARTUP_TIMEOUT:
+                    raise RuntimeError(f"no transitions from {n_actors} actor(s) "
+                                       f"within {STARTUP_TIMEOUT}s")
+                time.sleep(0.001)        # actors still starting up
+                continue
+            t0 = time.perf_counter()     # clock starts with the first transitions
+        consumed += drained * ACTOR_ENVS
+
+        n_updates = max(drained * UPDATES_PER_BLOCK, 1) if len(agent.mem) >= agent.batch else 0
+        for _ in range(n_updates):
+            agent.train_step()
+            updates += 1
+            if updates % SYNC_EVERY == 0:
+                _publish(agent, sh)
+
+        elapsed = time.perf_counter() - t0
+        if (episodes is not None and consumed >= episodes) or (seconds is not None and elapsed >= seconds):
+            return consumed, updates, elapsed
+
+
+def run(n_actors: int, episodes: int = None, seconds: float = None, save: bool = False) -> dict:
+    """Train until `episodes` transitions were consumed or `seconds` elapsed."""
+    print(f"📁 loading enhanced dataset … ({n_actors} actors)")
+    env = DeliveryEnv(pd.read_csv(CSV))
+    obs, rewards, delay = env.obs_matrix, env.reward_table, env.delay_flags
+    obs_dim, n_actions = obs.shape[1], rewards.shape[1]
+
+    agent = DQNAgent(state_size=obs_dim, action_size=n_actions,
+                     memory_cap=REPLAY_CAP, batch=LEARNER_BATCH)
+    n_weights = parameters_to_vector(agent.qnet.parameters()).numel()
+    ring_rows = RING_BLOCKS * ACTOR_ENVS
+    shapes = {
+        "obs": (obs.shape, "float32"), "rewards": (rewards.shape, "float32"),
+        "delay": (delay.shape, "int64"),
+        "weights": ((n_weights,), "float32"), "version": ((1,), "int64"),
+        "head_tail": ((n_actors, 2), "int64"),
+    }
+    for i in range(n_actors):
+        shapes.update({
+            f"s_{i}": ((ring_rows, obs_dim), "float32"), f"ns_{i}": ((ring_rows, obs_dim), "float32"),
+            f"a_{i}": ((ring_rows,), "int64"), f"r_{i}": ((ring_rows,), "float32"),
+            f"d_{i}": ((ring_rows,), "float32"),
+        })
+    sh = _Shared.create(shapes)
+    sh["obs"][:], sh["rewards"][:], sh["delay"][:] = obs, rewards, delay
+    sh["head_tail"][:] = 0
+    sh["version"][0] = 0
+    _publish(agent, sh)
+
+    ctx = mp.get_context("spawn")        # torch in the parent makes fork unsafe
+    stop = ctx.Event()
+    actors = [ctx.Process(target=_actor, args=(i, n_actors, sh.spec, stop, 1_000 + i), daemon=True)
+              for i in range(n_actors)]
+    for p in actors:
+        p.start()
+
+    try:
+        consumed, updates, elapsed = _learn(agent, sh, actors, episodes, seconds)
+    finally:
+        stop.set()
+        for p in actors:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        sh.close(unlink=True)
+
+    result = {
+        "actors": n_actors,
+        "wall_s": round(elapsed, 2),
+        "transitions": consumed,
+        "env_steps_per_s": round(consumed / elapsed),
+        "updates_per_s": round(updates / elapsed, 1),
+    }
+    print(f"🏁 {n_actors} actors: {result['env_steps_per_s']:,} env steps/s, "
+          f"{result['updates_per_s']:,} updates/s over {elapsed:.1f}s")
+    if save:
+        agent.epsilon = 0.0
+        agent.save(OUT_MODEL)
+    return result
+
+
+def scaling(actor_counts: list, seconds: float) -> pd.DataFrame:
+    rows = [run(n, seconds=seconds) for n in actor_counts]
+    table = pd.DataFrame(rows)
+    base = table["env_steps_per_s"].iloc[0] / table["actors"].iloc[0]
+    table["speedup"] = (table["env_steps_per_s"] / table["env_steps_per_s"].iloc[0]).round(2)
+    table["efficiency"] = (table["env_steps_per_s"] / (table["actors"] * base)).round(2)
+    os.makedirs(os.path.dirname(SCALING_CSV), exist_ok=True)
+    table.to_csv(SCALING_CSV, index=False)
+    print(f"\n📊  ACTOR SCALING ({os.cpu_count()} CPUs)")
+    print(table.to_string(index=False))
+    print(f"💾  Saved → {SCALING_CSV}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-process actor/learner DQN training.")
+    parser.add_argument("--actors", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--episodes", type=int, default=1_000_000, help="transitions to consume")
+    parser.add_argument("--scaling", default=None, help="comma-separated actor counts to benchmark")
+    parser.add_argument("--seconds", type=float, default=15.0, help="duration per scaling run")
+    args = parser.parse_args()
+
+    if args.scaling:
+        scaling([int(n) for n in args.scaling.split(",")], args.seconds)
+    else:
+        run(args.actors, episodes=args.episodes, save=True)
@@ -4,8 +4,9 @@ and 3‑actions used in DeliveryEnv.
 """
 import torch, torch.nn as nn, torch.optim as optim
 import random, numpy as np
-from collections import deque
 import os
+from .replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from .numpy_policy import export_npz, npz_path
 
 
 class QNet(nn.Module):
@@ -34,6 +35,7 @@ class DQNAgent:
         eps_decay=0.995,
         memory_cap=20_000,
         batch=128,
+        prioritized=False,
     ):
         self.state_size = state_size
         self.action_size = action_size
@@ -41,14 +43,19 @@ class DQNAgent:
         self.epsilon, self.eps_min, self.eps_decay = epsilon, eps_min, eps_decay
         self.batch = batch
 
-        self.mem = deque(maxlen=memory_cap)
+        buffer_cls = PrioritizedReplayBuffer if prioritized else ReplayBuffer
+        self.mem = buffer_cls(memory_cap, state_size, batch)
         self.qnet = QNet(state_size, action_size)
         self.opt = optim.Adam(self.qnet.parameters(), lr=lr)
         self.loss_fn = nn.MSELoss()
 
     # ------------------------------------------------------------------ API
     def remember(self, s, a, r, ns, done):
-        self.mem.append((s, a, r, ns, done))
+        self.mem.add(s, a, r, ns, done)
+
+    def remember_batch(self, s, a, r, ns, done):
+        """Store one transition per row of the (N, …) arrays."""
+        self.mem.add_batch(s, a, r, ns, done)
 
     def act(self, state, explore=True) -> int:
         if explore and random.random() < self.epsilon:
@@ -60,24 +67,32 @@ class DQNAgent:
             q_vals = self.qnet(state_t)[0].cpu().numpy()
         return int(np.argmax(q_vals))
 
+    def act_batch(self, states: np.ndarray, explore=True) -> np.ndarray:
+        """ε‑greedy actions for a (N, state_size) batch in one forward pass."""
+        states_t = torch.from_numpy(np.asarray(states, dtype=np.float32))
+        with torch.no_grad():
+            actions = self.qnet(states_t).argmax(dim=1).numpy()
+        if explore:
+            rand = np.random.random(len(actions)) < self.epsilon
+            actions[rand] = np.random.randint(0, self.action_size, rand.sum())
+        return actions
+
     def train_step(self):
         if len(self.mem) < self.batch:
             return
-        batch = random.sample(self.mem, self.batch)
-        s, a, r, ns, d = zip(*batch)
-
-        # Efficient conversion of list-of-arrays to tensor
-        s  = torch.from_numpy(np.vstack(s).astype(np.float32))
-        ns = torch.from_numpy(np.vstack(ns).astype(np.float32))
-        a  = torch.tensor(a, dtype=torch.int64).unsqueeze(1)
-        r  = torch.tensor(r, dtype=torch.float32).unsqueeze(1)
-        d  = torch.tensor(d, dtype=torch.float32).unsqueeze(1)
+        # tensors share memory with the buffer's preallocated batch arrays
+        s, a, r, ns, d, weights, idx = self.mem.sample(self.batch)
 
         q_cur = self.qnet(s).gather(1, a)
         with torch.no_grad():
             q_next = self.qnet(ns).max(1, keepdim=True)[0]
             target = r + (1 - d) * self.gamma * q_next
-        loss = self.loss_fn(q_cur, target)
+        if weights is None:
+            loss = self.loss_fn(q_cur, target)
+        else:
+            td = target - q_cur
+            loss = (weights * td.pow(2)).mean()
+            self.mem.update_priorities(idx, td.detach().squeeze(1).numpy())
 
         self.opt.zero_grad()
         loss.backward()
@@ -98,6 +113,11 @@ class DQNAgent:
             path,
         )
         print(f"💾 DQN model saved → {path}")
+        self.export_numpy(npz_path(path))
+
+    def export_numpy(self, path: str):
+        """QNet weights as a small .npz for the torch‑free runtime (numpy_policy.py)."""
+        export_npz(self.qnet.state_dict(), path)
 
     def load(self, path: str):
         chk = torch.load(path, map_location="cpu")
@@ -1,12 +1,16 @@
 """
 Utility wrapper: load the trained DQN once and expose
 get_rl_optimal_reroute(delivery_row) for the rest of the code‑base.
+Inference runs on the NumPy export of the QNet (numpy_policy.py); torch
+is only imported to export it from a checkpoint that predates the .npz.
+The runner is created lazily on first use.
 """
 import os, numpy as np, pandas as pd
-from .agent import DQNAgent
 from math import log1p
+from .numpy_policy import NumpyQNet, npz_path
 
 MODEL_PATH = "models/rl_dqn.pth"
+BATCH_SIZE = 65_536      # rows per QNet forward pass in predict_batch
 
 # ------------------------------------------------ feature engineering helpers
 def _engineer(row):
@@ -31,33 +35,100 @@ def _engineer(row):
     return np.array(list(feats.values()), dtype=np.float32)
 
 
+def _engineer_frame(df: pd.DataFrame) -> np.ndarray:
+    """Column-wise `_engineer`: same 12 features, same defaults, shape (N, 12)."""
+    n = len(df)
+
+    def col(name, default):
+        return df[name].to_numpy(dtype=np.float64) if name in df else np.full(n, default, dtype=np.float64)
+
+    dist = col("distance_km", 0.0)
+    w    = col("weight_kg", 0.0)
+    if "actual_time_min" in df:
+        tmin = col("actual_time_min", 60.0)
+    else:
+        tmin = col("predicted_time_min", 60.0)
+
+    feats = np.column_stack([
+        dist,
+        w,
+        col("same_zone", 0.0),
+        dist / (tmin + 1),
+        dist / (w + 1),
+        dist / ((tmin + 1) / 60),
+        np.log1p(dist),
+        w / (dist + 1),
+        col("traffic", 0.5),
+        col("weather", 0.5),
+        (df["time_slot"] == "morning").to_numpy(dtype=np.float64) if "time_slot" in df else np.zeros(n),
+        (df["weight_category"] == "heavy").to_numpy(dtype=np.float64) if "weight_category" in df else np.zeros(n),
+    ])
+    return feats.astype(np.float32)
+
+
+def _load_policy(path: str) -> NumpyQNet:
+    """NumPy weights for the checkpoint at `path`, exporting them once if missing or older."""
+    weights = npz_path(path)
+    if not os.path.exists(path):
+        print(f"⚠️  DQN model not found at {path}. Using un‑trained agent.")
+        weights = os.path.join(os.path.dirname(path), "rl_dqn_untrained.npz")
+        if not os.path.exists(weights):
+            from .agent import DQNAgent        # torch only on this path
+            DQNAgent().export_numpy(weights)
+    elif not os.path.exists(weights) or os.path.getmtime(weights) < os.path.getmtime(path):
+        from .agent import DQNAgent            # checkpoint saved before the .npz export existed
+        agent = DQNAgent()
+        agent.load(path)
+        agent.export_numpy(weights)
+    return NumpyQNet.load(weights)
+
+
 class RLAgentRunner:
     _actions = ["Continue", "Reroute_A", "Reroute_B"]
 
     def __init__(self, path: str = MODEL_PATH):
-        self.agent = DQNAgent()
-        if os.path.exists(path):
-            self.agent.load(path)
-            self.agent.epsilon = 0.0   # no exploration in prod
-        else:
-            print(f"⚠️  DQN model not found at {path}. Using un‑trained agent.")
+        self.policy = _load_policy(path)       # greedy only: no exploration in prod
 
     def predict(self, delivery_row):
         s = _engineer(delivery_row)
-        a = self.agent.act(s, explore=False)
+        a = int(self.policy.act(s[None, :])[0])
         return {
             "rl_action"      : self._actions[a],
             "rl_action_id"   : int(a),
             "rl_confidence"  : 1.0,  # placeholder (could derive from Q spread)
         }
 
+    def predict_batch(self, df: pd.DataFrame, batch_size: int = BATCH_SIZE) -> pd.DataFrame:
+        """Vectorised `predict` over a whole frame; same columns, same row order."""
+        states = _engineer_frame(df)
+        actions = np.empty(len(states), dtype=np.int64)
+        for start in range(0, len(states), batch_size):
+            actions[start:start + batch_size] = self.policy.act(states[start:start + batch_size])
+        return pd.DataFrame({
+            "rl_action"     : np.asarray(self._actions, dtype=object)[actions],
+            "rl_action_id"  : actions.astype(int),
+            "rl_confidence" : 1.0,
+        }, index=df.index)
+
 
 # public helper -------------------------------------------------------------
-_runner = RLAgentRunner()   # singleton
+_runner = None   # singleton, built on first use
+
+def _get_runner() -> RLAgentRunner:
+    global _runner
+    if _runner is None:
+        _runner = RLAgentRunner()
+    return _runner
+
 
 def get_rl_optimal_reroute(delivery_row):
     """Thin façade used by other modules."""
-    return _runner.predict(delivery_row)
+    return _get_runner().predict(delivery_row)
+
+
+def get_rl_optimal_reroute_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """Batched façade: one row of rl_* columns per row of `df`."""
+    return _get_runner().predict_batch(df)
 
 
 # quick manual test
@@ -68,3 +139,18 @@ if __name__ == "__main__":
         "time_slot": "morning", "weight_category": "heavy"
     }
     print(get_rl_optimal_reroute(demo))
+
+    # batched path must agree with the per-row path
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "distance_km": rng.uniform(0, 40, 5_000),
+        "weight_kg": rng.uniform(0, 60, 5_000),
+        "actual_time_min": rng.uniform(5, 240, 5_000),
+        "same_zone": rng.integers(0, 2, 5_000),
+        "time_slot": rng.choice(["morning", "Morning", "Night"], 5_000),
+        "weight_category": rng.choice(["light", "heavy"], 5_000),
+    })
+    per_row = pd.DataFrame([get_rl_optimal_reroute(r) for _, r in frame.iterrows()])
+    batched = get_rl_optimal_reroute_batch(frame)
+    assert np.array_equal(_engineer_frame(frame), np.vstack([_engineer(r) for _, r in frame.iterrows()]))
+    print("batch == per-row:", per_row.equals(batched.reset_index(drop=True)))
@@ -4,9 +4,12 @@ action 0 : keep current plan
 action 1 : moderate reroute   (lower risk, small cost)
 action 2 : aggressive reroute (highest cost, highest benefit)
 Reward is + if we cut delay risk / travel time, – if we hurt it.
+
+Observations and rewards for every row are precomputed once
+(`obs_matrix`, `reward_table`), so stepping is pure array indexing.
+DeliveryVectorEnv steps N contexts at a time over the same tables.
 """
 import numpy as np, pandas as pd
-from math import log1p
 import gymnasium as gym
 from gymnasium import spaces
 
@@ -18,6 +21,35 @@ _NUMERIC = [
 ]
 _OBS_DIM = len(_NUMERIC) + 4  # + traffic + weather + two 1‑hot flags
 
+# reward per (delay_label, action) before shaping — see DeliveryEnv.step
+_BASE_REWARD = np.array([[10, -3, -8],
+                         [-10, 8, 12]], dtype=np.float32)
+
+
+def _precompute(df: pd.DataFrame, stats: dict) -> tuple:
+    """(obs_matrix (N, _OBS_DIM) float32, reward_table (N, 3) float32)."""
+    cols = []
+    for c in _NUMERIC:
+        mn, mx = stats[c]
+        v = df[c].to_numpy(dtype=np.float64)
+        cols.append(np.zeros_like(v) if mx == mn else (v - mn) / (mx - mn))
+    cols += [
+        df["traffic"].to_numpy(dtype=np.float64),
+        df["weather"].to_numpy(dtype=np.float64),
+        (df["time_slot"] == "morning").to_numpy(dtype=np.float64),
+        (df["weight_category"] == "heavy").to_numpy(dtype=np.float64),
+    ]
+    obs = np.column_stack(cols).astype(np.float32)
+
+    eff = df["efficiency_km_per_min"].to_numpy()
+    wdr = df["weight_to_distance_ratio"].to_numpy()
+    eff_mean, wdr_mean = eff.mean(), wdr.mean()
+    shaping = (np.where(eff > eff_mean, 2, np.where(eff < 0.7 * eff_mean, -2, 0))
+               - (wdr > 1.5 * wdr_mean).astype(int))
+    delay = df["delay_label"].to_numpy(dtype=np.int64)
+    rewards = _BASE_REWARD[delay] + shaping[:, None].astype(np.float32)
+    return obs, rewards
+
 
 class DeliveryEnv(gym.Env):
     metadata: dict = {"render.modes": []}
@@ -48,7 +80,7 @@ class DeliveryEnv(gym.Env):
         self.df["avg_speed_kmh"] = self.df["distance_km"] / (
             (self.df["actual_time_min"] + 1) / 60
         )
-        self.df["log_distance"] = self.df["distance_km"].apply(log1p)
+        self.df["log_distance"] = np.log1p(self.df["distance_km"])
         self.df["weight_to_distance_ratio"] = self.df["weight_kg"] / (
             self.df["distance_km"] + 1
         )
@@ -60,30 +92,15 @@ class DeliveryEnv(gym.Env):
 
         # stats for min‑max scaling
         self.stats = {c: (self.df[c].min(), self.df[c].max()) for c in _NUMERIC}
-
-    def _norm(self, v, col):
-        mn, mx = self.stats[col]
-        return 0.0 if mx == mn else (v - mn) / (mx - mn)
-
-    def _make_obs(self, row: pd.Series) -> np.ndarray:
-        obs = [
-            self._norm(row[c], c) for c in _NUMERIC
-        ] + [
-            float(row["traffic"]),
-            float(row["weather"]),
-            1.0 if row["time_slot"] == "morning" else 0.0,
-            1.0 if row["weight_category"] == "heavy" else 0.0,
-        ]
-        return np.asarray(obs, dtype=np.float32)
+        self.obs_matrix, self.reward_table = _precompute(self.df, self.stats)
+        self.delay_flags = self.df["delay_label"].to_numpy(dtype=np.int64)
 
     # ---------------------------------------------------------------- gym API
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
-        self.idx = self.np_random.integers(0, len(self.df))
-        self.cur = self.df.iloc[self.idx]
-        self.base_delay_flag = int(self.cur["delay_label"])
-        obs = self._make_obs(self.cur)
-        return obs, {}
+        self.idx = int(self.np_random.integers(0, len(self.df)))
+        self.base_delay_flag = int(self.delay_flags[self.idx])
+        return self.obs_matrix[self.idx].copy(), {}
 
     def step(self, action: int):
         """
@@ -95,30 +112,90 @@ class DeliveryEnv(gym.Env):
             • Reroute_B   (2):
                   if delayed → +12 | else −8
         Small shaping bonuses based on efficiency / load difficulty.
+        Shaping compares against dataset means, so the whole table is
+        precomputed in `_precompute`.
         """
         delayed = self.base_delay_flag
-        if action == 0:
-            rew = 10 if delayed == 0 else -10
-        elif action == 1:
-            rew = 8 if delayed == 1 else -3
-        else:
-            rew = 12 if delayed == 1 else -8
-
-        # efficiency shaping
-        if self.cur["efficiency_km_per_min"] > self.df["efficiency_km_per_min"].mean():
-            rew += 2
-        elif self.cur["efficiency_km_per_min"] < 0.7 * self.df["efficiency_km_per_min"].mean():
-            rew -= 2
-        # load difficulty penalty
-        if self.cur["weight_to_distance_ratio"] > 1.5 * self.df["weight_to_distance_ratio"].mean():
-            rew -= 1
+        rew = float(self.reward_table[self.idx, action])
 
         info = {
-            "delivery_id": self.cur.get("delivery_id", f"row_{self.idx}"),
+            "delivery_id": (self.df["delivery_id"].iat[self.idx]
+                            if "delivery_id" in self.df else f"row_{self.idx}"),
             "delay": bool(delayed),
             "action": action,
             "reward_components": rew
         }
-        obs = self._make_obs(self.cur)  # not used again (one‑step bandit)
+        obs = self.obs_matrix[self.idx].copy()  # not used again (one‑step bandit)
         terminated, truncated = True, False
         return obs, float(rew), terminated, truncated, info
+
+
+class DeliveryVectorEnv(gym.vector.VectorEnv):
+    """
+    `num_envs` independent DeliveryEnv contexts stepped together.
+    Follows the gymnasium vector-env API: batched spaces, reset() → (obs, info),
+    step(actions) → (obs, rewards, terminations, truncations, info).
+    Every episode is one step, so each step auto-resets all contexts; the
+    observation each context ended on is in info["final_observation"].
+    """
+    metadata: dict = {"render.modes": [], "autoreset_mode": "same_step"}
+
+    def __init__(self, delivery_df: pd.DataFrame = None, num_envs: int = 256,
+                 env: DeliveryEnv = None, tables: tuple = None):
+        """Pass a frame, a built DeliveryEnv, or its (obs_matrix, reward_table, delay_flags)."""
+        if tables is None:
+            env = env if env is not None else DeliveryEnv(delivery_df)
+            tables = (env.obs_matrix, env.reward_table, env.delay_flags)
+        self.obs_matrix, self.reward_table, self.delay_flags = tables
+        self.num_envs = num_envs
+        self.is_vector_env = True
+        self.closed = False
+        self.single_observation_space = spaces.Box(
+            low=0.0, high=1.0, shape=(self.obs_matrix.shape[1],), dtype=np.float32
+        )
+        self.single_action_space = spaces.Discrete(self.reward_table.shape[1])
+        self.observation_space = gym.vector.utils.batch_space(self.single_observation_space, num_envs)
+        self.action_space = gym.vector.utils.batch_space(self.single_action_space, num_envs)
+        self._rng = np.random.default_rng()
+        self._rows = np.zeros(num_envs, dtype=np.int64)
+
+    def _draw(self):
+        self._rows = self._rng.integers(0, len(self.obs_matrix), self.num_envs)
+        return self.obs_matrix[self._rows]
+
+    def reset(self, *, seed=None, options=None):
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        return self._draw(), {"row_index": self._rows.copy()}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        rows = self._rows
+        rewards = self.reward_table[rows, actions]
+        info = {
+            "row_index": rows,
+            "delay": self.delay_flags[rows].astype(bool),
+            "final_observation": self.obs_matrix[rows],
+        }
+        terminations = np.ones(self.num_envs, dtype=bool)
+        truncations = np.zeros(self.num_envs, dtype=bool)
+        return self._draw(), rewards, terminations, truncations, info
+
+    def close_extras(self, **kwargs):
+        pass
+
+
+# quick manual test: the tables-only path the actor processes use
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    tables = (rng.random((100, _OBS_DIM), dtype=np.float32),
+              rng.normal(size=(100, 3)).astype(np.float32),
+              rng.integers(0, 2, 100))
+    venv = DeliveryVectorEnv(num_envs=8, tables=tables)
+    obs, _ = venv.reset(seed=0)
+    assert obs.shape == venv.observation_space.shape == (8, _OBS_DIM)
+    actions = venv.action_space.sample()
+    obs, rewards, term, trunc, info = venv.step(actions)
+    assert obs.shape == (8, _OBS_DIM) and term.all() and not trunc.any()
+    assert np.array_equal(rewards, tables[1][info["row_index"], actions])
+    print("DeliveryVectorEnv(tables=…) reset + step OK")
@@ -0,0 +1,103 @@
+"""
+Torch‑free inference for the reroute policy.
+DQNAgent.save writes the QNet weights next to the checkpoint as
+`<name>.npz` (w0, b0, w1, b1, …, one pair per Linear layer); NumpyQNet
+evaluates the MLP with plain matrix multiplies, so serving only needs
+NumPy.
+
+    python -m scripts.rl_agent.numpy_policy      # parity + startup time / RSS vs torch
+"""
+import os
+import numpy as np
+
+
+def npz_path(checkpoint: str) -> str:
+    return os.path.splitext(checkpoint)[0] + ".npz"
+
+
+class NumpyQNet:
+    """Linear → ReLU → … → Linear, weights stored as (out, in) like torch."""
+
+    def __init__(self, layers: list):
+        # pre‑transpose once so forward is x @ W + b
+        self.layers = [(np.ascontiguousarray(w.T, dtype=np.float32), b.astype(np.float32))
+                       for w, b in layers]
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyQNet":
+        with np.load(path) as z:
+            n = len([k for k in z.files if k.startswith("w")])
+            return cls([(z[f"w{i}"], z[f"b{i}"]) for i in range(n)])
+
+    def __call__(self, states: np.ndarray) -> np.ndarray:
+        x = np.asarray(states, dtype=np.float32)
+        for w, b in self.layers[:-1]:
+            x = x @ w
+            x += b
+            np.maximum(x, 0, out=x)
+        w, b = self.layers[-1]
+        return x @ w + b
+
+    def act(self, states: np.ndarray) -> np.ndarray:
+        return self(states).argmax(axis=1)
+
+
+def export_npz(state_dict: dict, path: str) -> None:
+    """Write a QNet state_dict (`net.<i>.weight/bias`) as w0, b0, w1, b1, …"""
+    weights = [k for k in state_dict if k.endswith(".weight")]
+    weights.sort(key=lambda k: int(k.split(".")[-2]))
+    arrays = {}
+    for i, wk in enumerate(weights):
+        arrays[f"w{i}"] = state_dict[wk].detach().cpu().numpy()
+        arrays[f"b{i}"] = state_dict[wk[:-len("weight")] + "bias"].detach().cpu().numpy()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(path, **arrays)
+
+
+# ─────────────────────────── comparison ───────────────────────────────────
+def _startup(code: str) -> tuple:
+    """(wall s, peak RSS MB) of a fresh interpreter running `code`."""
+    import sys, time, subprocess
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code])
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"startup probe failed: {code}")
+    return wall, usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from .agent_runner import MODEL_PATH, RLAgentRunner, _engineer_frame
+
+    runner = RLAgentRunner()                      # exports the .npz if only the .pth exists
+    rng = np.random.default_rng(0)
+    states = _engineer_frame(pd.DataFrame({
+        "distance_km": rng.uniform(0, 40, 10_000),
+        "weight_kg": rng.uniform(0, 60, 10_000),
+        "actual_time_min": rng.uniform(5, 240, 10_000),
+    }))
+
+    if os.path.exists(MODEL_PATH):
+        import torch
+        from .agent import DQNAgent
+        agent = DQNAgent()
+        agent.load(MODEL_PATH)
+        with torch.no_grad():
+            torch_q = agent.qnet(torch.from_numpy(states)).numpy()
+        np_q = runner.policy(states)
+        print(f"max |Δq| = {np.abs(torch_q - np_q).max():.2e}, "
+              f"action agreement = {(torch_q.argmax(1) == np_q.argmax(1)).mean():.2%}")
+
+    demo = "{'distance_km': 15.5, 'weight_kg': 25, 'actual_time_min': 90}"
+    probes = {
+        "numpy runtime": f"from scripts.rl_agent.agent_runner import get_rl_optimal_reroute as f; f({demo})",
+        "torch (before)": ("import torch; from scripts.rl_agent.agent import DQNAgent; "
+                           f"from scripts.rl_agent.agent_runner import _engineer; a = DQNAgent(); "
+                           f"a.act(_engineer({demo}), explore=False)"),
+    }
+    print("\n⏱️  cold start: import + first prediction")
+    for name, code in probes.items():
+        wall, rss = _startup(code)
+        print(f"  {name:<15} {wall:6.2f}s  {rss:7.1f} MB peak RSS")
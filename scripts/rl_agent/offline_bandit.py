@@ -0,0 +1,116 @@
+"""
+Offline full‑batch training for the reroute policy.
+DeliveryEnv is a one‑step contextual bandit whose reward for every action
+is known per row (`reward_table`), so instead of sampling one row per
+episode we regress QNet on all (state, action, reward) triples at once:
+QNet(s) → [r(s,0), r(s,1), r(s,2)], mini‑batch MSE over a few epochs.
+
+Policy value = mean reward of argmax‑Q actions on a held‑out split,
+reported for the offline model, the current DQN checkpoint and simple
+baselines.
+
+    python -m scripts.rl_agent.offline_bandit            # → models/rl_dqn_offline.pth
+    python -m scripts.rl_agent.offline_bandit --promote  # also replace rl_dqn.pth if better
+"""
+import os, time, argparse
+import numpy as np, pandas as pd
+import torch, torch.nn as nn
+
+from .environment import DeliveryEnv
+from .agent import DQNAgent
+
+CSV          = "data/lade_delivery_enhanced.csv"
+OUT_MODEL    = "models/rl_dqn_offline.pth"
+DQN_MODEL    = "models/rl_dqn.pth"
+EPOCHS       = 5
+BATCH        = 4_096
+LR           = 1e-3
+HOLDOUT      = 0.1
+EVAL_BATCH   = 65_536
+
+
+def _greedy(agent: DQNAgent, states: np.ndarray) -> np.ndarray:
+    out = np.empty(len(states), dtype=np.int64)
+    with torch.no_grad():
+        for i in range(0, len(states), EVAL_BATCH):
+            out[i:i + EVAL_BATCH] = agent.qnet(torch.from_numpy(states[i:i + EVAL_BATCH])).argmax(1).numpy()
+    return out
+
+
+def policy_value(rewards: np.ndarray, actions: np.ndarray) -> float:
+    return float(rewards[np.arange(len(actions)), actions].mean())
+
+
+def fit(states: np.ndarray, rewards: np.ndarray, epochs: int = EPOCHS, batch: int = BATCH,
+        lr: float = LR, seed: int = 42) -> DQNAgent:
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+    agent = DQNAgent(state_size=states.shape[1], action_size=rewards.shape[1], lr=lr,
+                     epsilon=0.0, memory_cap=1)
+    opt = agent.opt                      # DQNAgent's Adam, already at `lr`
+    loss_fn = nn.MSELoss()
+    S, R = torch.from_numpy(states), torch.from_numpy(rewards)
+
+    for epoch in range(1, epochs + 1):
+        t0 = time.perf_counter()
+        perm = torch.from_numpy(rng.permutation(len(states)))
+        total = 0.0
+        for i in range(0, len(perm), batch):
+            b = perm[i:i + batch]
+            loss = loss_fn(agent.qnet(S[b]), R[b])
+            opt.zero_grad()
+            loss.backward()
+            opt.step()
+            total += float(loss) * len(b)
+        dt = time.perf_counter() - t0
+        print(f"epoch {epoch}/{epochs} | MSE {total / len(states):7.3f} | "
+              f"{dt:.2f}s ({len(states) / dt:,.0f} rows/s)")
+    return agent
+
+
+def main(epochs: int = EPOCHS, batch: int = BATCH, promote: bool = False):
+    print("📁 loading enhanced dataset …")
+    env = DeliveryEnv(pd.read_csv(CSV))
+    states, rewards = env.obs_matrix, env.reward_table
+    rng = np.random.default_rng(0)
+    test = rng.random(len(states)) < HOLDOUT
+    print(f"   {len(states):,} rows × {rewards.shape[1]} actions "
+          f"({(~test).sum():,} train / {test.sum():,} held out)")
+
+    t0 = time.perf_counter()
+    agent = fit(states[~test], rewards[~test], epochs, batch)
+    print(f"🏁 offline training finished in {time.perf_counter() - t0:.1f}s")
+
+    S_te, R_te = states[test], rewards[test]
+    values = {
+        "offline": policy_value(R_te, _greedy(agent, S_te)),
+        "always_continue": policy_value(R_te, np.zeros(len(S_te), dtype=np.int64)),
+        "random": float(R_te.mean()),
+        "oracle": float(R_te.max(axis=1).mean()),
+    }
+    if os.path.exists(DQN_MODEL):
+        dqn = DQNAgent(state_size=states.shape[1], action_size=rewards.shape[1])
+        dqn.load(DQN_MODEL)
+        values["dqn_checkpoint"] = policy_value(R_te, _greedy(dqn, S_te))
+
+    print("\n📊  POLICY VALUE (mean reward, held‑out rows)")
+    for name, v in sorted(values.items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<16} {v:7.3f}")
+
+    agent.save(OUT_MODEL)
+    if promote:
+        if values["offline"] > values.get("dqn_checkpoint", -np.inf):
+            agent.save(DQN_MODEL)
+        else:
+            print(f"↩️  offline policy is not better than {DQN_MODEL}; kept the checkpoint")
+    return values
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline full-batch bandit training of QNet.")
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch", type=int, default=BATCH)
+    parser.add_argument("--promote", action="store_true",
+                        help=f"overwrite {DQN_MODEL} when the offline policy scores higher")
+    args = parser.parse_args()
+    main(args.epochs, args.batch, args.promote)
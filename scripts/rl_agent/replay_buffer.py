@@ -0,0 +1,184 @@
+"""
+Replay buffers for DQNAgent.
+ReplayBuffer            : preallocated float32 ring arrays, O(1) insert,
+                          vectorised uniform sampling
+PrioritizedReplayBuffer : same storage + sum‑tree proportional sampling
+                          (Schaul et al., α / β with importance weights)
+sample() gathers into preallocated batch arrays that back the returned
+tensors (torch.from_numpy), so a batch is neither re‑allocated nor copied
+into torch. The tensors are overwritten by the next sample() call.
+
+    python -m scripts.rl_agent.replay_buffer     # train_step throughput benchmark
+"""
+import time, random
+import numpy as np
+import torch
+from collections import deque
+
+
+class ReplayBuffer:
+    def __init__(self, capacity: int, state_size: int, batch: int = 128, seed: int = None):
+        self.capacity = capacity
+        self.s  = np.zeros((capacity, state_size), dtype=np.float32)
+        self.ns = np.zeros((capacity, state_size), dtype=np.float32)
+        self.a  = np.zeros((capacity, 1), dtype=np.int64)
+        self.r  = np.zeros((capacity, 1), dtype=np.float32)
+        self.d  = np.zeros((capacity, 1), dtype=np.float32)
+        self.pos, self.size = 0, 0
+        self.rng = np.random.default_rng(seed)
+        self._alloc_batch(batch)
+
+    def _alloc_batch(self, batch: int):
+        self.batch = batch
+        self._out = {k: np.empty((batch,) + v.shape[1:], dtype=v.dtype)
+                     for k, v in (("s", self.s), ("a", self.a), ("r", self.r),
+                                  ("ns", self.ns), ("d", self.d))}
+        self._tensors = {k: torch.from_numpy(v) for k, v in self._out.items()}
+
+    def __len__(self):
+        return self.size
+
+    # ------------------------------------------------------------------ insert
+    def add(self, s, a, r, ns, done):
+        i = self.pos
+        self.s[i], self.a[i, 0], self.r[i, 0], self.ns[i], self.d[i, 0] = s, a, r, ns, done
+        self._on_insert(np.array([i]))
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, s, a, r, ns, done):
+        n = len(a)
+        if n > self.capacity:                      # only the newest rows survive
+            s, a, r, ns, done = (x[-self.capacity:] for x in (s, a, r, ns, done))
+            n = self.capacity
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.s[idx], self.ns[idx] = s, ns
+        self.a[idx, 0], self.r[idx, 0], self.d[idx, 0] = a, r, done
+        self._on_insert(idx)
+        self.pos = int((self.pos + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+
+    def _on_insert(self, idx: np.ndarray):
+        pass
+
+    # ------------------------------------------------------------------ sample
+    def _gather(self, idx: np.ndarray) -> tuple:
+        for k in self._out:
+            np.take(getattr(self, k), idx, axis=0, out=self._out[k])
+        t = self._tensors
+        return t["s"], t["a"], t["r"], t["ns"], t["d"]
+
+    def sample(self, batch: int = None) -> tuple:
+        """(s, a, r, ns, d, weights, idx); weights is None for uniform sampling."""
+        if batch is not None and batch != self.batch:
+            self._alloc_batch(batch)
+        idx = self.rng.integers(0, self.size, self.batch)
+        return (*self._gather(idx), None, idx)
+
+    def update_priorities(self, idx: np.ndarray, td_errors: np.ndarray):
+        pass
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    def __init__(self, capacity: int, state_size: int, batch: int = 128, seed: int = None,
+                 alpha: float = 0.6, beta: float = 0.4, beta_steps: int = 100_000, eps: float = 1e-3):
+        super().__init__(capacity, state_size, batch, seed)
+        self.alpha, self.beta0, self.beta_steps, self.eps = alpha, beta, beta_steps, eps
+        self.leaves = 1 << max(capacity - 1, 1).bit_length()
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)   # tree[1] = total
+        self.max_priority = 1.0
+        self.samples = 0
+
+    def _set(self, idx: np.ndarray, priorities: np.ndarray):
+        node = idx + self.leaves
+        self.tree[node] = priorities
+        node = np.unique(node // 2)
+        while node[0] >= 1:
+            self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+            if node[0] == 1:
+                break
+            node = np.unique(node // 2)
+
+    def _on_insert(self, idx: np.ndarray):
+        self._set(idx, np.full(len(idx), self.max_priority))
+
+    def sample(self, batch: int = None) -> tuple:
+        if batch is not None and batch != self.batch:
+            self._alloc_batch(batch)
+        total = self.tree[1]
+        # one stratified draw per segment, then walk all draws down the tree together
+        u = (np.arange(self.batch) + self.rng.random(self.batch)) * (total / self.batch)
+        node = np.ones(self.batch, dtype=np.int64)
+        while node[0] < self.leaves:
+            left = 2 * node
+            go_right = u > self.tree[left]
+            u = np.where(go_right, u - self.tree[left], u)
+            node = left + go_right
+        idx = np.minimum(node - self.leaves, self.size - 1)
+
+        beta = min(1.0, self.beta0 + (1.0 - self.beta0) * self.samples / self.beta_steps)
+        self.samples += 1
+        probs = self.tree[idx + self.leaves] / total
+        weights = (self.size * probs) ** -beta
+        weights = torch.from_numpy((weights / weights.max()).astype(np.float32)).unsqueeze(1)
+        return (*self._gather(idx), weights, idx)
+
+    def update_priorities(self, idx: np.ndarray, td_errors: np.ndarray):
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self._set(idx, priorities)
+
+
+# ─────────────────────────── benchmark ────────────────────────────────────
+def _legacy_train_step(agent, mem: deque):
+    """The deque + random.sample + np.vstack path DQNAgent used before."""
+    batch = random.sample(mem, agent.batch)
+    s, a, r, ns, d = zip(*batch)
+    s  = torch.from_numpy(np.vstack(s).astype(np.float32))
+    ns = torch.from_numpy(np.vstack(ns).astype(np.float32))
+    a  = torch.tensor(a, dtype=torch.int64).unsqueeze(1)
+    r  = torch.tensor(r, dtype=torch.float32).unsqueeze(1)
+    d  = torch.tensor(d, dtype=torch.float32).unsqueeze(1)
+    q_cur = agent.qnet(s).gather(1, a)
+    with torch.no_grad():
+        target = r + (1 - d) * agent.gamma * agent.qnet(ns).max(1, keepdim=True)[0]
+    loss = agent.loss_fn(q_cur, target)
+    agent.opt.zero_grad()
+    loss.backward()
+    agent.opt.step()
+
+
+def benchmark(steps: int = 2_000, capacity: int = 20_000, state_size: int = 12):
+    from .agent import DQNAgent
+
+    rng = np.random.default_rng(0)
+    s = rng.random((capacity, state_size), dtype=np.float32)
+    a = rng.integers(0, 3, capacity)
+    r = rng.normal(size=capacity).astype(np.float32)
+    d = np.ones(capacity, dtype=np.float32)
+
+    rows = []
+    legacy = DQNAgent(state_size=state_size, memory_cap=capacity)
+    mem = deque(zip(s, a, r, s, d), maxlen=capacity)
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        _legacy_train_step(legacy, mem)
+    rows.append(("deque (before)", steps / (time.perf_counter() - t0)))
+
+    for name, prioritized in (("ring buffer", False), ("prioritized", True)):
+        agent = DQNAgent(state_size=state_size, memory_cap=capacity, prioritized=prioritized)
+        agent.remember_batch(s, a, r, s, d)
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            agent.train_step()
+        rows.append((name, steps / (time.perf_counter() - t0)))
+
+    print(f"\n⏱️  train_step throughput (batch {legacy.batch}, {steps:,} steps)")
+    base = rows[0][1]
+    for name, rate in rows:
+        print(f"  {name:<16} {rate:>9,.0f} steps/s   ×{rate / base:.2f}")
+    return rows
+
+
+if __name__ == "__main__":
+    benchmark()
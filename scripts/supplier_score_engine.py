@@ -9,9 +9,12 @@ import pandas as pd
 import numpy as np
 import os
 
+from scripts.profiling import section, end_section
+
 PRED_CSV  = "outputs/predictions_full_report.csv"
 OUT_CSV   = "outputs/supplier_scores.csv"
 
+section("supplier_scores.load")
 print("📥 Loading predictions data …")
 df = pd.read_csv(PRED_CSV)
 print(f"   Rows loaded: {len(df):,}")
@@ -19,6 +22,7 @@ print(f"   Rows loaded: {len(df):,}")
 # ────────────────────────────────────────────────────────────────────
 # 1️⃣  Ensure supplier column
 # --------------------------------------------------------------------
+section("supplier_scores.supplier_column")
 if "supplier" not in df.columns:
     print("⚠️  No supplier column found – creating synthetic suppliers from from_zone")
 
@@ -35,6 +39,7 @@ if "supplier" not in df.columns:
 # ────────────────────────────────────────────────────────────────────
 # 2️⃣  Make sure predicted_delay_label is in string form
 # --------------------------------------------------------------------
+section("supplier_scores.labels")
 delay_map = {0: "On Time", 1: "Delayed", 2: "Very Delayed"}
 
 if pd.api.types.is_numeric_dtype(df["predicted_delay_label"]):
@@ -51,6 +56,7 @@ print(df["predicted_delay_label"].value_counts(dropna=False))
 # ────────────────────────────────────────────────────────────────────
 # 3️⃣  KPI calculations
 # --------------------------------------------------------------------
+section("supplier_scores.kpis")
 print("\n📊 Computing KPIs per supplier …")
 
 on_time_rate = (
@@ -125,6 +131,8 @@ kpi["total_rl_time_saved"]  = kpi["supplier"].map(rl_savings)          .fillna(0
 # ────────────────────────────────────────────────────────────────────
 # 4️⃣  Normalisation helpers
 # --------------------------------------------------------------------
+section("supplier_scores.scoring")
+
 def safe_normalize(series: pd.Series, reverse: bool = False) -> pd.Series:
     if series.max() == series.min():
         return pd.Series(0.5, index=series.index)
@@ -187,10 +195,13 @@ kpi["business_impact"] = (
 # ────────────────────────────────────────────────────────────────────
 # 6️⃣  Save results & dashboard printout
 # --------------------------------------------------------------------
+section("supplier_scores.save")
 kpi_sorted = kpi.sort_values("score", ascending=False)
 os.makedirs("outputs", exist_ok=True)
 kpi_sorted.to_csv(OUT_CSV, index=False)
 
+end_section()
+
 print(f"\n✅ Supplier scores saved → {OUT_CSV}")
 print("\n🏆 SUPPLIER PERFORMANCE DASHBOARD")
 print("=" * 50)
@@ -0,0 +1,107 @@
+# scripts/synthetic_dataset.py
+# ----------------------------------------------------------------------
+# Offline, deterministic stand-in for generate_dataset.py.
+# Writes data/lade_delivery_cleaned.csv-compatible rows (same columns,
+# same time-slot rules, constant 5 kg weight) at any size:
+# • from_zone : AOI ids with Zipf-like popularity
+# • to_zone   : the AOI's home region most of the time
+# • accept_time: 2018, hour-of-day profile peaking late morning / afternoon
+# • distance_km: log-normal (median ~2 km), capped at 50 km
+# • actual_time_min: distance + slot + per-zone effects, log-normal noise
+# Rows are generated in fixed-size chunks seeded by (seed, chunk), so the
+# output is identical regardless of memory or chunk timing.
+#
+#   python -m scripts.synthetic_dataset --rows 1000000
+# ----------------------------------------------------------------------
+
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+OUTPUT_PATH = "data/lade_delivery_cleaned.csv"
+CHUNK_ROWS  = 1_000_000
+N_ZONES     = 3_000
+N_REGIONS   = 120
+HOME_REGION_P = 0.85
+WEIGHT_KG   = 5.0          # generate_dataset.py uses the same dummy constant
+
+# relative order volume per hour of day (0–23)
+HOUR_PROFILE = np.array([1, 1, 1, 1, 1, 2, 4, 7, 10, 12, 13, 12,
+                         10, 11, 12, 12, 11, 9, 7, 5, 4, 3, 2, 1], dtype=float)
+SLOT_DELAY   = {"Morning": 0.0, "Afternoon": 8.0, "Evening": 14.0, "Night": 25.0}
+
+
+def _time_slot(hour: np.ndarray) -> np.ndarray:
+    """Vectorised get_time_slot from generate_dataset.py."""
+    return np.select(
+        [(hour >= 6) & (hour < 12), (hour >= 12) & (hour < 18), (hour >= 18) & (hour < 22)],
+        ["Morning", "Afternoon", "Evening"],
+        "Night",
+    )
+
+
+def _zone_tables(seed: int) -> tuple:
+    rng = np.random.default_rng([seed, 0])
+    popularity = 1.0 / np.arange(1, N_ZONES + 1) ** 0.9
+    popularity = rng.permutation(popularity / popularity.sum())
+    home_region = rng.integers(0, N_REGIONS, N_ZONES)
+    zone_effect = rng.normal(0.0, 12.0, N_ZONES)          # slow / fast pickup areas
+    return popularity, home_region, zone_effect
+
+
+def generate_chunk(n: int, chunk: int, seed: int, tables: tuple, id_offset: int) -> pd.DataFrame:
+    popularity, home_region, zone_effect = tables
+    rng = np.random.default_rng([seed, chunk + 1])
+
+    from_zone = rng.choice(N_ZONES, size=n, p=popularity)
+    to_zone = np.where(rng.random(n) < HOME_REGION_P, home_region[from_zone],
+                       rng.integers(0, N_REGIONS, n))
+
+    day = rng.integers(0, 365, n)
+    hour = rng.choice(24, size=n, p=HOUR_PROFILE / HOUR_PROFILE.sum())
+    seconds = rng.integers(0, 3600, n)
+    accept_time = (np.datetime64("2018-01-01T00:00:00")
+                   + (day * 86_400 + hour * 3600 + seconds).astype("timedelta64[s]"))
+    time_slot = _time_slot(hour)
+
+    distance = np.minimum(rng.lognormal(mean=np.log(2.0), sigma=0.9, size=n), 50.0)
+    slot_delay = pd.Series(time_slot).map(SLOT_DELAY).to_numpy()
+    expected = 25.0 + 6.0 * distance + slot_delay + zone_effect[from_zone]
+    actual = np.maximum(expected, 5.0) * rng.lognormal(0.0, 0.45, n)
+
+    return pd.DataFrame({
+        "delivery_id": np.arange(id_offset, id_offset + n),
+        "accept_time": accept_time,
+        "from_zone": from_zone,
+        "to_zone": to_zone,
+        "time_slot": time_slot,
+        "weight_kg": WEIGHT_KG,
+        "distance_km": distance.round(4),
+        "actual_time_min": actual.round(2),
+    })
+
+
+def generate(rows: int, path: str = OUTPUT_PATH, seed: int = 42) -> str:
+    t0 = time.perf_counter()
+    tables = _zone_tables(seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    for chunk, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        part = generate_chunk(min(CHUNK_ROWS, rows - start), chunk, seed, tables, start)
+        part.to_csv(tmp, mode="w" if chunk == 0 else "a", header=chunk == 0, index=False,
+                    date_format="%Y-%m-%d %H:%M:%S")
+    os.replace(tmp, path)
+    print(f"✅ {rows:,} synthetic deliveries → {path} in {time.perf_counter() - t0:.1f}s")
+    return path
+
+
+# ── CLI entry point ───────────────────────────────────────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deterministic synthetic LaDe-style deliveries.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    args = parser.parse_args()
+    generate(args.rows, args.output, args.seed)
@@ -2,10 +2,16 @@
 Train a 3‑class XGBoost delay classifier + Random‑Forest duration regressor
 • Drops anomaly rows                (is_anomaly == 1)
 • Uses log‑transformed target (ln(1+minutes)) for the regressor
+• --params models/best_params.json  uses hyper‑parameters found by tune_models.py
+• --out-of-core                     streams the CSV in chunks (XGBoost external memory);
+                                    the regressor becomes a histogram XGBoost model
+• --update                          warm‑starts the saved models on deliveries newer than
+                                    the last training watermark, guarded by a holdout check
 Compatible with data/lade_delivery_enhanced.csv.
 """
 
-import os, time, joblib, numpy as np, pandas as pd
+import os, copy, json, time, shutil, argparse, tempfile, joblib, numpy as np, pandas as pd
+import xgboost as xgb
 from math import sqrt
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import (
@@ -14,38 +20,18 @@ from sklearn.metrics import (
 )
 from sklearn.model_selection import train_test_split
 from sklearn.utils.class_weight import compute_class_weight
-from xgboost import XGBClassifier
+from xgboost import XGBClassifier, XGBRegressor
+
+from scripts.drift_monitor import build_reference, save_reference, REFERENCE_PATH, NUMERIC, CATEGORICAL
 
 # ── Paths ────────────────────────────────────────────────────────────────
 INPUT_CSV = "data/lade_delivery_enhanced.csv"
 CLF_PATH  = "models/delay_classifier.pkl"
 REG_PATH  = "models/duration_regressor.pkl"
+STATE_PATH = "models/training_state.json"     # per‑model training watermarks
 
-os.makedirs("models", exist_ok=True)
-os.makedirs("outputs", exist_ok=True)
-
-print("🚀  Training pipeline started")
-t0 = time.time()
-
-# ── 1. Load & clean dataset ──────────────────────────────────────────────
-df = pd.read_csv(INPUT_CSV)
-print(f"📁  Loaded {len(df):,} rows before cleaning")
-
-# Drop anomalous rows
-orig_rows = len(df)
-df = df[df["is_anomaly"] == 0].reset_index(drop=True)
-print(f"🧹  Removed anomalies: {orig_rows - len(df):,} rows → {len(df):,} remain")
-
-# ── 2. Build multiclass delay label ──────────────────────────────────────
-def classify_delay(t):
-    return 0 if t <= 40 else 1 if t <= 70 else 2
-
-df["delay_label"] = df["actual_time_min"].apply(classify_delay)
-print("🔢  Class distribution:")
-print(df["delay_label"].value_counts().sort_index())
-
-# ── 3. Feature matrix (same engineered cols) ─────────────────────────────
-feature_cols = [
+# ── Features & labels ────────────────────────────────────────────────────
+FEATURE_COLS = [
     "distance_km", "weight_kg", "same_zone", "weight_per_km",
     "time_slot_Morning", "time_slot_Night",
     "weight_category_light", "weight_category_medium",
@@ -53,33 +39,12 @@ feature_cols = [
     "distance_category_short", "distance_category_medium",
     "distance_category_long", "distance_category_very_long"
 ]
-for col in feature_cols:       # ensure all one‑hot cols exist
-    if col not in df.columns:
-        df[col] = 0
-
-X       = df[feature_cols]
-y_class = df["delay_label"]
-y_reg   = np.log1p(df["actual_time_min"])   # log‑transform target
-
-print(f"🧮  Feature matrix shape: {X.shape}")
-
-# ── 4. Train/test splits ─────────────────────────────────────────────────
-Xc_tr, Xc_te, yc_tr, yc_te = train_test_split(
-    X, y_class, test_size=0.2, random_state=42, stratify=y_class
-)
-Xr_tr, Xr_te, yr_tr, yr_te = train_test_split(
-    X, y_reg, test_size=0.2, random_state=42
-)
-
-# ── 5. Class weights & sample weights ────────────────────────────────────
-classes        = np.array([0, 1, 2])
-class_weights  = compute_class_weight("balanced", classes=classes, y=yc_tr)
-sample_weight  = yc_tr.map(dict(zip(classes, class_weights))).values
-print("⚖️  Class weights:", dict(zip(classes, class_weights)))
+CLASSES     = np.array([0, 1, 2])
+CLASS_NAMES = ["On Time", "Delayed", "Very Delayed"]
+DELAY_BINS  = [40, 70]          # ≤40 → On Time, ≤70 → Delayed, else Very Delayed
 
-# ── 6. Train XGBoost classifier ───────────────────────────────────────────
-print("🎯  Training XGBoost classifier …")
-clf = XGBClassifier(
+# ── Default hyper‑parameters ─────────────────────────────────────────────
+CLF_PARAMS = dict(
     objective="multi:softprob",
     num_class=3,
     n_estimators=100,
@@ -93,18 +58,7 @@ clf = XGBClassifier(
     n_jobs=-1,
     tree_method="hist",
 )
-clf.fit(Xc_tr, yc_tr, sample_weight=sample_weight)
-
-y_pred = clf.predict(Xc_te)
-print("\n📊  Classification Report (test):")
-print(classification_report(
-      yc_te, y_pred, digits=3,
-      target_names=["On Time", "Delayed", "Very Delayed"]))
-print("Balanced Accuracy:", balanced_accuracy_score(yc_te, y_pred))
-
-# ── 7. Train Random‑Forest regressor (log‑target) ────────────────────────
-print("\n📈  Training Random‑Forest regressor (log‑target) …")
-reg = RandomForestRegressor(
+REG_PARAMS = dict(
     n_estimators=100,
     max_depth=12,
     min_samples_split=4,
@@ -112,21 +66,455 @@ reg = RandomForestRegressor(
     random_state=42,
     n_jobs=-1,
 )
-reg.fit(Xr_tr, yr_tr)
+# Out‑of‑core regressor: RF needs every row in memory, histogram boosting does not
+REG_OOC_PARAMS = dict(
+    objective="reg:squarederror",
+    n_estimators=300,
+    max_depth=8,
+    learning_rate=0.1,
+    subsample=0.8,
+    colsample_bytree=0.8,
+    random_state=42,
+    n_jobs=-1,
+    tree_method="hist",
+)
+CHUNK_SIZE = 500_000
+
+# Warm‑start updates
+WATERMARK_COL = "accept_time"   # falls back to row position when the column is absent
+UPDATE_TREES  = 25              # trees added per update (both models)
+MIN_NEW_ROWS  = 1_000
+BA_TOLERANCE  = 0.005           # allowed balanced‑accuracy drop on the holdout
+MAE_TOLERANCE = 0.25            # allowed MAE increase (minutes) on the holdout
+
+
+# ── Building blocks (shared with tune_models.py) ─────────────────────────
+def delay_classes(minutes: pd.Series) -> pd.Series:
+    """0 if t ≤ 40, 1 if t ≤ 70, else 2 — one np.digitize call."""
+    return pd.Series(np.digitize(minutes.to_numpy(), DELAY_BINS, right=True), index=minutes.index)
+
+
+def load_training_data(path: str = INPUT_CSV) -> pd.DataFrame:
+    """Load, drop anomalies, add the multiclass label and any missing one‑hot cols."""
+    df = pd.read_csv(path)
+    print(f"📁  Loaded {len(df):,} rows before cleaning")
+    watermark = current_watermark(df)
+    df = prepare_training_frame(df)
+    df.attrs["watermark"] = watermark
+    return df
+
+
+def prepare_training_frame(df: pd.DataFrame) -> pd.DataFrame:
+    orig_rows = len(df)
+    df = df[df["is_anomaly"] == 0].reset_index(drop=True)
+    print(f"🧹  Removed anomalies: {orig_rows - len(df):,} rows → {len(df):,} remain")
+
+    df["delay_label"] = delay_classes(df["actual_time_min"])
+    for col in FEATURE_COLS:       # ensure all one‑hot cols exist
+        if col not in df.columns:
+            df[col] = 0
+    return df
+
+
+# ── Watermarks ───────────────────────────────────────────────────────────
+def watermark_step(wm: dict, raw: pd.DataFrame) -> dict:
+    """Fold the next rows of the file (in order) into watermark `wm`.
+
+    With a timestamp column the watermark is the latest timestamp plus how
+    many rows carry it, so later arrivals with the same timestamp still count
+    as new; `rows` is the append‑order fallback.
+    """
+    rows = wm.get("rows", 0) + len(raw)
+    if WATERMARK_COL not in raw:
+        return {"column": None, "rows": rows}
+    ts = pd.to_datetime(raw[WATERMARK_COL])
+    top = ts.max()
+    prev = pd.to_datetime(wm["value"]) if wm.get("value") else None
+    if pd.isna(top) or (prev is not None and top < prev):
+        value, at_value = prev, wm.get("at_value", 0)
+    elif prev is not None and top == prev:
+        value, at_value = prev, wm.get("at_value", 0) + int((ts == top).sum())
+    else:
+        value, at_value = top, int((ts == top).sum())
+    return {"column": WATERMARK_COL, "value": None if value is None else str(value),
+            "at_value": at_value, "rows": rows}
+
+
+def current_watermark(raw: pd.DataFrame) -> dict:
+    """Latest delivery covered by `raw` (before anomaly filtering)."""
+    return watermark_step({}, raw)
+
+
+def rows_after(raw: pd.DataFrame, watermark: dict) -> pd.DataFrame:
+    """Rows of `raw` newer than `watermark` (timestamp column, else append order)."""
+    col = watermark.get("column")
+    if col and col in raw and watermark.get("value") is not None:
+        ts = pd.to_datetime(raw[col])
+        value = pd.to_datetime(watermark["value"])
+        keep = (ts > value).to_numpy()
+        seen = watermark.get("at_value")      # absent in watermarks written before it existed
+        if seen is not None:
+            tied = np.flatnonzero((ts == value).to_numpy())
+            keep[tied[seen:]] = True          # same timestamp, appended after the watermark
+        return raw[keep]
+    return raw.iloc[watermark.get("rows", 0):]
+
+
+def load_state() -> dict:
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH) as f:
+        return json.load(f)
+
+
+def save_state(state: dict):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    with open(STATE_PATH, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def class_weights(y) -> dict:
+    """Balanced weights over the classes present in `y`; absent classes get 1
+    (small update batches often miss one)."""
+    present = np.intersect1d(CLASSES, np.unique(y))
+    weights = dict.fromkeys(CLASSES.tolist(), 1.0)
+    weights.update(zip(present.tolist(), compute_class_weight("balanced", classes=present, y=y)))
+    return weights
+
+
+def class_sample_weight(y: pd.Series) -> np.ndarray:
+    return pd.Series(y).map(class_weights(y)).values
+
+
+def train_classifier(X, y, params: dict = None) -> XGBClassifier:
+    clf = XGBClassifier(**{**CLF_PARAMS, **(params or {})})
+    clf.fit(X, y, sample_weight=class_sample_weight(y))
+    return clf
+
+
+def train_regressor(X, y_log, params: dict = None) -> RandomForestRegressor:
+    reg = RandomForestRegressor(**{**REG_PARAMS, **(params or {})})
+    reg.fit(X, y_log)
+    return reg
+
+
+def load_params(path: str) -> tuple:
+    """(classifier overrides, regressor overrides) from a best_params.json."""
+    with open(path) as f:
+        best = json.load(f)
+    return best.get("classifier", {}).get("params", {}), best.get("regressor", {}).get("params", {})
+
+
+# ── Out‑of‑core training ─────────────────────────────────────────────────
+def _is_test_row(pos: np.ndarray) -> np.ndarray:
+    """Deterministic ~20 % holdout by hashing the row position (no shuffle needed)."""
+    return (pos.astype(np.uint64) * np.uint64(2654435761) % np.uint64(2**32)) % np.uint64(5) == 0
+
+
+def iter_feature_chunks(path: str = INPUT_CSV, chunksize: int = CHUNK_SIZE, split: str = None):
+    """Yield (X, y_class, y_log) per chunk of non‑anomalous rows.
+
+    split="train" / "test" keeps one side of the row‑hash holdout.
+    """
+    wanted = set(FEATURE_COLS) | {"is_anomaly", "actual_time_min"}
+    start = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=lambda c: c in wanted):
+        pos = np.arange(start, start + len(chunk))
+        start += len(chunk)
+        keep = chunk["is_anomaly"].to_numpy() == 0
+        if split is not None:
+            test = _is_test_row(pos)
+            keep &= test if split == "test" else ~test
+        chunk = chunk[keep]
+        if chunk.empty:
+            continue
+        X = chunk.reindex(columns=FEATURE_COLS, fill_value=0).astype(np.float32)
+        minutes = chunk["actual_time_min"]
+        yield X, delay_classes(minutes).to_numpy(), np.log1p(minutes.to_numpy(dtype=np.float64))
+
+
+class _ChunkIter(xgb.DataIter):
+    """Feeds XGBoost's external‑memory DMatrix one chunk at a time."""
+
+    def __init__(self, path, chunksize, target, cache_prefix, class_weights=None):
+        self._path, self._chunksize, self._target = path, chunksize, target
+        self._class_weights = class_weights
+        self._it = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self):
+        self._it = iter_feature_chunks(self._path, self._chunksize, split="train")
+
+    def next(self, input_data):
+        if self._it is None:
+            self.reset()
+        try:
+            X, y_class, y_log = next(self._it)
+        except StopIteration:
+            return 0
+        if self._target == "class":
+            input_data(data=X, label=y_class, weight=self._class_weights[y_class])
+        else:
+            input_data(data=X, label=y_log)
+        return 1
+
+
+def _native_params(params: dict) -> tuple:
+    """sklearn‑style XGB params → (xgb.train params, num_boost_round)."""
+    rename = {"learning_rate": "eta", "reg_alpha": "alpha", "reg_lambda": "lambda", "random_state": "seed"}
+    native = {rename.get(k, k): v for k, v in params.items() if k not in ("n_estimators", "n_jobs")}
+    if params.get("n_jobs", -1) > 0:
+        native["nthread"] = params["n_jobs"]
+    return native, params.get("n_estimators", 100)
+
+
+def _as_sklearn(booster: xgb.Booster, estimator):
+    """Wrap a native booster so predict_and_optimize / the API can use it unchanged."""
+    estimator._Booster = booster
+    if isinstance(estimator, XGBClassifier):
+        estimator.n_classes_ = len(CLASSES)
+    return estimator
+
+
+def main_out_of_core(chunksize: int = CHUNK_SIZE, params_path: str = None):
+    os.makedirs("models", exist_ok=True)
+    print(f"🚀  Out‑of‑core training started (chunks of {chunksize:,} rows)")
+    t0 = time.time()
+    clf_params, reg_params = load_params(params_path) if params_path else ({}, {})
+    reg_params = {k: v for k, v in reg_params.items() if k in REG_OOC_PARAMS}   # RF‑only keys don't apply
+
+    # ── pass 0: watermark of the rows this run trains on ─────────────────
+    watermark = {}
+    for chunk in pd.read_csv(INPUT_CSV, chunksize=chunksize,
+                             usecols=lambda c: c in (WATERMARK_COL, "is_anomaly")):
+        watermark = watermark_step(watermark, chunk)
+
+    # ── pass 1: class counts for balanced weights (one streaming pass) ───
+    counts = np.zeros(len(CLASSES), dtype=np.int64)
+    for _, y_class, _ in iter_feature_chunks(INPUT_CSV, chunksize, split="train"):
+        counts += np.bincount(y_class, minlength=len(CLASSES))
+    class_weights = counts.sum() / (len(CLASSES) * np.maximum(counts, 1))
+    print("🔢  Train class counts:", dict(zip(CLASSES, counts)))
+    print("⚖️  Class weights:", dict(zip(CLASSES, class_weights)))
+
+    with tempfile.TemporaryDirectory(prefix="xgb_ext_") as cache_dir:
+        # ── classifier ───────────────────────────────────────────────────
+        print("🎯  Training XGBoost classifier (external memory) …")
+        native, rounds = _native_params({**CLF_PARAMS, **clf_params})
+        dtrain = xgb.DMatrix(_ChunkIter(INPUT_CSV, chunksize, "class",
+                                        os.path.join(cache_dir, "clf"), class_weights))
+        clf = _as_sklearn(xgb.train(native, dtrain, num_boost_round=rounds),
+                          XGBClassifier(**{**CLF_PARAMS, **clf_params}))
+        del dtrain
+
+        # ── regressor ────────────────────────────────────────────────────
+        print("📈  Training XGBoost regressor (external memory, log‑target) …")
+        native, rounds = _native_params({**REG_OOC_PARAMS, **reg_params})
+        dtrain = xgb.DMatrix(_ChunkIter(INPUT_CSV, chunksize, "reg", os.path.join(cache_dir, "reg")))
+        reg = _as_sklearn(xgb.train(native, dtrain, num_boost_round=rounds),
+                          XGBRegressor(**{**REG_OOC_PARAMS, **reg_params}))
+        del dtrain
+
+    # ── streamed holdout metrics (constant memory) ───────────────────────
+    confusion = np.zeros((len(CLASSES), len(CLASSES)), dtype=np.int64)
+    abs_err = sq_err = n = 0.0
+    for X, y_class, y_log in iter_feature_chunks(INPUT_CSV, chunksize, split="test"):
+        pred = clf.predict(X)
+        np.add.at(confusion, (y_class, pred), 1)
+        err = np.expm1(reg.predict(X)) - np.expm1(y_log)
+        abs_err += np.abs(err).sum()
+        sq_err += (err ** 2).sum()
+        n += len(err)
+    recall = np.diag(confusion) / np.maximum(confusion.sum(axis=1), 1)
+    balanced_accuracy = float(recall[confusion.sum(axis=1) > 0].mean())
+    mae = abs_err / n if n else None
+    print("\n📊  Holdout confusion matrix:\n", confusion)
+    print("Balanced Accuracy:", balanced_accuracy)
+    if n:
+        print(f"🧪  Regression MAE:  {mae:.2f} min  |  RMSE: {sqrt(sq_err / n):.2f} min")
+
+    joblib.dump(clf, CLF_PATH)
+    joblib.dump(reg, REG_PATH)
+    print(f"💾  Saved classifier → {CLF_PATH}")
+    print(f"💾  Saved regressor  → {REG_PATH}")
+    save_state({"classifier": {"watermark": watermark, "balanced_accuracy": balanced_accuracy},
+                "regressor": {"watermark": watermark, "mae": mae}})
+
+    cols = {"is_anomaly", *NUMERIC.values(), *CATEGORICAL.values()}
+    chunks = pd.read_csv(INPUT_CSV, chunksize=chunksize, usecols=lambda c: c in cols)
+    save_reference(build_reference(c[c["is_anomaly"] == 0] for c in chunks))
+    print(f"💾  Saved drift reference → {REFERENCE_PATH}")
+    print(f"\n✅  Out‑of‑core training completed in {time.time()-t0:.1f}s")
+
+
+# ── Warm‑start incremental update ────────────────────────────────────────
+def _warm_start_classifier(clf: XGBClassifier, X, y) -> XGBClassifier:
+    """Continue boosting: UPDATE_TREES more rounds on top of the saved booster."""
+    params = {**clf.get_params(), "n_estimators": UPDATE_TREES}
+    new = XGBClassifier(**params)
+    new.fit(X, y, sample_weight=class_sample_weight(y), xgb_model=clf.get_booster())
+    return new
+
+
+def _warm_start_regressor(reg, X, y_log):
+    """RF: grow UPDATE_TREES extra trees on the new rows; XGB: continue boosting."""
+    if isinstance(reg, XGBRegressor):
+        new = XGBRegressor(**{**reg.get_params(), "n_estimators": UPDATE_TREES})
+        new.fit(X, y_log, xgb_model=reg.get_booster())
+        return new
+    new = copy.deepcopy(reg)
+    new.set_params(warm_start=True, n_estimators=reg.n_estimators + UPDATE_TREES)
+    new.fit(X, y_log)
+    new.set_params(warm_start=False)
+    return new
+
+
+def _split_new(df: pd.DataFrame, stratify: bool):
+    y = df["delay_label"]
+    strat = y if stratify and y.value_counts().min() >= 2 else None
+    return train_test_split(df, test_size=0.2, random_state=42, stratify=strat)
+
+
+def main_update():
+    state = load_state()
+    if not state or not os.path.exists(CLF_PATH) or not os.path.exists(REG_PATH):
+        raise SystemExit(f"❌  No trained models / {STATE_PATH}; run a full training first.")
+
+    print("🔄  Warm‑start update started")
+    t0 = time.time()
+    raw = pd.read_csv(INPUT_CSV)
+    new_watermark = current_watermark(raw)
+    clf, reg = joblib.load(CLF_PATH), joblib.load(REG_PATH)
+
+    for name in ("classifier", "regressor"):
+        wm = state.get(name, {}).get("watermark") or {"column": None, "rows": 0}
+        fresh = rows_after(raw, wm)
+        print(f"\n📬  {name}: {len(fresh):,} rows newer than watermark {wm}")
+        if len(fresh) < MIN_NEW_ROWS:
+            print(f"⏭️  fewer than {MIN_NEW_ROWS:,} new rows — skipping")
+            continue
+
+        fresh = prepare_training_frame(fresh)
+        tr, ho = _split_new(fresh, stratify=name == "classifier")
+        X_tr, X_ho = tr[FEATURE_COLS], ho[FEATURE_COLS]
+
+        if name == "classifier":
+            missing = np.setdiff1d(CLASSES, tr["delay_label"].unique())
+            if len(missing):     # XGBClassifier.fit rejects label sets other than 0…k-1
+                print(f"⏭️  new rows lack class(es) {missing.tolist()} — skipping classifier warm start")
+                continue
+            updated = _warm_start_classifier(clf, X_tr, tr["delay_label"])
+            before = balanced_accuracy_score(ho["delay_label"], clf.predict(X_ho))
+            after = balanced_accuracy_score(ho["delay_label"], updated.predict(X_ho))
+            accept = after >= before - BA_TOLERANCE
+            print(f"🛡️  holdout balanced accuracy: {before:.4f} → {after:.4f}")
+            path, metric = CLF_PATH, {"balanced_accuracy": after}
+        else:
+            updated = _warm_start_regressor(reg, X_tr, np.log1p(tr["actual_time_min"]))
+            y_ho = ho["actual_time_min"]
+            before = mean_absolute_error(y_ho, np.expm1(reg.predict(X_ho)))
+            after = mean_absolute_error(y_ho, np.expm1(updated.predict(X_ho)))
+            accept = after <= before + MAE_TOLERANCE
+            print(f"🛡️  holdout MAE: {before:.2f} → {after:.2f} min")
+            path, metric = REG_PATH, {"mae": after}
+
+        if not accept:
+            print(f"🚫  {name} update rejected — keeping {path}")
+            continue
+        shutil.copy2(path, path.replace(".pkl", ".prev.pkl"))   # keep one rollback copy
+        joblib.dump(updated, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        state[name] = {"watermark": new_watermark, **metric, "updated": time.time()}
+        save_state(state)
+        print(f"💾  {name} updated → {path}")
+
+    print(f"\n✅  Update finished in {time.time()-t0:.1f}s")
+
+
+# ── Main ─────────────────────────────────────────────────────────────────
+def main(params_path: str = None):
+    os.makedirs("models", exist_ok=True)
+    os.makedirs("outputs", exist_ok=True)
+
+    print("🚀  Training pipeline started")
+    t0 = time.time()
+
+    clf_params, reg_params = load_params(params_path) if params_path else ({}, {})
+    if params_path:
+        print(f"🎛️  Using tuned parameters from {params_path}")
+
+    # ── 1‑2. Load, clean & label ─────────────────────────────────────────
+    df = load_training_data()
+    print("🔢  Class distribution:")
+    print(df["delay_label"].value_counts().sort_index())
+
+    # ── 3. Feature matrix (same engineered cols) ─────────────────────────
+    X       = df[FEATURE_COLS]
+    y_class = df["delay_label"]
+    y_reg   = np.log1p(df["actual_time_min"])   # log‑transform target
+
+    print(f"🧮  Feature matrix shape: {X.shape}")
+
+    # ── 4. Train/test splits ─────────────────────────────────────────────
+    Xc_tr, Xc_te, yc_tr, yc_te = train_test_split(
+        X, y_class, test_size=0.2, random_state=42, stratify=y_class
+    )
+    Xr_tr, Xr_te, yr_tr, yr_te = train_test_split(
+        X, y_reg, test_size=0.2, random_state=42
+    )
+
+    # ── 5. Class weights ─────────────────────────────────────────────────
+    print("⚖️  Class weights:", class_weights(yc_tr))
+
+    # ── 6. Train XGBoost classifier ──────────────────────────────────────
+    print("🎯  Training XGBoost classifier …")
+    clf = train_classifier(Xc_tr, yc_tr, clf_params)
+
+    y_pred = clf.predict(Xc_te)
+    print("\n📊  Classification Report (test):")
+    print(classification_report(
+          yc_te, y_pred, digits=3,
+          target_names=CLASS_NAMES))
+    print("Balanced Accuracy:", balanced_accuracy_score(yc_te, y_pred))
+
+    # ── 7. Train Random‑Forest regressor (log‑target) ────────────────────
+    print("\n📈  Training Random‑Forest regressor (log‑target) …")
+    reg = train_regressor(Xr_tr, yr_tr, reg_params)
+
+    # Predict & invert log scale
+    yr_pred_log = reg.predict(Xr_te)
+    yr_pred     = np.expm1(yr_pred_log)
+    yr_true     = np.expm1(yr_te)
+
+    mae  = mean_absolute_error(yr_true, yr_pred)
+    rmse = sqrt(mean_squared_error(yr_true, yr_pred))
+    print(f"🧪  Regression MAE:  {mae:.2f} min  |  RMSE: {rmse:.2f} min")
+
+    # ── 8. Save models ───────────────────────────────────────────────────
+    joblib.dump(clf, CLF_PATH)
+    joblib.dump(reg, REG_PATH)
+    print(f"💾  Saved classifier → {CLF_PATH}")
+    print(f"💾  Saved regressor  → {REG_PATH}")
 
-# Predict & invert log scale
-yr_pred_log = reg.predict(Xr_te)
-yr_pred     = np.expm1(yr_pred_log)
-yr_true     = np.expm1(yr_te)
+    watermark = df.attrs.get("watermark")
+    save_state({"classifier": {"watermark": watermark, "balanced_accuracy": balanced_accuracy_score(yc_te, y_pred)},
+                "regressor": {"watermark": watermark, "mae": mae}})
+    save_reference(build_reference([df]))
+    print(f"💾  Saved drift reference → {REFERENCE_PATH}")
 
-mae  = mean_absolute_error(yr_true, yr_pred)
-rmse = sqrt(mean_squared_error(yr_true, yr_pred))
-print(f"🧪  Regression MAE:  {mae:.2f} min  |  RMSE: {rmse:.2f} min")
+    print(f"\n✅  Training completed in {time.time()-t0:.1f}s")
 
-# ── 8. Save models ───────────────────────────────────────────────────────
-joblib.dump(clf, CLF_PATH)
-joblib.dump(reg, REG_PATH)
-print(f"💾  Saved classifier → {CLF_PATH}")
-print(f"💾  Saved regressor  → {REG_PATH}")
 
-print(f"\n✅  Training completed in {time.time()-t0:.1f}s")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the delay classifier and duration regressor.")
+    parser.add_argument("--params", default=None, help="best_params.json written by scripts.tune_models")
+    parser.add_argument("--out-of-core", action="store_true", help="stream the CSV in chunks (bounded memory)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--update", action="store_true", help="warm-start on rows newer than the watermark")
+    args = parser.parse_args()
+    if args.update:
+        main_update()
+    elif args.out_of_core:
+        main_out_of_core(args.chunksize, args.params)
+    else:
+        main(args.params)
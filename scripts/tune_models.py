@@ -0,0 +1,309 @@
+"""
+Time‑budgeted successive‑halving search for the delay classifier (XGBoost)
+and duration regressor (Random‑Forest)
+• Builds ONE quantile‑binned uint8 training matrix up front and shares it with
+  every worker through a memory‑mapped .npy (no per‑trial copies / re‑binning)
+• Trials run in a process pool; the resource per rung is trees / boosting rounds
+• Trials stop themselves at the phase deadline (XGBoost callback / RF grown in
+  REG_STEP‑tree increments), so the wall‑clock budget holds
+• Joint objective:  score = quality − latency_weight × ms per 10k‑row batch
+  (quality = balanced accuracy for the classifier, −MAE in minutes for the regressor)
+• Writes models/best_params.json (feed to `train_model.py --params`) and
+  outputs/tuning_leaderboard.csv with every trial and its timings
+Configs are ranked on the binned matrix; train_model.py refits the winner on raw features.
+"""
+
+import os, sys, json, time, argparse, tempfile
+import numpy as np, pandas as pd
+import xgboost as xgb
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import balanced_accuracy_score, mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+from scripts.train_model import (
+    FEATURE_COLS, CLF_PARAMS, load_training_data, class_sample_weight,
+)
+
+# ── Paths & defaults ─────────────────────────────────────────────────────
+BEST_PATH        = "models/best_params.json"
+LEADERBOARD_PATH = "outputs/tuning_leaderboard.csv"
+
+MAX_BIN        = 255
+ETA            = 3               # keep the top 1/ETA of each rung
+N_CONFIGS      = 27
+LATENCY_ROWS   = 10_000
+CLF_LAT_WEIGHT = 1e-3            # balanced‑accuracy points per ms / 10k rows
+REG_LAT_WEIGHT = 1e-2            # minutes of MAE per ms / 10k rows
+
+CLF_RESOURCE = (25, 675)         # boosting rounds: 25 → 75 → 225 → 675
+REG_RESOURCE = (10, 270)         # trees:           10 → 30 → 90 → 270
+REG_STEP     = 10                # trees grown between deadline checks
+
+
+def _sample_clf(rng) -> dict:
+    return {
+        "max_depth": int(rng.integers(3, 11)),
+        "learning_rate": float(np.exp(rng.uniform(np.log(0.03), np.log(0.3)))),
+        "subsample": float(rng.uniform(0.6, 1.0)),
+        "colsample_bytree": float(rng.uniform(0.5, 1.0)),
+        "min_child_weight": float(rng.uniform(1, 10)),
+        "reg_lambda": float(np.exp(rng.uniform(np.log(0.1), np.log(10)))),
+        "reg_alpha": float(rng.choice([0, 0.5, 1, 2])),
+    }
+
+
+def _sample_reg(rng) -> dict:
+    return {
+        "max_depth": int(rng.integers(6, 21)),
+        "min_samples_leaf": int(rng.integers(1, 11)),
+        "max_features": float(rng.uniform(0.3, 1.0)),
+        "max_samples": float(rng.uniform(0.3, 1.0)),
+    }
+
+
+# ── Shared binned matrix ─────────────────────────────────────────────────
+def _bin_edges(X: np.ndarray) -> list:
+    qs = np.linspace(0, 1, MAX_BIN + 1)[1:-1]
+    return [np.unique(np.quantile(X[:, j], qs)) for j in range(X.shape[1])]
+
+
+def _apply_bins(X: np.ndarray, edges: list) -> np.ndarray:
+    out = np.empty(X.shape, dtype=np.uint8)
+    for j, e in enumerate(edges):
+        out[:, j] = np.searchsorted(e, X[:, j], side="right")
+    return out
+
+
+def prepare_shared_data(data_dir: str) -> dict:
+    """Split once, bin once, save as .npy for memory‑mapped reuse by workers."""
+    df = load_training_data()
+    X = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+    y_class = df["delay_label"].to_numpy()
+    y_log = np.log1p(df["actual_time_min"].to_numpy(dtype=np.float64))
+
+    idx_tr, idx_va = train_test_split(
+        np.arange(len(df)), test_size=0.2, random_state=42, stratify=y_class
+    )
+    edges = _bin_edges(X[idx_tr])
+    arrays = {
+        "Xb_tr": _apply_bins(X[idx_tr], edges),
+        "Xb_va": _apply_bins(X[idx_va], edges),
+        "yc_tr": y_class[idx_tr],
+        "yc_va": y_class[idx_va],
+        "w_tr": class_sample_weight(pd.Series(y_class[idx_tr])).astype(np.float32),
+        "yr_tr": y_log[idx_tr],
+        "yr_va": y_log[idx_va],
+    }
+    for name, arr in arrays.items():
+        np.save(os.path.join(data_dir, f"{name}.npy"), arr)
+    print(f"🧮  Binned matrix: train {arrays['Xb_tr'].shape}, val {arrays['Xb_va'].shape}, "
+          f"{arrays['Xb_tr'].nbytes / 1e6:.1f} MB (uint8)")
+    return {k: v.shape for k, v in arrays.items()}
+
+
+# ── Worker side ──────────────────────────────────────────────────────────
+_shared = {}
+
+
+def _init_worker(data_dir: str):
+    for name in ("Xb_tr", "Xb_va", "yc_tr", "yc_va", "w_tr", "yr_tr", "yr_va"):
+        _shared[name] = np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r")
+
+
+def _latency_ms(predict, X) -> float:
+    batch = np.ascontiguousarray(X[:LATENCY_ROWS])
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        predict(batch)
+        best = min(best, time.perf_counter() - t0)
+    return 1000 * best * LATENCY_ROWS / len(batch)
+
+
+class _Deadline(xgb.callback.TrainingCallback):
+    """Stops boosting once the wall‑clock deadline has passed."""
+
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+
+    def after_iteration(self, model, epoch, evals_log) -> bool:
+        return time.time() >= self.deadline
+
+
+def _clf_trial(params: dict, rounds: int, lat_weight: float, deadline: float) -> dict:
+    if "dtrain" not in _shared:   # quantile sketch built once per worker, reused by every trial
+        _shared["dtrain"] = xgb.QuantileDMatrix(
+            _shared["Xb_tr"], label=_shared["yc_tr"], weight=_shared["w_tr"], max_bin=MAX_BIN + 1
+        )
+    native = {
+        "objective": CLF_PARAMS["objective"], "num_class": CLF_PARAMS["num_class"],
+        "tree_method": "hist", "max_bin": MAX_BIN + 1, "nthread": 1,
+        "seed": CLF_PARAMS["random_state"],
+        "max_depth": params["max_depth"], "eta": params["learning_rate"],
+        "subsample": params["subsample"], "colsample_bytree": params["colsample_bytree"],
+        "min_child_weight": params["min_child_weight"],
+        "lambda": params["reg_lambda"], "alpha": params["reg_alpha"],
+    }
+    t0 = time.perf_counter()
+    booster = xgb.train(native, _shared["dtrain"], num_boost_round=rounds,
+                        callbacks=[_Deadline(deadline)])
+    fit_s = time.perf_counter() - t0
+    trained = booster.num_boosted_rounds()
+
+    proba = booster.inplace_predict(np.ascontiguousarray(_shared["Xb_va"]))
+    quality = balanced_accuracy_score(_shared["yc_va"], proba.argmax(axis=1))
+    latency = _latency_ms(booster.inplace_predict, _shared["Xb_va"])
+    return {"quality": quality, "latency_ms_10k": latency, "fit_s": fit_s,
+            "score": quality - lat_weight * latency,
+            "trained": trained, "complete": trained >= rounds}
+
+
+def _reg_trial(params: dict, trees: int, lat_weight: float, deadline: float) -> dict:
+    grown = min(REG_STEP, trees)
+    reg = RandomForestRegressor(n_estimators=grown, warm_start=True, random_state=42, n_jobs=1, **params)
+    t0 = time.perf_counter()
+    reg.fit(_shared["Xb_tr"], _shared["yr_tr"])
+    while grown < trees and time.time() < deadline:
+        grown = min(grown + REG_STEP, trees)
+        reg.set_params(n_estimators=grown)
+        reg.fit(_shared["Xb_tr"], _shared["yr_tr"])
+    fit_s = time.perf_counter() - t0
+
+    pred = np.expm1(reg.predict(_shared["Xb_va"]))
+    mae = mean_absolute_error(np.expm1(_shared["yr_va"]), pred)
+    latency = _latency_ms(reg.predict, _shared["Xb_va"])
+    return {"quality": -mae, "latency_ms_10k": latency, "fit_s": fit_s,
+            "score": -mae - lat_weight * latency,
+            "trained": grown, "complete": grown >= trees}
+
+
+# ── Successive halving ───────────────────────────────────────────────────
+def successive_halving(pool, model: str, deadline: float, seed: int = 42,
+                       n_configs: int = N_CONFIGS, lat_weight: float = None) -> list:
+    """Returns every finished trial; stops promoting once `deadline` passes.
+
+    Running trials stop themselves at `deadline` and are recorded with
+    complete=False; rung_complete marks rungs where every trial ran in full.
+    """
+    rng = np.random.default_rng(seed)
+    if model == "classifier":
+        sample, trial, (r_min, r_max) = _sample_clf, _clf_trial, CLF_RESOURCE
+        lat_weight = CLF_LAT_WEIGHT if lat_weight is None else lat_weight
+    else:
+        sample, trial, (r_min, r_max) = _sample_reg, _reg_trial, REG_RESOURCE
+        lat_weight = REG_LAT_WEIGHT if lat_weight is None else lat_weight
+
+    survivors = [(i, sample(rng)) for i in range(n_configs)]
+    resource, rung, trials = r_min, 0, []
+    while survivors and resource <= r_max and time.time() < deadline:
+        print(f"🪜  {model}: rung {rung} — {len(survivors)} configs × {resource}")
+        futures = {pool.submit(trial, p, resource, lat_weight, deadline): (i, p) for i, p in survivors}
+        finished_rung = []
+        pending, cut = set(futures), False
+        while pending:
+            timeout = None if cut else max(deadline - time.time(), 0)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i, p = futures[fut]
+                res = fut.result()
+                row = {"model": model, "trial": i, "rung": rung, "resource": resource,
+                       "params": json.dumps(p), **res}
+                trials.append(row)
+                finished_rung.append(row)
+            if not cut and pending and time.time() >= deadline:
+                # queued trials never start; running ones return at their next deadline check
+                cut = True
+                pending = {fut for fut in pending if not fut.cancel()}
+                print(f"⏰  {model}: budget exhausted during rung {rung}")
+
+        rung_complete = (len(finished_rung) == len(futures)
+                         and all(r["complete"] for r in finished_rung))
+        for row in finished_rung:
+            row["rung_complete"] = rung_complete
+        if not rung_complete:
+            break
+        finished_rung.sort(key=lambda r: r["score"], reverse=True)
+        keep = max(1, len(finished_rung) // ETA)
+        survivors = [(r["trial"], json.loads(r["params"])) for r in finished_rung[:keep]]
+        if len(finished_rung) <= 1:
+            break
+        resource *= ETA
+        rung += 1
+    return trials
+
+
+def _best(trials: list, model: str) -> dict:
+    rows = [t for t in trials if t["model"] == model]
+    if not rows:
+        return {}
+    # best score in the last rung that ran in full; a cut‑short rung is not comparable
+    full = [t for t in rows if t["rung_complete"]]
+    if full:
+        last = max(t["rung"] for t in full)
+        rows = [t for t in full if t["rung"] == last]
+    else:
+        rows = [t for t in rows if t["complete"]]
+        if not rows:
+            return {}
+    top = max(rows, key=lambda r: r["score"])
+    params = json.loads(top["params"])
+    params["n_estimators"] = top["resource"]
+    return {"params": params, "score": top["score"], "quality": top["quality"],
+            "latency_ms_10k": top["latency_ms_10k"], "fit_s": top["fit_s"]}
+
+
+def main(budget_s: float = 600, workers: int = None, clf_share: float = 0.5,
+         seed: int = 42, n_configs: int = N_CONFIGS):
+    t0 = time.time()
+    workers = workers or os.cpu_count() or 1
+    print(f"🎛️  Tuning with {workers} workers, budget {budget_s:.0f}s")
+
+    with tempfile.TemporaryDirectory(prefix="tune_") as data_dir:
+        prepare_shared_data(data_dir)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_dir,)) as pool:
+            clf_deadline = t0 + budget_s * clf_share
+            trials = successive_halving(pool, "classifier", clf_deadline, seed, n_configs)
+            # whatever the classifier left unused goes to the regressor
+            trials += successive_halving(pool, "regressor", t0 + budget_s, seed, n_configs)
+
+    if not trials:
+        print(f"❌ No trial finished within the {budget_s:.0f}s budget — "
+              f"leaderboard and best configuration not written.")
+        return None
+
+    board = pd.DataFrame(trials).sort_values(["model", "resource", "score"], ascending=[True, False, False])
+    os.makedirs(os.path.dirname(LEADERBOARD_PATH), exist_ok=True)
+    board.to_csv(LEADERBOARD_PATH, index=False)
+
+    best = {
+        "classifier": _best(trials, "classifier"),
+        "regressor": _best(trials, "regressor"),
+        "budget_s": budget_s,
+        "elapsed_s": round(time.time() - t0, 1),
+        "n_trials": len(trials),
+    }
+    os.makedirs(os.path.dirname(BEST_PATH), exist_ok=True)
+    with open(BEST_PATH, "w") as f:
+        json.dump(best, f, indent=2)
+
+    print(f"\n🏆  Leaderboard → {LEADERBOARD_PATH} ({len(trials)} trials)")
+    print(board.head(10).to_string(index=False))
+    print(f"💾  Best configuration → {BEST_PATH}")
+    print(f"✅  Tuning finished in {time.time() - t0:.1f}s — refit with: "
+          f"python -m scripts.train_model --params {BEST_PATH}")
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving search for both delivery models.")
+    parser.add_argument("--budget", type=float, default=600, help="wall-clock budget in seconds")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--clf-share", type=float, default=0.5, help="fraction of budget for the classifier")
+    parser.add_argument("--configs", type=int, default=N_CONFIGS, help="configs sampled at rung 0")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if main(args.budget, args.workers, args.clf_share, args.seed, args.configs) is None:
+        sys.exit(1)
@@ -0,0 +1,145 @@
+# scripts/zone_hierarchy.py
+# ----------------------------------------------------------------------
+# Multi-resolution zone groupings for drill-down heatmaps.
+# • Numeric zones: nested equal-frequency buckets (20 → 10 per bucket → zone)
+# • String zones : nested prefixes (3 chars → 5 chars → zone)
+# Stats per (level, group, time_slot) are precomputed once, so any parent
+# group can be expanded to its children without touching the raw rows.
+# ----------------------------------------------------------------------
+
+import os
+import numpy as np
+import pandas as pd
+
+from scripts.heatmap_generator import _order_columns
+
+PRED_CSV       = "outputs/predictions_full_report.csv"
+HIERARCHY_PATH = "outputs/zone_hierarchy.csv"
+
+LEVEL_FANOUT   = [20, 10]     # numeric zones: buckets at level 0, sub-buckets per bucket at level 1
+PREFIX_LENGTHS = [3, 5]       # string zones : prefix length at level 0, level 1
+ROOT = "all"
+
+METRICS = {
+    "count":             lambda g: g["count"],
+    "mean_time":         lambda g: g["time_sum"] / g["count"],
+    "delay_probability": lambda g: g["delay_sum"] / g["count"],
+    "efficiency":        lambda g: g["eff_sum"] / g["count"],
+}
+
+
+# ─────────────────────────── zone → level labels ──────────────────────────
+def _equal_freq(counts: np.ndarray, start: np.ndarray, total: np.ndarray, n: int) -> np.ndarray:
+    """Bucket sorted zones so each bucket holds ~1/n of the rows."""
+    before = np.cumsum(counts) - counts - start
+    return np.minimum((before * n) // np.maximum(total, 1), n - 1).astype(int)
+
+
+def zone_levels(from_zone: pd.Series) -> pd.DataFrame:
+    """One row per zone with its label at every level (level_0 … level_N)."""
+    counts = from_zone.value_counts().sort_index()
+    zones = counts.index
+    levels = pd.DataFrame(index=zones)
+
+    if from_zone.dtype == object:
+        as_str = zones.astype(str)
+        for lvl, n in enumerate(PREFIX_LENGTHS):
+            levels[f"level_{lvl}"] = as_str.str[:n]
+    else:
+        c = counts.to_numpy()
+        parent = np.zeros(len(c), dtype=int)
+        labels = None
+        for lvl, n in enumerate(LEVEL_FANOUT):
+            cum = np.cumsum(c) - c
+            start = pd.Series(cum).groupby(parent).transform("min").to_numpy()
+            total = pd.Series(c).groupby(parent).transform("sum").to_numpy()
+            bucket = _equal_freq(c, start, total, n)
+            suffix = pd.Series(bucket, index=zones).map("{:02d}".format)
+            labels = suffix if labels is None else labels + "." + suffix
+            levels[f"level_{lvl}"] = labels.to_numpy()
+            parent = parent * n + bucket
+
+    levels[f"level_{len(levels.columns)}"] = zones.astype(str)
+    levels.index.name = "from_zone"
+    return levels
+
+
+# ─────────────────────────── precomputed stats ────────────────────────────
+def build_hierarchy(df: pd.DataFrame, path: str = HIERARCHY_PATH) -> pd.DataFrame:
+    """Long table: level, group, parent, time_slot, count, time_sum, delay_sum, eff_sum."""
+    levels = zone_levels(df["from_zone"])
+    time_col = next((c for c in ("predicted_time_min", "actual_time_min") if c in df), None)
+    actual = df["actual_time_min"] if "actual_time_min" in df else df[time_col]
+
+    rows = pd.DataFrame({
+        "time_slot": df["time_slot"].astype(str).to_numpy(),
+        "count": 1,
+        "time_sum": df[time_col].to_numpy(dtype=float),
+        "delay_sum": (actual > 90).astype(float).to_numpy(),
+        "eff_sum": (df["distance_km"] / (actual + 1)).to_numpy(dtype=float),
+    })
+
+    n_levels = levels.shape[1]
+    parts = []
+    for lvl in range(n_levels):
+        group = df["from_zone"].map(levels[f"level_{lvl}"]).to_numpy()
+        parent = df["from_zone"].map(levels[f"level_{lvl - 1}"]).to_numpy() if lvl else np.full(len(df), ROOT)
+        agg = (rows.assign(group=group, parent=parent)
+                   .groupby(["parent", "group", "time_slot"], observed=True, sort=False)
+                   [["count", "time_sum", "delay_sum", "eff_sum"]].sum()
+                   .reset_index())
+        # a zone id no longer than the prefix keeps its label from here down: stop descending
+        agg = agg[agg["group"] != agg["parent"]]
+        agg.insert(0, "level", lvl)
+        parts.append(agg)
+
+    table = pd.concat(parts, ignore_index=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table.to_csv(path, index=False)
+    print(f"✅ Zone hierarchy saved → {path} — {n_levels} levels, {len(table):,} rows")
+    return table
+
+
+def load_hierarchy(path: str = HIERARCHY_PATH) -> pd.DataFrame:
+    return pd.read_csv(path, dtype={"group": str, "parent": str})
+
+
+# ─────────────────────────── drill-down query ─────────────────────────────
+def _child_rows(table: pd.DataFrame, parent: str) -> pd.DataFrame:
+    sub = table[table["parent"] == str(parent)]
+    # a short zone id can repeat as a label on several levels; take the shallowest
+    return sub[sub["level"] == sub["level"].min()] if not sub.empty else sub
+
+
+def drilldown(table: pd.DataFrame, parent: str = ROOT, metric: str = "mean_time") -> pd.DataFrame:
+    """Children of `parent` (one level down) × time_slot, evaluated with `metric`."""
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Choose from {list(METRICS)}")
+    sub = _child_rows(table, parent)
+    if sub.empty:
+        raise ValueError(f"Unknown or leaf zone group '{parent}'")
+
+    summed = sub.groupby(["group", "time_slot"])[["count", "time_sum", "delay_sum", "eff_sum"]].sum()
+    pivot = METRICS[metric](summed).unstack("time_slot").fillna(0)
+    pivot.index.name, pivot.columns.name = "zone_group", "time_slot"
+    return _order_columns(pivot, "time_slot")
+
+
+def children(table: pd.DataFrame, parent: str = ROOT) -> list:
+    """Child group labels with row counts, so the client knows what to expand."""
+    sub = _child_rows(table, parent)
+    if sub.empty:
+        return []
+    counts = sub.groupby("group")["count"].sum()
+    next_level = table[table["level"] == sub["level"].iat[0] + 1]
+    has_children = set(next_level["parent"])
+    return [
+        {"group": g, "count": int(n), "expandable": g in has_children}
+        for g, n in counts.items()
+    ]
+
+
+# ── CLI entry point ───────────────────────────────────────────────────────
+if __name__ == "__main__":
+    print(f"📥 Loading {PRED_CSV} …")
+    build_hierarchy(pd.read_csv(PRED_CSV))
@@ -0,0 +1,27 @@
+"""Smoke run of the scaling benchmark on its own synthetic data."""
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+
+from scripts.heatmap_generator import _zone_group_series
+from scripts.synthetic_dataset import _zone_tables, generate_chunk
+
+
+def test_zone_groups_on_zipf_zones():
+    df = generate_chunk(5_000, 0, 42, _zone_tables(42), 0)
+    groups = _zone_group_series(df)
+    assert groups.notna().all()
+    assert 1 < groups.nunique() <= 20
+
+
+def test_benchmark_smoke(tmp_path):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("xgboost")
+    from scripts.benchmark_scaling import run_size
+
+    results = run_size(2_000, str(tmp_path))
+    assert [r["status"] for r in results] == ["ok"] * len(results)
+    assert results[-1]["stage"] == "heatmaps"
@@ -0,0 +1,101 @@
+"""POST /predict/bulk block parsing and scoring (scripts/bulk_scoring.py)."""
+
+import asyncio
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("starlette")
+
+from scripts import bulk_scoring
+
+HEADER = b"id,from_zone,to_zone,time_slot,weight,distance\n"
+
+
+class _Scaler:
+    def transform(self, X):
+        return np.asarray(X, dtype=float)
+
+
+class _Classifier:
+    def predict_proba(self, X):
+        return np.tile(np.array([0.4011, 0.3, 0.2989], dtype=np.float32), (len(X), 1))
+
+
+class _Regressor:
+    def predict(self, X):
+        return np.full(len(X), np.log1p(42.5), dtype=np.float32)
+
+
+MODELS = (_Scaler(), _Classifier(), _Regressor())
+
+
+def _score(block: bytes, header: bytes = HEADER) -> pd.DataFrame:
+    columns, missing = bulk_scoring.resolve_columns(header)
+    assert not missing
+    out = bulk_scoring.score_block(header, block, columns, MODELS, reroute=False, with_header=True)
+    return pd.read_csv(io.BytesIO(out), dtype={"id": str})
+
+
+def test_resolve_columns_accepts_aliases_and_reports_missing():
+    found, missing = bulk_scoring.resolve_columns(b"from_zone,to_zone,time_slot,weight_kg\n")
+    assert found["weight"] == "weight_kg"
+    assert missing == ["distance (distance or distance_km)"]
+
+
+def test_status_flags():
+    block = (b"a,1,2,Morning,3.5,10\n"       # ok
+             b"b,1,2,Morning,heavy,10\n"     # non-numeric weight
+             b"c,1,2,,3.5,10\n"              # blank time slot
+             b"d,1,2,Morning\n")             # short line
+    df = _score(block)
+    assert df["status"].tolist() == ["ok", "invalid", "invalid", "invalid"]
+    assert df.loc[1:, "delay_class"].isna().all()
+
+
+def test_long_line_is_flagged_not_fatal():
+    df = _score(b"a,1,2,Morning,3.5,10\nb,1,2,Night,3.5,10,extra\n")
+    assert df["status"].tolist() == ["ok", "invalid"]
+
+
+def test_values_echoed_verbatim_and_rounded_like_predict():
+    df = _score(b"007,1,2,Night,3.50,10\n")
+    assert df.loc[0, "id"] == "007"
+    assert df.loc[0, "delay_confidence"] == 40.11
+    assert df.loc[0, "estimated_duration_min"] == 42.5
+    out = bulk_scoring.score_block(HEADER, b"007,1,2,Night,3.50,10\n",
+                                   bulk_scoring.resolve_columns(HEADER)[0], MODELS, False, True)
+    assert b"40.11," in out and b"40.110000" not in out
+
+
+def test_csv_blocks_end_on_newlines():
+    async def stream():
+        for piece in (b"a,1\nb,", b"2\nc,3\n", b"d,4"):
+            yield piece
+
+    async def collect():
+        return [b async for b in bulk_scoring.csv_blocks(stream(), chunk_bytes=4)]
+
+    blocks = asyncio.run(collect())
+    assert b"".join(blocks) == b"a,1\nb,2\nc,3\nd,4"
+    assert all(b.endswith(b"\n") for b in blocks[:-1])
+
+
+def test_stream_ends_with_error_marker_on_failure():
+    async def blocks():
+        yield b"b,1,2,Morning,3.5,10\n"
+
+    class _Broken(_Classifier):
+        def predict_proba(self, X):
+            raise RuntimeError("model exploded")
+
+    async def collect():
+        columns = bulk_scoring.resolve_columns(HEADER)[0]
+        gen = bulk_scoring.score_stream(HEADER, b"a,1,2,Morning,3.5,10\n", blocks(), columns,
+                                        (_Scaler(), _Broken(), _Regressor()), False)
+        return [b async for b in gen]
+
+    out = asyncio.run(collect())
+    assert out[-1].startswith(bulk_scoring.ERROR_MARKER.encode())
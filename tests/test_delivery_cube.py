@@ -0,0 +1,79 @@
+"""Cube aggregation and pivots vs pandas (scripts/delivery_cube.py)."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+
+from scripts.delivery_cube import DeliveryCube, build_cube
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    return pd.DataFrame({
+        "zone_group": rng.choice(["A", "B", "C"], n),
+        "time_slot": rng.choice(["Night", "Morning", "Evening", "Afternoon"], n),
+        "weight_category": rng.choice(["light", "heavy"], n),
+        "distance_category": rng.choice(["short", "long"], n),
+        "distance_km": rng.uniform(1, 40, n),
+        "actual_time_min": rng.uniform(10, 150, n),
+        "predicted_time_min": rng.uniform(10, 150, n),
+    })
+
+
+def test_pivot_matches_pandas(df):
+    cube = DeliveryCube.from_frame(df)
+    p = cube.pivot("zone_group", "time_slot", "mean_time")
+    assert p["col_labels"] == ["Morning", "Afternoon", "Evening", "Night"]
+
+    expected = (df.pivot_table(index="zone_group", columns="time_slot",
+                               values="predicted_time_min", aggfunc="mean")
+                  .reindex(index=p["row_labels"], columns=p["col_labels"]))
+    assert np.allclose(p["values"], expected.to_numpy(), atol=1e-4)
+
+    counts = pd.crosstab(df["zone_group"], df["time_slot"]).reindex(
+        index=p["row_labels"], columns=p["col_labels"])
+    assert p["counts"] == counts.to_numpy().tolist()
+
+
+def test_pivot_filters_and_transposed_axes(df):
+    cube = DeliveryCube.from_frame(df)
+    p = cube.pivot("time_slot", "zone_group", "delay_probability",
+                   filters={"distance_category": ["long"], "zone_group": ["A", "C"]})
+    assert p["col_labels"] == ["A", "C"]
+
+    sub = df[(df["distance_category"] == "long") & df["zone_group"].isin(["A", "C"])]
+    expected = ((sub["actual_time_min"] > 90).groupby([sub["time_slot"], sub["zone_group"]])
+                .mean().unstack().reindex(index=p["row_labels"], columns=p["col_labels"]))
+    assert np.allclose(p["values"], expected.to_numpy(), atol=1e-4)
+
+
+def test_rejects_bad_queries(df):
+    cube = DeliveryCube.from_frame(df)
+    with pytest.raises(ValueError):
+        cube.pivot("zone_group", "zone_group")
+    with pytest.raises(ValueError):
+        cube.pivot(metric="median_time")
+    with pytest.raises(ValueError):
+        cube.pivot(filters={"supplier": ["x"]})
+
+
+def test_save_load_roundtrip(df, tmp_path):
+    path = str(tmp_path / "cube.npz")
+    cube = build_cube(df, path)
+    loaded = DeliveryCube.load(path)
+    assert loaded.time_col == "predicted_time_min"
+    assert loaded.pivot(metric="std_time") == cube.pivot(metric="std_time")
+
+
+def test_numeric_zones_with_duplicate_quantiles():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "from_zone": np.where(rng.random(1_000) < 0.5, 7, rng.integers(0, 500, 1_000)),
+        "actual_time_min": rng.uniform(10, 150, 1_000),
+    })
+    cube = DeliveryCube.from_frame(df)
+    assert sum(map(sum, cube.pivot(metric="count")["values"])) == len(df)
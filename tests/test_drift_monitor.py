@@ -0,0 +1,85 @@
+"""Sketches, PSI and the live drift report (scripts/drift_monitor.py)."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from scripts import drift_monitor as dm
+
+
+def test_psi_zero_for_identical_and_large_for_shifted():
+    assert dm.psi([0.25] * 4, [0.25] * 4) == pytest.approx(0.0)
+    assert dm.psi([0.25] * 4, [0.7, 0.1, 0.1, 0.1]) > dm.PSI_ALERT
+
+
+def test_quantile_sketch_relative_error():
+    values = np.random.default_rng(0).lognormal(1.0, 0.8, 20_000)
+    sketch = dm.QuantileSketch()
+    sketch.add_many(values)
+    for q in (0.05, 0.5, 0.95):
+        exact = np.quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=3 * dm.REL_ERR)
+
+
+def test_numeric_stats_batch_matches_streaming():
+    values = np.random.default_rng(1).uniform(0, 50, 1_000)
+    batch, stream = dm.NumericStats(), dm.NumericStats()
+    batch.add_many(values[:400])
+    batch.add_many(values[400:])
+    for v in values:
+        stream.add(v)
+    assert batch.mean == pytest.approx(stream.mean)
+    assert batch.std == pytest.approx(stream.std)
+    assert batch.std == pytest.approx(values.std(ddof=1))
+
+
+def test_category_counter_pools_overflow():
+    counter = dm.CategoryCounter(max_categories=2)
+    for v in ("a", "b", "c", "d", "a"):
+        counter.add(v)
+    assert counter.counts == {"a": 2, "b": 1, dm.OTHER: 2}
+
+
+def _frame(rng, n, shift=0.0):
+    return pd.DataFrame({
+        "distance_km": rng.lognormal(1.0 + shift, 0.5, n),
+        "weight_kg": rng.uniform(1, 30, n),
+        "time_slot": rng.choice(["Morning", "Afternoon", "Evening", "Night"], n),
+    })
+
+
+def _monitor(tmp_path, rng):
+    path = dm.save_reference(dm.build_reference([_frame(rng, 5_000), _frame(rng, 5_000)]),
+                             str(tmp_path / "reference.json"))
+    return dm.DriftMonitor(path)
+
+
+def _observe(monitor, frame):
+    for row in frame.itertuples(index=False):
+        monitor.observe({"distance": row.distance_km, "weight": row.weight_kg,
+                         "time_slot": row.time_slot})
+
+
+def test_report_without_reference(tmp_path):
+    report = dm.DriftMonitor(str(tmp_path / "missing.json")).report()
+    assert report["status"] == "no_reference"
+
+
+def test_report_ok_then_drift(tmp_path):
+    rng = np.random.default_rng(2)
+    monitor = _monitor(tmp_path, rng)
+
+    _observe(monitor, _frame(rng, 50))
+    assert monitor.report()["status"] == "insufficient_data"
+
+    _observe(monitor, _frame(rng, 2_000))
+    report = monitor.report()
+    assert report["features"]["distance"]["status"] == "ok"
+    assert report["status"] in ("ok", "warn")
+
+    monitor.reset()
+    _observe(monitor, _frame(rng, 2_000, shift=1.0))
+    report = monitor.report()
+    assert report["features"]["distance"]["status"] == "drift"
+    assert report["status"] == "drift"
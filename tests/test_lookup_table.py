@@ -0,0 +1,65 @@
+"""Split-aligned lookup table (scripts/lookup_table.py).
+
+Small forests trained with weight_per_km held constant split only on
+distance, weight and the one-hot columns, all axis-aligned in the grid, so
+nearest-cell lookup must reproduce the live models exactly.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from scripts import lookup_table as lt
+from scripts.feature_engineering import prepare_model_input
+
+WEIGHT_PER_KM = 3
+
+
+@pytest.fixture(scope="module")
+def models():
+    rng = np.random.default_rng(0)
+    n = 3_000
+    d = rng.uniform(*lt.DISTANCE_RANGE, n)
+    w = rng.uniform(*lt.WEIGHT_RANGE, n)
+    slot = rng.integers(0, len(lt.TIME_SLOTS), n)
+    raw = {"from_zone": np.zeros(n, dtype=int), "to_zone": rng.integers(0, 2, n),
+           "time_slot": np.asarray(lt.TIME_SLOTS)[slot], "weight": w, "distance": d}
+    X = prepare_model_input(raw, for_training=True).to_numpy(dtype=float)
+    X[:, WEIGHT_PER_KM] = 0.0                      # constant → never split on
+    y_class = np.digitize(d + w / 4 + 5 * (slot == 1), [15, 35])
+    y_log = np.log1p(20 + 3 * d + w / 2)
+
+    scaler = StandardScaler().fit(X)
+    Xs = scaler.transform(X)
+    clf = RandomForestClassifier(n_estimators=3, max_depth=3, random_state=0).fit(Xs, y_class)
+    reg = RandomForestRegressor(n_estimators=3, max_depth=3, random_state=0).fit(Xs, y_log)
+    return scaler, clf, reg
+
+
+def test_split_thresholds_in_raw_units(models):
+    d_splits, w_splits = lt.split_thresholds(models)
+    assert len(d_splits)
+    assert (d_splits > 0).all() and (d_splits < 100).all()
+    assert (w_splits > -10).all() and (w_splits < 110).all()
+
+
+def test_nearest_cell_is_exact_without_diagonal_splits(models):
+    table = lt.LookupTable.build(models, n_points=64)   # ≥ the forests' split count
+    errors = lt.validate(table, models, n=2_000)
+    assert errors["prob_error_max"] < 1e-5
+    assert errors["duration_error_max"] < 1e-3
+    assert errors["class_agreement"] == 1.0
+
+
+def test_predict_fields_and_coverage(models):
+    table = lt.LookupTable.build(models, n_points=16)
+    out = table.predict(10.0, 20.0, 1, "Night")
+    assert set(out) == {"delay_class", "delay_confidence", "estimated_duration_min"}
+    assert table.covers(np.array([lt.MIN_DISTANCE, 50.0]), np.array([0.0, 100.0])).all()
+    assert not table.covers(lt.MIN_DISTANCE / 2, 10.0)
@@ -0,0 +1,65 @@
+"""Ring-buffer and prioritized replay (scripts/rl_agent/replay_buffer.py)."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("torch")
+
+from scripts.rl_agent.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+
+STATE = 3
+
+
+def _rows(start, n):
+    s = np.arange(start, start + n, dtype=np.float32)[:, None].repeat(STATE, axis=1)
+    a = np.arange(start, start + n) % 3
+    r = np.arange(start, start + n, dtype=np.float32)
+    return s, a, r, s + 0.5, np.zeros(n, dtype=np.float32)
+
+
+def test_ring_keeps_newest_rows():
+    buf = ReplayBuffer(capacity=5, state_size=STATE, batch=4, seed=0)
+    buf.add_batch(*_rows(0, 4))
+    buf.add_batch(*_rows(4, 4))
+    assert len(buf) == 5
+    assert sorted(buf.r[:, 0].tolist()) == [3, 4, 5, 6, 7]
+
+    buf.add(*(x[0] for x in _rows(8, 1)))
+    assert sorted(buf.r[:, 0].tolist()) == [4, 5, 6, 7, 8]
+
+
+def test_oversized_batch_keeps_tail():
+    buf = ReplayBuffer(capacity=4, state_size=STATE, batch=2, seed=0)
+    buf.add_batch(*_rows(0, 10))
+    assert sorted(buf.r[:, 0].tolist()) == [6, 7, 8, 9]
+
+
+def test_uniform_sample_is_consistent_and_in_range():
+    buf = ReplayBuffer(capacity=100, state_size=STATE, batch=32, seed=0)
+    buf.add_batch(*_rows(0, 10))
+    s, a, r, ns, d, weights, idx = buf.sample()
+    assert s.shape == (32, STATE) and a.shape == r.shape == d.shape == (32, 1)
+    assert weights is None
+    assert (idx < 10).all()
+    # every field of a sampled row comes from the same transition
+    assert np.array_equal(s[:, 0].numpy(), r[:, 0].numpy())
+    assert np.array_equal(ns.numpy(), s.numpy() + 0.5)
+    assert np.array_equal(a[:, 0].numpy(), r[:, 0].numpy().astype(int) % 3)
+
+
+def test_sample_resizes_batch():
+    buf = ReplayBuffer(capacity=10, state_size=STATE, batch=4, seed=0)
+    buf.add_batch(*_rows(0, 10))
+    assert buf.sample(batch=7)[0].shape == (7, STATE)
+
+
+def test_prioritized_favours_high_priority():
+    buf = PrioritizedReplayBuffer(capacity=8, state_size=STATE, batch=256, seed=0)
+    buf.add_batch(*_rows(0, 8))
+    buf.update_priorities(np.arange(8), np.r_[np.full(7, 1e-3), 100.0])
+    *_, weights, idx = buf.sample()
+    assert (idx < 8).all()
+    assert (idx == 7).mean() > 0.9
+    assert weights.shape == (256, 1) and float(weights.max()) == pytest.approx(1.0)
+    # rarely drawn rows get the largest importance weights
+    assert float(weights[idx != 7].min()) > float(weights[idx == 7].max())
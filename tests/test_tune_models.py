@@ -0,0 +1,88 @@
+"""Successive halving under a wall-clock deadline (scripts/tune_models.py).
+
+Trials are replaced by quick in-process fakes; the pool is a thread pool.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("xgboost")
+
+from scripts import tune_models as tm
+
+
+def _result(params, trained, complete):
+    score = params["learning_rate"]
+    return {"quality": score, "latency_ms_10k": 1.0, "fit_s": 0.0, "score": score,
+            "trained": trained, "complete": complete}
+
+
+def _instant(params, rounds, lat_weight, deadline):
+    return _result(params, rounds, True)
+
+
+def _stalls_after_rung_0(params, rounds, lat_weight, deadline):
+    if rounds == tm.CLF_RESOURCE[0]:
+        return _result(params, rounds, True)
+    while time.time() < deadline:          # a real trial stops itself at the deadline
+        time.sleep(0.01)
+    return _result(params, rounds // 2, False)
+
+
+def test_past_deadline_runs_nothing(monkeypatch):
+    monkeypatch.setattr(tm, "_clf_trial", _instant)
+    with ThreadPoolExecutor(2) as pool:
+        assert tm.successive_halving(pool, "classifier", time.time() - 1) == []
+    assert tm._best([], "classifier") == {}
+
+
+def test_full_run_climbs_every_rung(monkeypatch):
+    monkeypatch.setattr(tm, "_clf_trial", _instant)
+    with ThreadPoolExecutor(4) as pool:
+        trials = tm.successive_halving(pool, "classifier", time.time() + 60, n_configs=27)
+    per_rung = [sum(t["rung"] == r for t in trials) for r in range(4)]
+    assert per_rung == [27, 9, 3, 1]
+    assert all(t["rung_complete"] for t in trials)
+
+    best = tm._best(trials, "classifier")
+    top = max((t for t in trials if t["rung"] == 3), key=lambda t: t["score"])
+    assert best["params"]["n_estimators"] == tm.CLF_RESOURCE[1]
+    assert best["score"] == top["score"]
+
+
+def test_deadline_cuts_rung_and_best_uses_last_full_rung(monkeypatch):
+    monkeypatch.setattr(tm, "_clf_trial", _stalls_after_rung_0)
+    deadline = time.time() + 1.0
+    with ThreadPoolExecutor(2) as pool:
+        trials = tm.successive_halving(pool, "classifier", deadline, n_configs=9)
+    assert time.time() < deadline + 2.0
+    assert {t["rung"] for t in trials} == {0, 1}
+    assert all(t["rung_complete"] for t in trials if t["rung"] == 0)
+    assert not any(t["rung_complete"] for t in trials if t["rung"] == 1)
+    # two rung-1 trials ran into the deadline; the queued third is cancelled
+    # unless a worker picked it up first, in which case it stops at once
+    assert 2 <= sum(t["rung"] == 1 for t in trials) <= 3
+
+    best = tm._best(trials, "classifier")
+    assert best["params"]["n_estimators"] == tm.CLF_RESOURCE[0]
+
+
+def test_main_without_finished_trials_writes_nothing(monkeypatch, tmp_path):
+    class _Pool(ThreadPoolExecutor):
+        def __init__(self, max_workers=None, initializer=None, initargs=()):
+            super().__init__(max_workers)
+
+    leaderboard, best = tmp_path / "board.csv", tmp_path / "best.json"
+    monkeypatch.setattr(tm, "LEADERBOARD_PATH", str(leaderboard))
+    monkeypatch.setattr(tm, "BEST_PATH", str(best))
+    monkeypatch.setattr(tm, "ProcessPoolExecutor", _Pool)
+    monkeypatch.setattr(tm, "prepare_shared_data", lambda data_dir: {})
+    monkeypatch.setattr(tm, "successive_halving", lambda *a, **k: [])
+
+    assert tm.main(budget_s=0.1, workers=1) is None
+    assert not leaderboard.exists() and not best.exists()